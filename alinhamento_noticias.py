@@ -0,0 +1,66 @@
+import pandas as pd
+
+from arquivo_noticias import CAMINHO_ARQUIVO_NOTICIAS, conectar
+from dados import COLUNA_PRECO
+
+# Ligação entre as notícias arquivadas e o preço do Brent. Cada artigo é levado ao pregão correspondente
+# por um merge as-of (o primeiro pregão na data de publicação ou depois dela: notícias de fim de semana
+# contam para a segunda-feira) e recebe o retorno desse dia e o do pregão seguinte. O resultado fica numa
+# tabela do próprio arquivo de notícias (alinhamento_noticias), por versão dos preços, e só artigos novos
+# são alinhados.
+
+def retornos_pregao(precos):
+    pregoes = precos[['Data', COLUNA_PRECO]].sort_values('Data').drop_duplicates('Data').reset_index(drop=True)
+    pregoes['Data'] = pregoes['Data'].astype('datetime64[ns]')
+    pregoes['retorno_dia'] = pregoes[COLUNA_PRECO].pct_change()
+    pregoes['retorno_seguinte'] = pregoes['retorno_dia'].shift(-1)
+    return pregoes
+
+def alinhar_noticias(noticias, precos):
+    # noticias: colunas id e publicada_em (ISO 8601, UTC); a hora é descartada e vale o dia da publicação
+    publicacao = pd.to_datetime(noticias['publicada_em'].str[:10], errors='coerce', format='%Y-%m-%d')
+    artigos = pd.DataFrame({'noticia_id': noticias['id'].to_numpy(), 'Data': publicacao.astype('datetime64[ns]').to_numpy()})
+    validos = artigos.dropna(subset=['Data']).sort_values('Data')
+
+    pregoes = retornos_pregao(precos).rename(columns={'Data': 'dia_pregao'})
+    alinhados = pd.merge_asof(validos, pregoes, left_on='Data', right_on='dia_pregao', direction='forward')
+    alinhados = artigos[['noticia_id']].merge(alinhados.drop(columns='Data'), on='noticia_id', how='left')
+    alinhados['movimento'] = alinhados[['retorno_dia', 'retorno_seguinte']].abs().max(axis=1)
+    alinhados['dia_pregao'] = alinhados['dia_pregao'].dt.strftime('%Y-%m-%d')
+    return alinhados.rename(columns={COLUNA_PRECO: 'preco'})
+
+def atualizar_alinhamento(versao_precos, precos, caminho=CAMINHO_ARQUIVO_NOTICIAS):
+    with conectar(caminho) as conexao:
+        # Alinhamentos de outra versão dos preços ficam inválidos; artigos ainda sem pregão (publicados
+        # depois do último preço) são tentados de novo a cada nova versão
+        conexao.execute('DELETE FROM alinhamento_noticias WHERE versao_precos != ?', (versao_precos,))
+        pendentes = pd.read_sql_query("""
+            SELECT noticias.id, noticias.publicada_em FROM noticias
+            LEFT JOIN alinhamento_noticias ON alinhamento_noticias.noticia_id = noticias.id
+            WHERE alinhamento_noticias.noticia_id IS NULL
+        """, conexao)
+        registros = [] if pendentes.empty else [
+            (int(linha.noticia_id), versao_precos, linha.dia_pregao if isinstance(linha.dia_pregao, str) else None,
+             *(None if pd.isna(valor) else float(valor) for valor in (linha.preco, linha.retorno_dia, linha.retorno_seguinte, linha.movimento)))
+            for linha in alinhar_noticias(pendentes, precos).itertuples(index=False)
+        ]
+        conexao.executemany('INSERT OR REPLACE INTO alinhamento_noticias VALUES (?, ?, ?, ?, ?, ?, ?)', registros)
+    conexao.close()
+    return len(registros)
+
+def noticias_por_pregao(versao_precos, caminho=CAMINHO_ARQUIVO_NOTICIAS):
+    # Um registro por pregão com notícias, para os marcadores dos gráficos de preço
+    with conectar(caminho) as conexao:
+        pregoes = pd.read_sql_query("""
+            SELECT alinhamento_noticias.dia_pregao, COUNT(*) AS quantidade,
+                   MAX(alinhamento_noticias.retorno_dia) AS retorno_dia,
+                   MAX(alinhamento_noticias.retorno_seguinte) AS retorno_seguinte,
+                   GROUP_CONCAT(noticias.titulo, ' | ') AS titulos
+            FROM alinhamento_noticias JOIN noticias ON noticias.id = alinhamento_noticias.noticia_id
+            WHERE alinhamento_noticias.versao_precos = ? AND alinhamento_noticias.dia_pregao IS NOT NULL
+            GROUP BY alinhamento_noticias.dia_pregao
+            ORDER BY alinhamento_noticias.dia_pregao
+        """, conexao, params=(versao_precos,))
+    conexao.close()
+    pregoes['dia_pregao'] = pd.to_datetime(pregoes['dia_pregao'])
+    return pregoes
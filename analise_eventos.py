@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks
+
+from dados import COLUNA_PRECO
+
+# Detecção automática de quedas, altas e mudanças de regime no preço do Brent.
+# Todas as funções recebem o DataFrame de carregar_dados e trabalham sobre a série ordenada por data.
+
+def preparar_serie(dados):
+    serie = dados[['Data', COLUNA_PRECO]].dropna().sort_values('Data')
+    serie = serie.drop_duplicates(subset='Data', keep='last')
+    return serie['Data'].to_numpy(), serie[COLUNA_PRECO].to_numpy(dtype=float)
+
+def calcular_drawdown(precos):
+    pico_acumulado = np.maximum.accumulate(precos)
+    return precos / pico_acumulado - 1
+
+def maximo_drawdown(datas, precos):
+    drawdown = calcular_drawdown(precos)
+    i_vale = int(np.argmin(drawdown))
+    i_pico = int(np.argmax(precos[:i_vale + 1]))
+    return {
+        'data_pico': pd.Timestamp(datas[i_pico]),
+        'data_vale': pd.Timestamp(datas[i_vale]),
+        'preco_pico': precos[i_pico],
+        'preco_vale': precos[i_vale],
+        'variacao': drawdown[i_vale],
+    }
+
+def detectar_extremos(precos, limiar=0.3):
+    # Picos e vales cuja proeminência em escala log corresponde a uma variação de pelo menos `limiar`
+    log_precos = np.log(precos)
+    proeminencia = -np.log(1 - limiar)
+    picos, _ = find_peaks(log_precos, prominence=proeminencia)
+    vales, _ = find_peaks(-log_precos, prominence=proeminencia)
+
+    indices = np.concatenate([picos, vales])
+    tipos = np.concatenate([np.ones(len(picos), dtype=int), -np.ones(len(vales), dtype=int)])
+    ordem = np.argsort(indices, kind='stable')
+    indices, tipos = indices[ordem], tipos[ordem]
+
+    # Garante a alternância pico/vale mantendo o extremo mais forte de cada sequência repetida
+    extremos = []
+    for indice, tipo in zip(indices, tipos):
+        if extremos and extremos[-1][1] == tipo:
+            anterior = extremos[-1][0]
+            if (tipo == 1 and precos[indice] > precos[anterior]) or (tipo == -1 and precos[indice] < precos[anterior]):
+                extremos[-1] = (indice, tipo)
+        else:
+            extremos.append((indice, tipo))
+    return extremos
+
+def detectar_episodios(datas, precos, limiar=0.3):
+    # O último trecho (do último extremo até o preço mais recente) ainda não terminou num extremo confirmado:
+    # entra como episódio em aberto se a variação até agora já passa do limiar
+    extremos = detectar_extremos(precos, limiar)
+    if not extremos:
+        return pd.DataFrame(columns=['Tipo', 'Inicio', 'Fim', 'Preco_Inicio', 'Preco_Fim', 'Variacao', 'Duracao_Dias', 'Em_Aberto'])
+
+    indices = np.array([indice for indice, _ in extremos] + [len(precos) - 1])
+    tipos = np.array([tipo for _, tipo in extremos])
+    inicio, fim = indices[:-1], indices[1:]
+
+    episodios = pd.DataFrame({
+        # Um episódio que começa num pico é uma queda; num vale, uma alta
+        'Tipo': np.where(tipos == 1, 'Queda', 'Aumento'),
+        'Inicio': pd.to_datetime(datas[inicio]),
+        'Fim': pd.to_datetime(datas[fim]),
+        'Preco_Inicio': precos[inicio],
+        'Preco_Fim': precos[fim],
+    })
+    episodios['Variacao'] = episodios['Preco_Fim'] / episodios['Preco_Inicio'] - 1
+    episodios['Duracao_Dias'] = (episodios['Fim'] - episodios['Inicio']).dt.days
+    episodios['Em_Aberto'] = np.arange(len(episodios)) == len(episodios) - 1
+    # Sinal conferido para o trecho em aberto: um último extremo no próprio último preço não forma episódio
+    sentido = np.where(episodios['Tipo'] == 'Queda', -1, 1)
+    return episodios[(episodios['Variacao'] * sentido >= limiar)].reset_index(drop=True)
+
+def detectar_mudancas_regime(datas, precos, penalidade=None, tamanho_minimo=20):
+    # PELT (Killick et al., 2012) sobre os log-retornos, com custo gaussiano de mudança na média e na variância.
+    # A poda dos candidatos mantém o custo próximo de linear no tamanho da série.
+    retornos = np.diff(np.log(precos))
+    n = len(retornos)
+    if n < 2 * tamanho_minimo:
+        return []
+    if penalidade is None:
+        penalidade = 4 * np.log(n)
+
+    soma = np.concatenate([[0.0], np.cumsum(retornos)])
+    soma_quadrados = np.concatenate([[0.0], np.cumsum(retornos ** 2)])
+
+    def custo(inicios, fim):
+        tamanho = fim - inicios
+        media = (soma[fim] - soma[inicios]) / tamanho
+        variancia = (soma_quadrados[fim] - soma_quadrados[inicios]) / tamanho - media ** 2
+        return tamanho * np.log(np.maximum(variancia, 1e-12))
+
+    custo_otimo = np.full(n + 1, np.inf)
+    custo_otimo[0] = -penalidade
+    ultima_mudanca = np.zeros(n + 1, dtype=int)
+    candidatos = np.array([0])
+
+    for fim in range(tamanho_minimo, n + 1):
+        novo_candidato = fim - tamanho_minimo
+        if novo_candidato >= tamanho_minimo:
+            candidatos = np.append(candidatos, novo_candidato)
+        total = custo_otimo[candidatos] + custo(candidatos, fim) + penalidade
+        melhor = int(np.argmin(total))
+        custo_otimo[fim] = total[melhor]
+        ultima_mudanca[fim] = candidatos[melhor]
+        # Poda: candidatos que já não podem ser ótimos são descartados
+        candidatos = candidatos[total - penalidade <= custo_otimo[fim]]
+
+    mudancas = []
+    fim = n
+    while fim > 0:
+        inicio = ultima_mudanca[fim]
+        if inicio > 0:
+            mudancas.append(inicio)
+        fim = inicio
+    # O retorno i corresponde à variação entre os preços i e i+1
+    return [pd.Timestamp(datas[i + 1]) for i in sorted(mudancas)]
+
+def gerar_eventos(dados, limiar=0.3):
+    datas, precos = preparar_serie(dados)
+    return {
+        'episodios': detectar_episodios(datas, precos, limiar),
+        'mudancas_regime': detectar_mudancas_regime(datas, precos),
+        'maximo_drawdown': maximo_drawdown(datas, precos),
+    }
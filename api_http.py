@@ -0,0 +1,215 @@
+import argparse
+import gzip
+import hashlib
+import json
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import pandas as pd
+
+from dados import COLUNA_PRECO, carregar_precos, versao_dados, versao_arquivo, calcular_medias_moveis, caminho_previsoes, carregar_previsoes
+from indice_intervalos import IndiceIntervalos, posicoes_intervalo
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# API HTTP local com os dados do dashboard: preços, indicadores e previsões em JSON (ou Arrow),
+# filtrados por intervalo de datas, paginados, com ETag/GET condicional e gzip.
+#
+# Uso: python api_http.py --porta 8000
+#   GET /precos?inicio=2020-01-01&fim=2020-12-31&pagina=1&por_pagina=500
+#   GET /indicadores?inicio=2020-01-01          (médias móveis de 30, 90 e 365 dias)
+#   GET /previsoes?tipo=Previsao
+#   GET /estatisticas?inicio=2008-01-01&fim=2008-12-31
+#   Acrescente formato=arrow para receber um stream Arrow IPC em vez de JSON.
+
+POR_PAGINA_PADRAO = 1000
+POR_PAGINA_MAXIMO = 10000
+TAMANHO_MINIMO_GZIP = 1024
+
+class ErroRequisicao(Exception):
+    pass
+
+@lru_cache(maxsize=2)
+def obter_precos(versao):
+    precos = carregar_precos()[['Data', COLUNA_PRECO]]
+    return precos.sort_values('Data').reset_index(drop=True)
+
+@lru_cache(maxsize=2)
+def obter_indicadores(versao):
+    return calcular_medias_moveis(obter_precos(versao))
+
+@lru_cache(maxsize=2)
+def obter_indice_precos(versao):
+    precos = obter_precos(versao)
+    return IndiceIntervalos(precos['Data'], precos[COLUNA_PRECO])
+
+@lru_cache(maxsize=2)
+def obter_previsoes(versao):
+    return carregar_previsoes()
+
+def parametro(consulta, nome, padrao=None):
+    return consulta.get(nome, [padrao])[0]
+
+def ler_data(consulta, nome):
+    valor = parametro(consulta, nome)
+    if valor is None:
+        return None
+    try:
+        return pd.Timestamp(valor)
+    except ValueError:
+        raise ErroRequisicao(f"Data inválida em '{nome}': {valor}")
+
+def ler_inteiro(consulta, nome, padrao, minimo, maximo):
+    valor = parametro(consulta, nome, padrao)
+    try:
+        valor = int(valor)
+    except (TypeError, ValueError):
+        raise ErroRequisicao(f"Valor inválido em '{nome}': {valor}")
+    if not minimo <= valor <= maximo:
+        raise ErroRequisicao(f"'{nome}' deve estar entre {minimo} e {maximo}")
+    return valor
+
+def filtrar_intervalo(tabela, consulta):
+    # As tabelas estão ordenadas por data, então o recorte é feito por busca binária
+    inicio, fim = posicoes_intervalo(tabela['Data'].to_numpy(), ler_data(consulta, 'inicio'), ler_data(consulta, 'fim'))
+    return tabela.iloc[inicio:max(fim + 1, inicio)]
+
+def versao_recurso(caminho):
+    if caminho == '/previsoes':
+        caminho_arquivo = caminho_previsoes()
+        return f"{caminho_arquivo}:{versao_arquivo(caminho_arquivo)}"
+    return versao_dados()
+
+def consultar_recurso(caminho, consulta, versao):
+    if caminho == '/precos':
+        return filtrar_intervalo(obter_precos(versao), consulta)
+    if caminho == '/indicadores':
+        return filtrar_intervalo(obter_indicadores(versao), consulta)
+    if caminho == '/previsoes':
+        previsoes = filtrar_intervalo(obter_previsoes(versao), consulta)
+        tipo = parametro(consulta, 'tipo')
+        return previsoes if tipo is None else previsoes[previsoes['Tipo'] == tipo]
+    if caminho == '/estatisticas':
+        faixa = obter_indice_precos(versao).estatisticas(ler_data(consulta, 'inicio'), ler_data(consulta, 'fim'))
+        return pd.DataFrame([faixa])
+    return None
+
+def paginar(tabela, consulta):
+    por_pagina = ler_inteiro(consulta, 'por_pagina', POR_PAGINA_PADRAO, 1, POR_PAGINA_MAXIMO)
+    total = len(tabela)
+    total_paginas = max(1, -(-total // por_pagina))
+    pagina = ler_inteiro(consulta, 'pagina', 1, 1, total_paginas)
+    inicio = (pagina - 1) * por_pagina
+    return tabela.iloc[inicio:inicio + por_pagina], {
+        'pagina': pagina,
+        'por_pagina': por_pagina,
+        'total': total,
+        'total_paginas': total_paginas,
+    }
+
+def link_pagina(caminho, consulta, pagina):
+    parametros = {nome: valores[0] for nome, valores in consulta.items()}
+    parametros['pagina'] = pagina
+    return f"{caminho}?{urlencode(parametros)}"
+
+def serializar_json(tabela, paginacao, caminho, consulta):
+    registros = tabela.copy()
+    for coluna in registros.columns:
+        if pd.api.types.is_datetime64_any_dtype(registros[coluna]):
+            registros[coluna] = registros[coluna].dt.strftime('%Y-%m-%d')
+    corpo = {'dados': json.loads(registros.to_json(orient='records')), **paginacao}
+    if paginacao['pagina'] < paginacao['total_paginas']:
+        corpo['proxima'] = link_pagina(caminho, consulta, paginacao['pagina'] + 1)
+    return json.dumps(corpo, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8'
+
+def serializar_arrow(tabela):
+    if pa is None:
+        raise ErroRequisicao("Formato Arrow indisponível: instale o pacote pyarrow")
+    tabela_arrow = pa.Table.from_pandas(tabela, preserve_index=False)
+    saida = pa.BufferOutputStream()
+    with pa.ipc.new_stream(saida, tabela_arrow.schema) as escritor:
+        escritor.write_table(tabela_arrow)
+    return saida.getvalue().to_pybytes(), 'application/vnd.apache.arrow.stream'
+
+def calcular_etag(versao, caminho, consulta):
+    # Depende só da versão dos dados e da consulta, então um 304 é respondido sem montar o corpo
+    chave = json.dumps([versao, caminho, sorted(consulta.items())])
+    return 'W/"' + hashlib.sha1(chave.encode('utf-8')).hexdigest() + '"'
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    server_version = 'BrentAPI/1.0'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        caminho = url.path.rstrip('/') or '/'
+        consulta = parse_qs(url.query)
+
+        if caminho not in ('/precos', '/indicadores', '/previsoes', '/estatisticas'):
+            self.responder_erro(404, f"Recurso não encontrado: {caminho}")
+            return
+
+        try:
+            versao = versao_recurso(caminho)
+            etag = calcular_etag(versao, caminho, consulta)
+            if etag in [valor.strip() for valor in self.headers.get('If-None-Match', '').split(',')]:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                return
+
+            tabela = consultar_recurso(caminho, consulta, versao)
+            pagina, paginacao = paginar(tabela, consulta)
+            if parametro(consulta, 'formato', 'json') == 'arrow':
+                corpo, tipo = serializar_arrow(pagina)
+            else:
+                corpo, tipo = serializar_json(pagina, paginacao, caminho, consulta)
+        except ErroRequisicao as erro:
+            self.responder_erro(400, str(erro))
+            return
+
+        cabecalhos = {
+            'Content-Type': tipo,
+            'ETag': etag,
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding',
+            'X-Total-Count': str(paginacao['total']),
+        }
+        if paginacao['pagina'] < paginacao['total_paginas']:
+            cabecalhos['Link'] = f"<{link_pagina(caminho, consulta, paginacao['pagina'] + 1)}>; rel=\"next\""
+        self.responder(200, corpo, cabecalhos)
+
+    def responder(self, status, corpo, cabecalhos):
+        if len(corpo) >= TAMANHO_MINIMO_GZIP and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            corpo = gzip.compress(corpo, compresslevel=6)
+            cabecalhos['Content-Encoding'] = 'gzip'
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def responder_erro(self, status, mensagem):
+        corpo = json.dumps({'erro': mensagem}, ensure_ascii=False).encode('utf-8')
+        self.responder(status, corpo, {'Content-Type': 'application/json; charset=utf-8'})
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP com os dados do preço do petróleo Brent")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8000)
+    argumentos = parser.parse_args()
+
+    servidor = ThreadingHTTPServer((argumentos.host, argumentos.porta), ManipuladorAPI)
+    print(f"API disponível em http://{argumentos.host}:{argumentos.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
+
+if __name__ == "__main__":
+    main()
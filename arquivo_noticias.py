@@ -0,0 +1,155 @@
+import functools
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Arquivo local das notícias buscadas na NewsAPI: cada artigo é guardado uma vez (pela URL) em SQLite,
+# com um índice FTS5 sobre título, descrição e conteúdo. A página de notícias lê daqui, com busca por
+# palavras, filtro de datas e paginação, sem depender da API nem da janela de dias que ela mantém.
+# A tabela alinhamento_noticias guarda o pregão e os retornos do Brent de cada notícia (alinhamento_noticias.py).
+
+CAMINHO_ARQUIVO_NOTICIAS = os.environ.get('ARQUIVO_NOTICIAS', 'noticias.db')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS noticias (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    titulo TEXT,
+    descricao TEXT,
+    conteudo TEXT,
+    fonte TEXT,
+    autor TEXT,
+    imagem TEXT,
+    publicada_em TEXT,
+    coletada_em TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS noticias_publicada_em ON noticias (publicada_em);
+
+-- Índice de texto com conteúdo externo: o texto fica só na tabela noticias e os gatilhos mantêm o índice
+CREATE VIRTUAL TABLE IF NOT EXISTS noticias_fts USING fts5(
+    titulo, descricao, conteudo,
+    content='noticias', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS noticias_inclusao AFTER INSERT ON noticias BEGIN
+    INSERT INTO noticias_fts (rowid, titulo, descricao, conteudo) VALUES (new.id, new.titulo, new.descricao, new.conteudo);
+END;
+CREATE TRIGGER IF NOT EXISTS noticias_exclusao AFTER DELETE ON noticias BEGIN
+    INSERT INTO noticias_fts (noticias_fts, rowid, titulo, descricao, conteudo) VALUES ('delete', old.id, old.titulo, old.descricao, old.conteudo);
+END;
+CREATE TRIGGER IF NOT EXISTS noticias_alteracao AFTER UPDATE ON noticias BEGIN
+    INSERT INTO noticias_fts (noticias_fts, rowid, titulo, descricao, conteudo) VALUES ('delete', old.id, old.titulo, old.descricao, old.conteudo);
+    INSERT INTO noticias_fts (rowid, titulo, descricao, conteudo) VALUES (new.id, new.titulo, new.descricao, new.conteudo);
+END;
+
+-- Pregão e retornos do Brent ligados a cada notícia, preenchidos por alinhamento_noticias.py
+CREATE TABLE IF NOT EXISTS alinhamento_noticias (
+    noticia_id INTEGER PRIMARY KEY REFERENCES noticias (id) ON DELETE CASCADE,
+    versao_precos TEXT NOT NULL,
+    dia_pregao TEXT,
+    preco REAL,
+    retorno_dia REAL,
+    retorno_seguinte REAL,
+    movimento REAL
+);
+CREATE INDEX IF NOT EXISTS alinhamento_movimento ON alinhamento_noticias (versao_precos, movimento);
+CREATE INDEX IF NOT EXISTS alinhamento_dia ON alinhamento_noticias (versao_precos, dia_pregao);
+"""
+
+COLUNAS = ['id', 'url', 'titulo', 'descricao', 'fonte', 'autor', 'imagem', 'publicada_em']
+COLUNAS_ALINHAMENTO = ['dia_pregao', 'retorno_dia', 'retorno_seguinte', 'movimento']
+
+@functools.lru_cache(maxsize=None)
+def criar_esquema(caminho):
+    # Uma vez por arquivo e processo: as conexões seguintes não repetem os CREATE ... IF NOT EXISTS
+    conexao = sqlite3.connect(caminho, timeout=10)
+    conexao.executescript(ESQUEMA)
+    conexao.close()
+
+def conectar(caminho=CAMINHO_ARQUIVO_NOTICIAS):
+    criar_esquema(os.path.abspath(caminho))
+    conexao = sqlite3.connect(caminho, timeout=10)
+    # WAL: a página lê enquanto a busca em segundo plano grava
+    conexao.execute('PRAGMA journal_mode=WAL')
+    return conexao
+
+def arquivar_noticias(artigos, caminho=CAMINHO_ARQUIVO_NOTICIAS):
+    coletada_em = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    registros = [(
+        artigo['url'], artigo.get('title'), artigo.get('description'), artigo.get('content'),
+        (artigo.get('source') or {}).get('name'), artigo.get('author'), artigo.get('urlToImage'),
+        artigo.get('publishedAt'), coletada_em,
+    ) for artigo in artigos or [] if artigo.get('url')]
+
+    with conectar(caminho) as conexao:
+        antes = conexao.execute('SELECT COUNT(*) FROM noticias').fetchone()[0]
+        # Uma URL já arquivada só tem o texto atualizado; o gatilho de alteração reindexa o artigo
+        conexao.executemany("""
+            INSERT INTO noticias (url, titulo, descricao, conteudo, fonte, autor, imagem, publicada_em, coletada_em)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                titulo = excluded.titulo, descricao = excluded.descricao, conteudo = excluded.conteudo,
+                fonte = excluded.fonte, autor = excluded.autor, imagem = excluded.imagem, publicada_em = excluded.publicada_em
+            WHERE titulo IS NOT excluded.titulo OR descricao IS NOT excluded.descricao OR conteudo IS NOT excluded.conteudo
+        """, registros)
+        novas = conexao.execute('SELECT COUNT(*) FROM noticias').fetchone()[0] - antes
+    conexao.close()
+    return novas
+
+def consulta_fts(termos):
+    # Cada palavra vira um termo entre aspas com prefixo ("petrol"* acha petróleo e petrolífera),
+    # o que também neutraliza a sintaxe do FTS5 digitada pelo usuário
+    palavras = [palavra.replace('"', '""') for palavra in termos.split()]
+    return ' '.join(f'"{palavra}"*' for palavra in palavras if palavra)
+
+ORDENACOES = {
+    'data': 'publicada_em DESC, noticias.id DESC',
+    'movimento': 'alinhamento_noticias.movimento IS NULL, alinhamento_noticias.movimento DESC, publicada_em DESC',
+}
+
+def buscar_no_arquivo(termos='', data_inicio=None, data_fim=None, pagina=1, por_pagina=10, caminho=CAMINHO_ARQUIVO_NOTICIAS,
+                      versao_precos=None, ordenar_por='data', movimento_minimo=None):
+    # Com versao_precos, cada notícia vem com o pregão e os retornos do alinhamento dessa versão
+    condicoes, parametros = [], [versao_precos]
+    consulta = consulta_fts(termos or '')
+    if consulta:
+        condicoes.append('noticias.id IN (SELECT rowid FROM noticias_fts WHERE noticias_fts MATCH ?)')
+        parametros.append(consulta)
+    if data_inicio is not None:
+        condicoes.append('publicada_em >= ?')
+        parametros.append(pd.Timestamp(data_inicio).strftime('%Y-%m-%d'))
+    if data_fim is not None:
+        # Data final inclusiva: tudo antes do dia seguinte
+        condicoes.append('publicada_em < ?')
+        parametros.append((pd.Timestamp(data_fim) + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+    if movimento_minimo is not None:
+        condicoes.append('alinhamento_noticias.movimento >= ?')
+        parametros.append(movimento_minimo)
+    filtro = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+    origem = """noticias LEFT JOIN alinhamento_noticias
+        ON alinhamento_noticias.noticia_id = noticias.id AND alinhamento_noticias.versao_precos = ?"""
+
+    with conectar(caminho) as conexao:
+        total = conexao.execute(f'SELECT COUNT(*) FROM {origem} {filtro}', parametros).fetchone()[0]
+        linhas = conexao.execute(
+            f"SELECT {', '.join(f'noticias.{coluna}' for coluna in COLUNAS)}, {', '.join(COLUNAS_ALINHAMENTO)} "
+            f"FROM {origem} {filtro} ORDER BY {ORDENACOES[ordenar_por]} LIMIT ? OFFSET ?",
+            parametros + [por_pagina, (pagina - 1) * por_pagina]).fetchall()
+    conexao.close()
+    return pd.DataFrame(linhas, columns=COLUNAS + COLUNAS_ALINHAMENTO), total
+
+def intervalo_arquivo(caminho=CAMINHO_ARQUIVO_NOTICIAS):
+    with conectar(caminho) as conexao:
+        quantidade, primeira, ultima = conexao.execute(
+            'SELECT COUNT(*), MIN(publicada_em), MAX(publicada_em) FROM noticias').fetchone()
+    conexao.close()
+    return {'quantidade': quantidade, 'primeira': primeira and pd.Timestamp(primeira[:10]), 'ultima': ultima and pd.Timestamp(ultima[:10])}
+
+def versao_arquivo_noticias(caminho=CAMINHO_ARQUIVO_NOTICIAS):
+    # Muda a cada artigo novo ou atualizado; chave dos caches do dashboard que dependem do arquivo
+    with conectar(caminho) as conexao:
+        quantidade, ultimo, coleta = conexao.execute('SELECT COUNT(*), MAX(id), MAX(coletada_em) FROM noticias').fetchone()
+    conexao.close()
+    return f'{quantidade}:{ultimo}:{coleta}'
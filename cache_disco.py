@@ -0,0 +1,127 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import time
+
+# Cache persistente em disco para os dados e figuras das páginas do dashboard. Cada resultado fica em SQLite
+# pela chave da chamada (função e argumentos), pela versão dos dados e pela do código do projeto, então um
+# reinício do servidor lê o que já foi calculado em vez de recalcular. O arquivo tem tamanho máximo: acima
+# dele, as entradas usadas há mais tempo são descartadas (LRU). Fica abaixo dos caches em memória do
+# Streamlit, que continuam na frente.
+
+CAMINHO_CACHE_PAGINAS = os.environ.get('CACHE_PAGINAS', 'cache_paginas.db')
+LIMITE_BYTES_CACHE = int(float(os.environ.get('CACHE_PAGINAS_LIMITE_MB', 256)) * 1024 * 1024)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS entradas (
+    chave TEXT NOT NULL,
+    versao TEXT NOT NULL,
+    valor BLOB NOT NULL,
+    bytes INTEGER NOT NULL,
+    ultimo_acesso REAL NOT NULL,
+    PRIMARY KEY (chave, versao)
+);
+CREATE INDEX IF NOT EXISTS entradas_acesso ON entradas (ultimo_acesso);
+"""
+
+class CacheDisco:
+    def __init__(self, caminho=CAMINHO_CACHE_PAGINAS, limite_bytes=LIMITE_BYTES_CACHE):
+        self.caminho = caminho
+        self.limite_bytes = limite_bytes
+
+    def conectar(self):
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        # auto_vacuum só vale para um arquivo novo: as páginas das entradas descartadas voltam ao disco
+        conexao.execute('PRAGMA auto_vacuum=FULL')
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.executescript(ESQUEMA)
+        return conexao
+
+    def obter(self, chave, versao):
+        # Devolve (encontrado, valor); cada leitura leva a entrada para o fim da fila de descarte
+        with self.conectar() as conexao:
+            linha = conexao.execute('SELECT valor FROM entradas WHERE chave = ? AND versao = ?', (chave, versao)).fetchone()
+            if linha is not None:
+                conexao.execute('UPDATE entradas SET ultimo_acesso = ? WHERE chave = ? AND versao = ?', (time.time(), chave, versao))
+        conexao.close()
+        if linha is None:
+            return False, None
+        try:
+            return True, pickle.loads(linha[0])
+        except Exception:
+            # Gravada por outra versão das bibliotecas: é recalculada e regravada
+            return False, None
+
+    def guardar(self, chave, versao, valor):
+        conteudo = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(conteudo) > self.limite_bytes:
+            return False
+        with self.conectar() as conexao:
+            conexao.execute('INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?)', (chave, versao, conteudo, len(conteudo), time.time()))
+            self.descartar_excedente(conexao)
+        conexao.close()
+        return True
+
+    def descartar_excedente(self, conexao):
+        # Soma acumulada da entrada mais recente para a mais antiga: sai tudo o que passa do limite
+        conexao.execute("""
+            DELETE FROM entradas WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, SUM(bytes) OVER (ORDER BY ultimo_acesso DESC, rowid DESC) AS acumulado FROM entradas
+                ) WHERE acumulado > ?
+            )
+        """, (self.limite_bytes,))
+
+    def resumo(self):
+        with self.conectar() as conexao:
+            entradas, total = conexao.execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entradas').fetchone()
+        conexao.close()
+        return {'entradas': entradas, 'bytes': total, 'limite_bytes': self.limite_bytes}
+
+CACHE_PAGINAS = CacheDisco()
+
+@functools.lru_cache(maxsize=None)
+def versao_projeto(pasta):
+    # As funções em cache chamam os outros módulos do projeto (decomposicao, indicadores, figuras...): qualquer
+    # alteração num .py da pasta invalida as entradas gravadas
+    resumo = hashlib.sha256()
+    for nome in sorted(os.listdir(pasta)):
+        if nome.endswith('.py'):
+            resumo.update(nome.encode('utf-8'))
+            with open(os.path.join(pasta, nome), 'rb') as arquivo:
+                resumo.update(hashlib.sha256(arquivo.read()).digest())
+    return resumo.hexdigest()[:12]
+
+def versao_codigo(funcao):
+    return versao_projeto(os.path.dirname(os.path.abspath(inspect.getsourcefile(funcao))))
+
+def em_disco(funcao):
+    # Para funções com um argumento "versao" (a versão dos dados). Como no st.cache_data, argumentos com
+    # nome iniciado por "_" (os DataFrames já carregados) não entram na chave
+    assinatura = inspect.signature(funcao)
+    codigo = versao_codigo(funcao)
+
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        argumentos = assinatura.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        visiveis = {nome: valor for nome, valor in argumentos.arguments.items() if not nome.startswith('_')}
+        versao = f"{visiveis.pop('versao')}|{codigo}"
+        chave = f"{funcao.__module__}.{funcao.__qualname__}:{visiveis!r}"
+        try:
+            encontrado, valor = CACHE_PAGINAS.obter(chave, versao)
+        except sqlite3.Error:
+            # Um problema no arquivo do cache nunca impede a página de ser calculada
+            encontrado = False
+        if encontrado:
+            return valor
+        valor = funcao(*args, **kwargs)
+        try:
+            CACHE_PAGINAS.guardar(chave, versao, valor)
+        except sqlite3.Error:
+            pass
+        return valor
+    return envoltorio
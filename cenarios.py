@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# Cenários de Monte Carlo para o preço do Brent: dezenas de milhares de trajetórias simuladas em lotes
+# (matrizes NumPy de lote x horizonte) por movimento browniano geométrico (GBM) ou por bootstrap em
+# blocos dos retornos históricos. Cada lote é reduzido na hora a um histograma do log-preço por dia, somado
+# ao dos lotes anteriores; os percentis saem desse histograma, sem guardar as trajetórias. Tudo roda no
+# próprio processo: o servidor do Streamlit tem threads (aquecimento, buscas externas) e um fork nelas pode
+# travar, enquanto iniciar processos por spawn custa mais do que a simulação inteira (segundos contra ~0,1 s
+# para 20 mil trajetórias).
+
+MODELOS = {'bootstrap': 'Bootstrap em blocos dos retornos', 'gbm': 'Movimento browniano geométrico (GBM)'}
+PERCENTIS = [5, 25, 50, 75, 95]
+JANELA_HISTORICA = 5 * 252
+TAMANHO_BLOCO_BOOTSTRAP = 20
+TAMANHO_LOTE = 2000
+# Grade do histograma em log(preço / preço inicial): de 1/20 a 20 vezes o preço inicial, passos de ~0,2%
+LIMITE_LOG = 3.0
+FAIXAS_HISTOGRAMA = 3000
+
+def retornos_logaritmicos(precos, janela=JANELA_HISTORICA):
+    precos = np.asarray(precos, dtype='float64')
+    retornos = np.diff(np.log(precos))
+    return retornos[np.isfinite(retornos)][-janela:]
+
+def simular_lote(modelo, retornos, horizonte, tamanho, semente):
+    gerador = np.random.default_rng(semente)
+    if modelo == 'gbm':
+        # Drift e volatilidade diários estimados dos log-retornos; o termo -sigma²/2 já está na média deles
+        media, desvio = retornos.mean(), retornos.std(ddof=1)
+        passos = gerador.normal(media, desvio, size=(tamanho, horizonte))
+    elif modelo == 'bootstrap':
+        # Blocos contíguos preservam a autocorrelação e os agrupamentos de volatilidade do histórico
+        blocos = -(-horizonte // TAMANHO_BLOCO_BOOTSTRAP)
+        inicios = gerador.integers(0, len(retornos) - TAMANHO_BLOCO_BOOTSTRAP + 1, size=(tamanho, blocos))
+        indices = inicios[:, :, None] + np.arange(TAMANHO_BLOCO_BOOTSTRAP)
+        passos = retornos[indices.reshape(tamanho, -1)[:, :horizonte]]
+    else:
+        raise ValueError(f"Modelo desconhecido: {modelo}")
+    return np.cumsum(passos, axis=1)
+
+def reduzir_lotes(modelo, retornos, horizonte, lotes):
+    # Acumula os lotes e devolve só as contagens por (dia, faixa) e a soma dos preços relativos, nunca as
+    # trajetórias: a memória fica limitada a um lote por vez
+    contagens = np.zeros(horizonte * FAIXAS_HISTOGRAMA, dtype='int64')
+    soma = np.zeros(horizonte)
+    deslocamentos = np.arange(horizonte) * FAIXAS_HISTOGRAMA
+    for tamanho, semente in lotes:
+        trajetorias = simular_lote(modelo, retornos, horizonte, tamanho, semente)
+        faixas = ((trajetorias + LIMITE_LOG) / (2 * LIMITE_LOG) * FAIXAS_HISTOGRAMA).astype('int64')
+        np.clip(faixas, 0, FAIXAS_HISTOGRAMA - 1, out=faixas)
+        contagens += np.bincount((faixas + deslocamentos).ravel(), minlength=len(contagens))
+        soma += np.exp(trajetorias).sum(axis=0)
+    return contagens.reshape(horizonte, FAIXAS_HISTOGRAMA), soma
+
+def percentis_histograma(contagens, percentis):
+    # Interpola dentro da faixa em que a contagem acumulada cruza cada percentil
+    acumuladas = np.cumsum(contagens, axis=1)
+    total = acumuladas[:, -1:]
+    largura = 2 * LIMITE_LOG / FAIXAS_HISTOGRAMA
+    resultado = {}
+    for percentil in percentis:
+        alvo = total[:, 0] * percentil / 100
+        faixa = np.minimum((acumuladas < alvo[:, None]).sum(axis=1), FAIXAS_HISTOGRAMA - 1)
+        linhas = np.arange(len(faixa))
+        anterior = np.where(faixa > 0, acumuladas[linhas, np.maximum(faixa - 1, 0)], 0)
+        fracao = (alvo - anterior) / np.maximum(contagens[linhas, faixa], 1)
+        resultado[percentil] = -LIMITE_LOG + (faixa + fracao) * largura
+    return resultado
+
+def simular_cenarios(precos, datas, horizonte, modelo='bootstrap', caminhos=20000, semente=42):
+    # precos e datas em ordem cronológica; a simulação parte do último preço
+    retornos = retornos_logaritmicos(precos)
+    preco_inicial = float(np.asarray(precos)[-1])
+    tamanhos = [min(TAMANHO_LOTE, caminhos - inicio) for inicio in range(0, caminhos, TAMANHO_LOTE)]
+    # Uma semente derivada da principal para cada lote: a mesma semente reproduz os mesmos cenários
+    lotes = list(zip(tamanhos, np.random.SeedSequence(semente).spawn(len(tamanhos))))
+    contagens, soma = reduzir_lotes(modelo, retornos, horizonte, lotes)
+
+    ultima_data = pd.Timestamp(np.asarray(datas)[-1])
+    bandas = pd.DataFrame({'Data': pd.bdate_range(ultima_data + pd.Timedelta(days=1), periods=horizonte)})
+    for percentil, log_relativo in percentis_histograma(contagens, PERCENTIS).items():
+        bandas[f'P{percentil}'] = preco_inicial * np.exp(log_relativo)
+    bandas['Media'] = preco_inicial * soma / caminhos
+    return bandas
@@ -0,0 +1,71 @@
+import heapq
+import numpy as np
+import pandas as pd
+from dados import COLUNA_PRECO
+from indice_intervalos import construir_tabela_esparsa, consultar_tabela_esparsa, posicoes_intervalo
+
+# Índice de choques de retorno: construído uma vez sobre todo o histórico, responde
+# "os N maiores movimentos entre a data A e a data B" sem percorrer o intervalo.
+
+JANELA_ZSCORE = 60
+
+class IndiceChoques:
+    def __init__(self, dados, janela_zscore=JANELA_ZSCORE):
+        serie = dados[['Data', COLUNA_PRECO]].dropna().sort_values('Data').drop_duplicates(subset='Data', keep='last')
+        precos = serie[COLUNA_PRECO].to_numpy(dtype=float)
+        retornos = pd.Series(precos).pct_change()
+        # Média e desvio da janela anterior, para que o próprio choque não amorteça o z-score
+        media = retornos.rolling(janela_zscore).mean().shift(1)
+        desvio = retornos.rolling(janela_zscore).std().shift(1)
+
+        # O primeiro dia não tem retorno; a partir daqui as posições são as dos retornos
+        self.datas = serie['Data'].to_numpy()[1:]
+        self.precos = precos[1:]
+        self.retornos = retornos.to_numpy()[1:]
+        self.zscores = ((retornos - media) / desvio).to_numpy()[1:]
+
+        self.magnitudes = {
+            'retorno': np.abs(self.retornos),
+            'zscore': np.nan_to_num(np.abs(self.zscores), nan=0.0),
+        }
+        self.tabelas = {criterio: construir_tabela_esparsa(valores) for criterio, valores in self.magnitudes.items()}
+
+    def posicoes(self, data_inicio, data_fim):
+        return posicoes_intervalo(self.datas, data_inicio, data_fim)
+
+    def serie(self, data_inicio, data_fim):
+        inicio, fim = self.posicoes(data_inicio, data_fim)
+        return pd.DataFrame({
+            'Data': self.datas[inicio:fim + 1],
+            'Preco': self.precos[inicio:fim + 1],
+            'Retorno': self.retornos[inicio:fim + 1],
+            'Z_Score': self.zscores[inicio:fim + 1],
+        })
+
+    def maiores_choques(self, data_inicio, data_fim, n=10, criterio='retorno'):
+        # Fila de prioridade sobre sub-intervalos: cada retirada divide o intervalo em torno do máximo,
+        # custando O(n log n) consultas O(1) independentemente do tamanho do período
+        inicio, fim = self.posicoes(data_inicio, data_fim)
+        magnitudes, tabela = self.magnitudes[criterio], self.tabelas[criterio]
+        fila = []
+
+        def empilhar(esquerda, direita):
+            if esquerda <= direita:
+                posicao = consultar_tabela_esparsa(tabela, magnitudes, esquerda, direita)
+                heapq.heappush(fila, (-magnitudes[posicao], posicao, esquerda, direita))
+
+        empilhar(inicio, fim)
+        selecionados = []
+        while fila and len(selecionados) < n:
+            _, posicao, esquerda, direita = heapq.heappop(fila)
+            selecionados.append(posicao)
+            empilhar(esquerda, posicao - 1)
+            empilhar(posicao + 1, direita)
+
+        selecionados = np.array(selecionados, dtype=int)
+        return pd.DataFrame({
+            'Data': self.datas[selecionados],
+            'Preco': self.precos[selecionados],
+            'Retorno': self.retornos[selecionados],
+            'Z_Score': self.zscores[selecionados],
+        })
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from indice_intervalos import posicoes_intervalo
+
+# Comparação de qualquer número de períodos do preço do Brent. Quartis, bigodes, outliers e diferenças
+# entre períodos são calculados no servidor; os gráficos recebem só esses resumos, não os preços brutos.
+
+CORES_PADRAO = ['blue', 'red', 'green', 'orange', 'purple', 'brown', 'teal', 'gray']
+
+def resumir_valores(valores):
+    if len(valores) == 0:
+        return None
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    iqr = q3 - q1
+    limite_inferior, limite_superior = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    dentro = (valores >= limite_inferior) & (valores <= limite_superior)
+    # Os bigodes vão até o valor mais extremo dentro de 1,5 IQR, como no go.Box
+    return {
+        'quantidade': int(len(valores)),
+        'minimo': float(valores.min()),
+        'q1': float(q1),
+        'mediana': float(mediana),
+        'q3': float(q3),
+        'maximo': float(valores.max()),
+        'bigode_inferior': float(valores[dentro].min()),
+        'bigode_superior': float(valores[dentro].max()),
+        'media': float(valores.mean()),
+        'desvio': float(valores.std(ddof=1)) if len(valores) > 1 else 0.0,
+        'outliers': valores[~dentro],
+    }
+
+def comparar_periodos(datas, precos, periodos):
+    # periodos: sequência de (nome, data_inicio, data_fim), com datas inclusivas; datas e precos ordenados por data
+    resumos = []
+    for nome, data_inicio, data_fim in periodos:
+        inicio, fim = posicoes_intervalo(datas, data_inicio, data_fim)
+        resumo = resumir_valores(precos[inicio:fim + 1])
+        if resumo is not None:
+            resumos.append({'nome': nome, 'inicio': pd.Timestamp(data_inicio), 'fim': pd.Timestamp(data_fim), **resumo})
+    return resumos
+
+def tabela_comparacao(resumos):
+    if not resumos:
+        return pd.DataFrame()
+    tabela = pd.DataFrame([{chave: valor for chave, valor in resumo.items() if chave != 'outliers'} for resumo in resumos])
+    tabela['outliers'] = [len(resumo['outliers']) for resumo in resumos]
+    # Diferenças em relação ao primeiro período e ao período anterior
+    tabela['delta_mediana_primeiro_%'] = (tabela['mediana'] / tabela['mediana'].iloc[0] - 1) * 100
+    tabela['delta_mediana_anterior_%'] = tabela['mediana'].pct_change() * 100
+    tabela['delta_media_anterior_%'] = tabela['media'].pct_change() * 100
+    numericas = tabela.select_dtypes('number').columns
+    tabela[numericas] = tabela[numericas].round(2)
+    return tabela
+
+def criar_figura_box(resumos, titulo, cores=CORES_PADRAO):
+    fig = go.Figure()
+    for i, resumo in enumerate(resumos):
+        cor = cores[i % len(cores)]
+        fig.add_trace(go.Box(
+            x=[resumo['nome']],
+            q1=[resumo['q1']], median=[resumo['mediana']], q3=[resumo['q3']],
+            lowerfence=[resumo['bigode_inferior']], upperfence=[resumo['bigode_superior']],
+            mean=[resumo['media']], sd=[resumo['desvio']],
+            name=resumo['nome'],
+            marker_color=cor,
+            boxpoints=False,
+        ))
+        if len(resumo['outliers']):
+            fig.add_trace(go.Scatter(
+                x=[resumo['nome']] * len(resumo['outliers']), y=resumo['outliers'],
+                mode='markers', marker=dict(color=cor, size=4),
+                showlegend=False, hovertemplate='%{y:.2f}<extra>Outlier</extra>',
+            ))
+
+    fig.update_layout(
+        title=titulo,
+        yaxis_title='Preço (USD)',
+        # Uma caixa por categoria: em 'group' o plotly reservaria um espaço por trace em cada categoria e as
+        # caixas sairiam do centro, onde ficam os outliers
+        boxmode='overlay'
+    )
+    return fig
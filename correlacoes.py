@@ -0,0 +1,124 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from dados import COLUNA_PRECO, versao_arquivo
+from etl import converter_datas, converter_precos, detectar_codificacao, normalizar_nome
+
+# Correlações e betas móveis do Brent contra séries macroeconômicas locais (dólar, inflação, fretes...).
+# Cada arquivo CSV ou Parquet de DIRETORIO_MACRO tem uma coluna de data e uma ou mais colunas numéricas;
+# cada coluna vira uma série, ligada aos pregões do Brent por um merge as-of (o último valor publicado até o
+# pregão). As janelas móveis saem de somas acumuladas: uma passada O(n) por série para todas as janelas.
+
+DIRETORIO_MACRO = 'dados_macro'
+EXTENSOES_MACRO = ('.csv', '.parquet')
+ALIASES_DATA = {'data', 'date', 'ds', 'periodo', 'mes'}
+JANELAS_PADRAO = [63, 252]
+TRANSFORMACOES = {'variacao': 'Variação percentual', 'nivel': 'Nível'}
+FREQUENCIAS = {'D': 'Diária (pregões)', 'W-FRI': 'Semanal', 'ME': 'Mensal'}
+# Fração mínima da janela com observações válidas para que a correlação seja mostrada
+COBERTURA_MINIMA = 0.8
+
+def arquivos_macro(diretorio=DIRETORIO_MACRO):
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(os.path.join(diretorio, nome) for nome in os.listdir(diretorio) if nome.lower().endswith(EXTENSOES_MACRO))
+
+def versao_macro(diretorio=DIRETORIO_MACRO):
+    return '|'.join(f"{os.path.basename(caminho)}:{versao_arquivo(caminho)}" for caminho in arquivos_macro(diretorio))
+
+def ler_arquivo_macro(caminho):
+    if caminho.lower().endswith('.parquet'):
+        return pd.read_parquet(caminho)
+    return pd.read_csv(caminho, sep=None, engine='python', dtype=str, encoding=detectar_codificacao(caminho))
+
+def carregar_series_macro(diretorio=DIRETORIO_MACRO):
+    # Devolve {nome da série: Series indexada por data}; arquivos sem coluna de data são ignorados
+    series = {}
+    for caminho in arquivos_macro(diretorio):
+        bruto = ler_arquivo_macro(caminho)
+        coluna_data = next((coluna for coluna in bruto.columns if normalizar_nome(coluna) in ALIASES_DATA), None)
+        if coluna_data is None:
+            continue
+        datas = converter_datas(bruto[coluna_data])
+        valores = bruto.drop(columns=coluna_data).apply(converter_precos)
+        valores = valores.loc[:, valores.notna().any()]
+        arquivo = os.path.splitext(os.path.basename(caminho))[0]
+        for coluna in valores.columns:
+            nome = arquivo if len(valores.columns) == 1 else f"{arquivo} - {coluna}"
+            serie = pd.Series(valores[coluna].to_numpy(), index=datas, name=nome).dropna()
+            serie = serie[serie.index.notna()]
+            series[nome] = serie[~serie.index.duplicated(keep='last')].sort_index()
+    return series
+
+def alinhar_series(precos, series):
+    # Uma linha por pregão do Brent; cada série entra com o último valor conhecido até o pregão, desde que
+    # não esteja desatualizada (mais de dois intervalos típicos da própria série)
+    painel = precos[['Data', COLUNA_PRECO]].dropna().drop_duplicates('Data', keep='last').sort_values('Data')
+    painel = painel.assign(Data=painel['Data'].astype('datetime64[ns]')).rename(columns={COLUNA_PRECO: 'Brent'})
+    for nome, serie in series.items():
+        if len(serie) < 2:
+            continue
+        intervalo = pd.Series(serie.index).diff().median()
+        direita = pd.DataFrame({'Data': serie.index.astype('datetime64[ns]'), nome: serie.to_numpy()})
+        painel = pd.merge_asof(painel, direita, on='Data', direction='backward', tolerance=max(2 * intervalo, pd.Timedelta(days=7)))
+    return painel.set_index('Data')
+
+def preparar_painel(painel, transformacao='variacao', frequencia='D'):
+    if frequencia != 'D':
+        painel = painel.resample(frequencia).last()
+    if transformacao == 'variacao':
+        # Sem preencher lacunas: um dia sem valor não vira variação zero
+        painel = painel.pct_change(fill_method=None)
+    return painel.replace([np.inf, -np.inf], np.nan)
+
+def acumular(valores):
+    return np.concatenate([np.zeros((1, valores.shape[1])), np.cumsum(valores, axis=0)])
+
+def somas_moveis(acumuladas, janela):
+    # Soma de cada janela terminando em t: S[t + 1] - S[t + 1 - janela]; antes da primeira janela completa, NaN
+    somas = np.full((len(acumuladas) - 1,) + acumuladas.shape[1:], np.nan)
+    somas[janela - 1:] = acumuladas[janela:] - acumuladas[:-janela]
+    return somas
+
+def correlacoes_moveis(brent, series, janelas):
+    # brent: (n,); series: (n, k). Somas acumuladas de x, y, x², y² e xy (só onde os dois existem) calculadas
+    # uma vez; cada janela é uma diferença entre elas. Valores centrados na média para não perder precisão
+    y = np.asarray(brent, dtype=float)[:, None]
+    x = np.asarray(series, dtype=float)
+    validos = np.isfinite(x) & np.isfinite(y)
+    x = np.where(validos, x - np.nanmean(np.where(validos, x, np.nan), axis=0), 0.0)
+    y = np.where(validos, y - np.nanmean(np.where(validos, y, np.nan), axis=0), 0.0)
+
+    acumuladas = {nome: acumular(valores) for nome, valores in
+                  {'n': validos.astype(float), 'x': x, 'y': y, 'xx': x * x, 'yy': y * y, 'xy': x * y}.items()}
+
+    resultados = {}
+    for janela in janelas:
+        n, sx, sy, sxx, syy, sxy = (somas_moveis(acumuladas[nome], janela) for nome in ['n', 'x', 'y', 'xx', 'yy', 'xy'])
+        covariancia = n * sxy - sx * sy
+        variancia_x = n * sxx - sx * sx
+        variancia_y = n * syy - sy * sy
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlacao = covariancia / np.sqrt(variancia_x * variancia_y)
+            # Beta do Brent em relação à série: quanto o Brent varia por unidade de variação dela
+            beta = covariancia / variancia_x
+        insuficiente = ~(n >= max(3, COBERTURA_MINIMA * janela)) | (variancia_x <= 0) | (variancia_y <= 0)
+        correlacao[insuficiente] = np.nan
+        beta[insuficiente] = np.nan
+        resultados[janela] = (np.clip(correlacao, -1, 1), beta)
+    return resultados
+
+def calcular_correlacoes(painel, nomes, janelas, transformacao='variacao', frequencia='D'):
+    # Tabela longa: Data, Serie, Janela, Correlacao, Beta
+    preparado = preparar_painel(painel[['Brent'] + list(nomes)], transformacao, frequencia)
+    resultados = correlacoes_moveis(preparado['Brent'].to_numpy(), preparado[list(nomes)].to_numpy(), janelas)
+    partes = []
+    for janela, (correlacao, beta) in resultados.items():
+        for indice, nome in enumerate(nomes):
+            partes.append(pd.DataFrame({'Data': preparado.index, 'Serie': nome, 'Janela': janela,
+                                        'Correlacao': correlacao[:, indice], 'Beta': beta[:, indice]}))
+    if not partes:
+        return pd.DataFrame(columns=['Data', 'Serie', 'Janela', 'Correlacao', 'Beta'])
+    return pd.concat(partes, ignore_index=True).dropna(subset=['Correlacao'])
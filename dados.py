@@ -0,0 +1,80 @@
+import json
+import os
+import pandas as pd
+
+# Camada de dados compartilhada entre o dashboard (tech_challenge_4.py) e a API HTTP (api_http.py)
+
+CAMINHO_DADOS = 'petroleo.xlsx'
+CAMINHO_PREVISOES = 'Filtered_DataFrame_2020-2025.csv'
+DIRETORIO_MODELOS = 'modelos'
+# Armazenamento gerado por etl.py; quando existe, é a fonte preferida de todos os consumidores
+DIRETORIO_CANONICO = 'dados_canonicos'
+CAMINHO_PRECOS_CANONICO = os.path.join(DIRETORIO_CANONICO, 'precos.parquet')
+CAMINHO_PREVISOES_CANONICO = os.path.join(DIRETORIO_CANONICO, 'previsoes.parquet')
+COLUNA_PRECO = 'Preco_petroleo_bruto_Brent_FOB'
+DATA_CORTE_PREVISAO = '2024-05-20'
+JANELAS_MEDIAS_MOVEIS = [30, 90, 365]
+
+def versao_arquivo(caminho_arquivo=CAMINHO_DADOS):
+    info = os.stat(caminho_arquivo)
+    return f"{info.st_mtime_ns}-{info.st_size}"
+
+def carregar_dados(caminho_arquivo):
+    dados = pd.read_excel(caminho_arquivo, sheet_name='Planilha1')
+    dados = dados.loc[:, ~dados.columns.duplicated()]
+    if 'Preço - petróleo bruto - Brent (FOB)' in dados.columns:
+        dados = dados.rename(columns={'Preço - petróleo bruto - Brent (FOB)': COLUNA_PRECO})
+    dados['Data'] = pd.to_datetime(dados['Data'], errors='coerce')
+    dados[COLUNA_PRECO] = pd.to_numeric(dados[COLUNA_PRECO], errors='coerce')
+    dados = dados.dropna(subset=['Data', COLUNA_PRECO])
+    return dados
+
+def caminho_precos():
+    return CAMINHO_PRECOS_CANONICO if os.path.exists(CAMINHO_PRECOS_CANONICO) else CAMINHO_DADOS
+
+def versao_dados():
+    caminho = caminho_precos()
+    return f"{caminho}:{versao_arquivo(caminho)}"
+
+def carregar_precos():
+    # Dados já limpos e tipados pelo ETL; sem ele, a planilha original é processada como antes
+    caminho = caminho_precos()
+    if caminho.endswith('.parquet'):
+        return pd.read_parquet(caminho, columns=['Data', COLUNA_PRECO])
+    return carregar_dados(caminho)
+
+def calcular_medias_moveis(dados, janelas=JANELAS_MEDIAS_MOVEIS):
+    # As médias móveis são calculadas em ordem cronológica, olhando apenas para os dias anteriores
+    indicadores = dados.sort_values('Data').reset_index(drop=True)
+    for janela in janelas:
+        indicadores[f'Media_Movel_{janela}'] = indicadores['Preco_petroleo_bruto_Brent_FOB'].rolling(window=janela).mean()
+    indicadores['Media_Geral'] = indicadores['Preco_petroleo_bruto_Brent_FOB'].mean()
+    return indicadores
+
+def caminho_previsoes():
+    # Usa a previsão do último modelo gerado por treinamento.py, se houver; senão o CSV publicado com o projeto
+    caminho_atual = os.path.join(DIRETORIO_MODELOS, 'atual.json')
+    if os.path.exists(caminho_atual):
+        with open(caminho_atual, encoding='utf-8') as arquivo:
+            versao = json.load(arquivo)['versao']
+        caminho = os.path.join(DIRETORIO_MODELOS, versao, 'previsao.csv')
+        if os.path.exists(caminho):
+            return caminho
+    if os.path.exists(CAMINHO_PREVISOES_CANONICO):
+        return CAMINHO_PREVISOES_CANONICO
+    return CAMINHO_PREVISOES
+
+def carregar_previsoes(caminho_arquivo=None):
+    caminho_arquivo = caminho_arquivo or caminho_previsoes()
+    if caminho_arquivo.endswith('.parquet'):
+        previsoes = pd.read_parquet(caminho_arquivo)
+    else:
+        previsoes = pd.read_csv(caminho_arquivo)
+        previsoes['Data'] = pd.to_datetime(previsoes['Data'])
+    previsoes = previsoes[previsoes['Data'] >= '2020-01-01']
+    if 'Tipo' not in previsoes.columns:
+        previsoes = previsoes[previsoes['Data'] <= '2025-05-20']
+        # Até a data de corte os valores são históricos; depois dela, previsões do modelo
+        previsoes['Tipo'] = (previsoes['Data'] > DATA_CORTE_PREVISAO).map({True: 'Previsao', False: 'Historico'})
+    colunas = [coluna for coluna in ['Data', 'Preco', 'Preco_Inferior', 'Preco_Superior', 'Tipo'] if coluna in previsoes.columns]
+    return previsoes[colunas].sort_values('Data').reset_index(drop=True)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from dados import COLUNA_PRECO
+
+# Decomposição STL (Cleveland et al., 1990) do preço do Brent em tendência, sazonalidade anual e resíduo,
+# com LOESS local linear e pesos robustos (bisquare) para que choques como 2008 e 2020 não distorçam a
+# tendência nem a sazonalidade. Os pregões são levados a uma grade diária (dias sem preço interpolados),
+# onde um ano tem PERIODO_ANUAL pontos; os componentes voltam só para os dias com preço.
+
+PERIODO_ANUAL = 365
+# Larguras (ímpares) das suavizações: a sazonal em anos, a de tendência e a passa-baixa em dias
+LARGURA_SAZONAL = 11
+LARGURA_TENDENCIA = 635
+LARGURA_PASSA_BAIXA = 367
+ITERACOES_INTERNAS = 2
+ITERACOES_ROBUSTAS = 5
+# LOESS calculado a cada "salto" pontos e interpolado entre eles, como no STL original
+FRACAO_SALTO = 0.1
+TAMANHO_BLOCO = 512
+
+def loess(y, largura, pontos, pesos=None):
+    # y: (n,) ou (n, colunas) em posições 0..n-1 igualmente espaçadas; ajuste local linear com pesos
+    # tricúbicos sobre os "largura" vizinhos mais próximos de cada ponto pedido
+    y = np.asarray(y, dtype=float)
+    matriz = y.reshape(len(y), -1)
+    pesos = np.ones_like(matriz) if pesos is None else np.asarray(pesos, dtype=float).reshape(matriz.shape)
+    n = len(matriz)
+    janela = min(largura, n)
+    pontos = np.asarray(pontos, dtype=float)
+    resultado = np.empty((len(pontos), matriz.shape[1]))
+
+    for inicio in range(0, len(pontos), TAMANHO_BLOCO):
+        bloco = pontos[inicio:inicio + TAMANHO_BLOCO]
+        primeiros = np.clip(np.ceil(bloco - janela / 2).astype(int), 0, n - janela)
+        vizinhos = primeiros[:, None] + np.arange(janela)
+        distancias = vizinhos - bloco[:, None]
+        # Com menos pontos que a largura, o raio cresce como no STL para continuar suavizando
+        raio = np.abs(distancias).max(axis=1) + max(largura - n, 0) / 2
+        escala = np.abs(distancias) / np.where(raio > 0, raio, 1)[:, None]
+        tricubo = np.clip(1 - escala ** 3, 0, None) ** 3
+        w = tricubo[:, :, None] * pesos[vizinhos]
+        x = distancias[:, :, None]
+        soma_w = w.sum(axis=1)
+        soma_x = (w * x).sum(axis=1)
+        soma_y = (w * matriz[vizinhos]).sum(axis=1)
+        soma_xx = (w * x * x).sum(axis=1)
+        soma_xy = (w * x * matriz[vizinhos]).sum(axis=1)
+        # Valor da reta local no próprio ponto (x = 0); sem variação em x, vale a média ponderada
+        denominador = soma_w * soma_xx - soma_x ** 2
+        inclinacao = np.divide(soma_w * soma_xy - soma_x * soma_y, denominador,
+                               out=np.zeros_like(denominador), where=np.abs(denominador) > 1e-12)
+        resultado[inicio:inicio + len(bloco)] = np.divide(soma_y - inclinacao * soma_x, soma_w,
+                                                          out=np.zeros_like(soma_w), where=soma_w > 0)
+    return resultado.reshape((len(pontos),) + y.shape[1:])
+
+def loess_com_salto(y, largura, pesos=None):
+    n = len(y)
+    salto = max(1, int(np.ceil(FRACAO_SALTO * largura)))
+    pontos = np.unique(np.append(np.arange(0, n, salto), n - 1))
+    return np.interp(np.arange(n), pontos, loess(y, largura, pontos, pesos))
+
+def media_movel(valores, largura):
+    acumulada = np.concatenate([[0.0], np.cumsum(valores)])
+    return (acumulada[largura:] - acumulada[:-largura]) / largura
+
+def suavizar_subseries(valores, pesos, periodo, largura):
+    # Cada posição do ano (o k-ésimo dia) é uma subsérie suavizada ao longo dos anos e estendida um
+    # ano para cada lado; as subséries são colunas de uma matriz anos x período e saem todas de uma vez
+    n = len(valores)
+    anos = -(-n // periodo)
+    preenchidos = np.zeros(anos * periodo)
+    pesos_preenchidos = np.zeros(anos * periodo)
+    preenchidos[:n], pesos_preenchidos[:n] = valores, pesos
+    matriz, matriz_pesos = preenchidos.reshape(anos, periodo), pesos_preenchidos.reshape(anos, periodo)
+    estendida = loess(matriz, largura, np.arange(-1, anos + 1), matriz_pesos)
+    # Volta à ordem do tempo, com um período a mais no início e no fim
+    return estendida.ravel()[:n + 2 * periodo]
+
+def stl(valores, periodo=PERIODO_ANUAL, largura_sazonal=LARGURA_SAZONAL, largura_tendencia=LARGURA_TENDENCIA,
+        largura_passa_baixa=LARGURA_PASSA_BAIXA, iteracoes_internas=ITERACOES_INTERNAS, iteracoes_robustas=ITERACOES_ROBUSTAS):
+    valores = np.asarray(valores, dtype=float)
+    n = len(valores)
+    tendencia = np.zeros(n)
+    robustez = np.ones(n)
+    for iteracao in range(iteracoes_robustas + 1):
+        for _ in range(iteracoes_internas):
+            ciclo = suavizar_subseries(valores - tendencia, robustez, periodo, largura_sazonal)
+            # Passa-baixa: remove do ciclo o que é tendência e não sazonalidade
+            passa_baixa = media_movel(media_movel(media_movel(ciclo, periodo), periodo), 3)
+            passa_baixa = loess_com_salto(passa_baixa, largura_passa_baixa)
+            sazonalidade = ciclo[periodo:n + periodo] - passa_baixa
+            tendencia = loess_com_salto(valores - sazonalidade, largura_tendencia, robustez)
+        residuo = valores - tendencia - sazonalidade
+        if iteracao == iteracoes_robustas:
+            break
+        # Pesos bisquare: resíduos acima de 6 medianas absolutas não influenciam a próxima passada
+        escala = 6 * np.median(np.abs(residuo))
+        robustez = np.clip(1 - (np.abs(residuo) / escala) ** 2, 0, None) ** 2 if escala > 0 else np.ones(n)
+    return tendencia, sazonalidade, residuo
+
+def decompor_precos(precos):
+    serie = precos[['Data', COLUNA_PRECO]].dropna().drop_duplicates('Data', keep='last').sort_values('Data')
+    serie = serie.set_index('Data')[COLUNA_PRECO]
+    grade = serie.reindex(pd.date_range(serie.index.min(), serie.index.max(), freq='D')).interpolate(limit_direction='both')
+
+    tendencia, sazonalidade, residuo = stl(grade.to_numpy())
+    componentes = pd.DataFrame({'Data': grade.index, 'Tendencia_STL': tendencia, 'Sazonalidade_STL': sazonalidade, 'Residuo_STL': residuo})
+    return componentes[componentes['Data'].isin(serie.index)].reset_index(drop=True)
+
+def perfil_sazonal(componentes, anos=5):
+    # Efeito médio da sazonalidade por mês nos últimos anos, como o gráfico de componente anual do Prophet
+    recentes = componentes[componentes['Data'] > componentes['Data'].max() - pd.DateOffset(years=anos)]
+    perfil = recentes.groupby(recentes['Data'].dt.month)['Sazonalidade_STL'].mean()
+    return perfil.rename_axis('Mes').reset_index()
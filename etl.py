@@ -0,0 +1,186 @@
+import argparse
+import codecs
+import json
+import os
+import re
+import tempfile
+import unicodedata
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from dados import (CAMINHO_DADOS, CAMINHO_PREVISOES, CAMINHO_PRECOS_CANONICO, CAMINHO_PREVISOES_CANONICO,
+                   DIRETORIO_CANONICO, COLUNA_PRECO)
+
+# ETL único das fontes de preço do Brent: petroleo.xlsx (Planilha1), a exportação CSV do IPEA usada no
+# notebook e o CSV de previsões. Cada arquivo é lido em blocos, com nomes e tipos normalizados, e o resultado
+# vai para o armazenamento colunar em dados_canonicos/ (Parquet), junto de um relatório de validação.
+#
+# Uso: python etl.py --precos petroleo.xlsx 2024-07-02_ipea.csv --previsoes Filtered_DataFrame_2020-2025.csv
+
+TAMANHO_BLOCO = 5000
+CAMINHO_RELATORIO = os.path.join(DIRETORIO_CANONICO, 'relatorio_validacao.json')
+MAIORES_LACUNAS = 10
+
+# Nomes de coluna já normalizados (minúsculas, sem acento) aceitos para cada campo canônico
+ALIASES_DATA = {'data', 'ds', 'date'}
+ALIASES_PRECO = {'preco_petroleo_bruto_brent_fob', 'preco', 'y', 'yhat', 'valor', 'price'}
+
+def normalizar_nome(nome):
+    nome = str(nome).replace('﻿', '').replace('ï»¿', '')
+    nome = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '_', nome.lower()).strip('_')
+
+def detectar_codificacao(caminho):
+    # Percorre o arquivo uma vez com um decodificador incremental: UTF-8 (com ou sem BOM) ou ISO-8859-1
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 16), b''):
+                decodificador.decode(bloco)
+            decodificador.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return 'iso-8859-1'
+    return 'utf-8-sig'
+
+def ler_em_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    if caminho.lower().endswith(('.xlsx', '.xlsm')):
+        planilha = load_workbook(caminho, read_only=True, data_only=True)
+        aba = planilha['Planilha1'] if 'Planilha1' in planilha.sheetnames else planilha.worksheets[0]
+        linhas = aba.iter_rows(values_only=True)
+        cabecalho = next(linhas)
+        bloco = []
+        for linha in linhas:
+            bloco.append(linha)
+            if len(bloco) == tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=cabecalho)
+                bloco = []
+        if bloco:
+            yield pd.DataFrame(bloco, columns=cabecalho)
+        planilha.close()
+    else:
+        yield from pd.read_csv(caminho, encoding=detectar_codificacao(caminho), chunksize=tamanho_bloco)
+
+def converter_datas(valores):
+    # ISO primeiro; o que sobrar é tentado no formato brasileiro (dia/mês/ano)
+    datas = pd.to_datetime(valores, errors='coerce', format='ISO8601')
+    faltantes = datas.isna() & valores.notna()
+    if faltantes.any():
+        datas[faltantes] = pd.to_datetime(valores[faltantes].astype(str), errors='coerce', format='%d/%m/%Y')
+    return datas.astype('datetime64[ns]')
+
+def converter_precos(valores):
+    # Texto (object no pandas 2, str no pandas 3) pode vir com vírgula decimal
+    if not pd.api.types.is_numeric_dtype(valores):
+        valores = valores.astype(str).str.strip().str.replace(',', '.', regex=False)
+    return pd.to_numeric(valores, errors='coerce').astype('float64')
+
+def normalizar_bloco(bloco, caminho):
+    colunas = {coluna: normalizar_nome(coluna) for coluna in bloco.columns}
+    coluna_data = next((coluna for coluna, nome in colunas.items() if nome in ALIASES_DATA), None)
+    coluna_preco = next((coluna for coluna, nome in colunas.items() if nome in ALIASES_PRECO), None)
+    if coluna_data is None or coluna_preco is None:
+        raise ValueError(f"{caminho}: colunas de data e preço não encontradas em {list(bloco.columns)}")
+
+    return pd.DataFrame({
+        'Data': converter_datas(bloco[coluna_data]),
+        COLUNA_PRECO: converter_precos(bloco[coluna_preco]),
+        'Fonte': os.path.basename(caminho),
+    })
+
+def processar_fontes(caminhos, tamanho_bloco=TAMANHO_BLOCO):
+    blocos = []
+    relatorio_fontes = []
+    for caminho in caminhos:
+        lidas = invalidas = nao_positivas = 0
+        for bloco in ler_em_blocos(caminho, tamanho_bloco):
+            normalizado = normalizar_bloco(bloco, caminho)
+            lidas += len(normalizado)
+            validas = normalizado['Data'].notna() & normalizado[COLUNA_PRECO].notna()
+            positivas = normalizado[COLUNA_PRECO] > 0
+            invalidas += int((~validas).sum())
+            nao_positivas += int((validas & ~positivas).sum())
+            blocos.append(normalizado[validas & positivas])
+        relatorio_fontes.append({'arquivo': caminho, 'linhas_lidas': lidas, 'linhas_invalidas': invalidas,
+                                 'precos_nao_positivos': nao_positivas})
+
+    vazio = pd.DataFrame({'Data': pd.Series(dtype='datetime64[ns]'), COLUNA_PRECO: pd.Series(dtype='float64'), 'Fonte': pd.Series(dtype=object)})
+    serie = pd.concat([vazio, *blocos], ignore_index=True)
+    linhas_validas = len(serie)
+    duplicadas = serie.duplicated(subset='Data', keep=False)
+    # Datas presentes em mais de uma linha com preços diferentes
+    conflitos = serie[duplicadas].groupby('Data')[COLUNA_PRECO].nunique()
+    conflitos = conflitos[conflitos > 1]
+    # A fonte listada por último tem prioridade nas datas repetidas
+    serie = serie.drop_duplicates(subset='Data', keep='last').sort_values('Data').reset_index(drop=True)
+    serie['Fonte'] = serie['Fonte'].astype('category')
+
+    relatorio = {
+        'fontes': relatorio_fontes,
+        'linhas_finais': int(len(serie)),
+        'linhas_duplicadas_removidas': int(linhas_validas - len(serie)),
+        'datas_com_conflito': int(len(conflitos)),
+        'exemplos_conflito': [data.strftime('%Y-%m-%d') for data in conflitos.index[:MAIORES_LACUNAS]],
+        **verificar_dias_uteis(serie['Data']),
+    }
+    return serie, relatorio
+
+def verificar_dias_uteis(datas):
+    if datas.empty:
+        return {'inicio': None, 'fim': None, 'dias_uteis_faltantes': 0, 'maiores_lacunas': []}
+
+    esperadas = pd.bdate_range(datas.min(), datas.max())
+    faltantes = esperadas.difference(pd.DatetimeIndex(datas))
+    # Dias úteis faltantes consecutivos formam uma lacuna; feriados isolados aparecem com 1 dia
+    posicoes = esperadas.get_indexer(faltantes)
+    grupos = pd.Series(faltantes).groupby((pd.Series(posicoes).diff() != 1).cumsum())
+    lacunas = sorted(([grupo.iloc[0], grupo.iloc[-1], len(grupo)] for _, grupo in grupos), key=lambda lacuna: -lacuna[2])
+    return {
+        'inicio': datas.min().strftime('%Y-%m-%d'),
+        'fim': datas.max().strftime('%Y-%m-%d'),
+        'dias_uteis_faltantes': int(len(faltantes)),
+        'maiores_lacunas': [{'inicio': inicio.strftime('%Y-%m-%d'), 'fim': fim.strftime('%Y-%m-%d'), 'dias_uteis': dias}
+                            for inicio, fim, dias in lacunas[:MAIORES_LACUNAS]],
+    }
+
+def gravar_parquet(tabela, caminho):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.parquet')
+    os.close(descritor)
+    tabela.to_parquet(temporario, index=False)
+    os.replace(temporario, caminho)
+
+def executar_etl(fontes_precos, fontes_previsoes, tamanho_bloco=TAMANHO_BLOCO):
+    relatorio = {'gerado_em': datetime.now().isoformat(timespec='seconds')}
+
+    precos, relatorio['precos'] = processar_fontes(fontes_precos, tamanho_bloco)
+    gravar_parquet(precos, CAMINHO_PRECOS_CANONICO)
+
+    if fontes_previsoes:
+        previsoes, relatorio['previsoes'] = processar_fontes(fontes_previsoes, tamanho_bloco)
+        gravar_parquet(previsoes.rename(columns={COLUNA_PRECO: 'Preco'}), CAMINHO_PREVISOES_CANONICO)
+
+    with open(CAMINHO_RELATORIO, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    return relatorio
+
+def main():
+    parser = argparse.ArgumentParser(description="Normaliza as fontes de preço do Brent em um armazenamento único")
+    parser.add_argument('--precos', nargs='+', default=[CAMINHO_DADOS],
+                        help="Arquivos de preço histórico (xlsx ou CSV); o último tem prioridade nas datas repetidas")
+    parser.add_argument('--previsoes', nargs='*', default=[CAMINHO_PREVISOES], help="Arquivos CSV de previsão")
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO)
+    argumentos = parser.parse_args()
+
+    relatorio = executar_etl(argumentos.precos, argumentos.previsoes, argumentos.tamanho_bloco)
+    for nome in ('precos', 'previsoes'):
+        if nome in relatorio:
+            resumo = relatorio[nome]
+            print(f"{nome}: {resumo['linhas_finais']} linhas de {resumo['inicio']} a {resumo['fim']}, "
+                  f"{resumo['linhas_duplicadas_removidas']} duplicadas, {resumo['datas_com_conflito']} conflitos, "
+                  f"{resumo['dias_uteis_faltantes']} dias úteis faltantes")
+    print(f"Relatório de validação em {CAMINHO_RELATORIO}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Serialização compacta das figuras Plotly enviadas ao navegador. O plotly já codifica arrays numéricos do
+# numpy como typed arrays (base64), mas datas e listas Python viram texto JSON ponto a ponto. Aqui as datas
+# viram milissegundos desde 1970 em float64 (o eixo é marcado como 'date') e listas numéricas viram arrays.
+# O tamanho serializado de cada figura é estimado pelos arrays (sem gerar o JSON); acima do orçamento, as
+# linhas longas são reduzidas guardando o primeiro, o último, o mínimo e o máximo de cada bloco, o que
+# preserva picos e quedas.
+
+ORCAMENTO_BYTES_PADRAO = 1_000_000
+MINIMO_PONTOS_REDUCAO = 500
+TAMANHO_MINIMO_ARRAY = 100
+TENTATIVAS_REDUCAO = 3
+TIPOS_REDUZIVEIS = ('scatter', 'scattergl')
+# Atributos com um valor por ponto, cortados junto com x e y na redução
+ATRIBUTOS_POR_PONTO = [('text',), ('hovertext',), ('customdata',), ('ids',), ('marker', 'color'), ('marker', 'size'),
+                       ('marker', 'symbol'), ('marker', 'opacity'), ('marker', 'line', 'color'), ('marker', 'line', 'width')]
+
+def eh_array_datas(valores):
+    if isinstance(valores, np.ndarray):
+        return np.issubdtype(valores.dtype, np.datetime64)
+    return isinstance(valores, (list, tuple)) and len(valores) > 0 and isinstance(valores[0], pd.Timestamp)
+
+def datas_para_milissegundos(valores):
+    datas = pd.DatetimeIndex(pd.to_datetime(np.asarray(valores)))
+    milissegundos = datas.as_unit('ms').asi8.astype('float64')
+    milissegundos[datas.isna()] = np.nan
+    return milissegundos
+
+def array_numerico(valores):
+    if isinstance(valores, (list, tuple)) and len(valores) >= TAMANHO_MINIMO_ARRAY:
+        try:
+            return np.asarray(valores, dtype='float64')
+        except (TypeError, ValueError):
+            return None
+    return None
+
+def nome_eixo(trace, letra):
+    # 'x' -> 'xaxis', 'x2' -> 'xaxis2', como no layout
+    referencia = getattr(trace, f'{letra}axis', None) or letra
+    return f'{letra}axis{referencia[1:]}'
+
+def compactar_traces(fig):
+    eixos_data = set()
+    for trace in fig.data:
+        for letra in ('x', 'y'):
+            valores = getattr(trace, letra, None)
+            if valores is None:
+                continue
+            if eh_array_datas(valores) and len(valores) >= TAMANHO_MINIMO_ARRAY:
+                trace[letra] = datas_para_milissegundos(valores)
+                eixos_data.add(nome_eixo(trace, letra))
+            else:
+                numeros = array_numerico(valores)
+                if numeros is not None:
+                    trace[letra] = numeros
+    for eixo in eixos_data:
+        # Sem o tipo explícito, o plotly.js trataria os milissegundos como um eixo linear
+        if fig.layout[eixo].type in (None, '-'):
+            fig.layout[eixo].type = 'date'
+
+def reduzir_pontos(x, y, maximo_pontos):
+    # Índices do primeiro, último, mínimo e máximo de cada bloco, em ordem, entre os valores finitos de y
+    validos = np.flatnonzero(np.isfinite(y))
+    blocos = max(1, maximo_pontos // 4)
+    if len(validos) <= maximo_pontos:
+        return validos
+    bloco = np.arange(len(validos)) * blocos // len(validos)
+    ordem = np.lexsort((y[validos], bloco))
+    inicios = np.flatnonzero(np.r_[True, bloco[ordem][1:] != bloco[ordem][:-1]])
+    fins = np.r_[inicios[1:], len(ordem)] - 1
+    limites_blocos = np.flatnonzero(np.r_[True, bloco[1:] != bloco[:-1]])
+    escolhidos = np.concatenate([
+        ordem[inicios], ordem[fins],
+        limites_blocos, np.r_[limites_blocos[1:] - 1, len(validos) - 1],
+    ])
+    return validos[np.unique(escolhidos)]
+
+def reduzir_traces(fig, fator):
+    reduzidas = 0
+    for trace in fig.data:
+        if trace.type not in TIPOS_REDUZIVEIS:
+            continue
+        x, y = trace.x, trace.y
+        if x is None or y is None or len(y) < MINIMO_PONTOS_REDUCAO:
+            continue
+        y = np.asarray(y, dtype='float64') if not isinstance(y, np.ndarray) else y
+        if not np.issubdtype(y.dtype, np.number):
+            continue
+        maximo_pontos = max(MINIMO_PONTOS_REDUCAO, int(len(y) * fator))
+        if maximo_pontos >= len(y):
+            continue
+        indices = reduzir_pontos(np.asarray(x), y.astype('float64'), maximo_pontos)
+        for caminho in ATRIBUTOS_POR_PONTO:
+            valores = trace[caminho]
+            if valores is not None and not isinstance(valores, str) and np.ndim(valores) > 0 and len(valores) == len(y):
+                trace[caminho] = np.asarray(valores)[indices] if np.ndim(valores) == 1 else np.asarray(valores, dtype=object)[indices].tolist()
+        trace.x = np.asarray(x)[indices]
+        trace.y = y[indices]
+        reduzidas += 1
+    return reduzidas
+
+def contar_pontos(fig):
+    return sum(len(trace.y) for trace in fig.data if getattr(trace, 'y', None) is not None)
+
+# Atributos que podem levar um array por trace; o resto do trace (tipo, nome, estilo) entra como uma constante
+ATRIBUTOS_ARRAYS = [('x',), ('y',), ('z',), ('lat',), ('lon',), ('locations',)] + ATRIBUTOS_POR_PONTO
+BYTES_FIXOS_TRACE = 300
+
+def tamanho_array(valores):
+    # Bytes aproximados no JSON: arrays numéricos vão em base64 (4 caracteres a cada 3 bytes)
+    if valores is None:
+        return 0
+    if isinstance(valores, np.ndarray) and valores.dtype.kind in 'biuf':
+        return 4 * -(-valores.nbytes // 3) + 40
+    if isinstance(valores, np.ndarray):
+        valores = valores.tolist()
+    return len(json.dumps(valores, default=str))
+
+def atributo_trace(trace, caminho):
+    valor = trace
+    for nome in caminho:
+        # Atributo que não existe nesse tipo de trace (lat num scatter, x num choropleth) ou que não foi definido
+        if valor is None or nome not in valor:
+            return None
+        valor = valor[nome]
+    return valor
+
+def tamanho_traces(traces):
+    return sum(BYTES_FIXOS_TRACE + sum(tamanho_array(atributo_trace(trace, caminho)) for caminho in ATRIBUTOS_ARRAYS)
+               for trace in traces)
+
+def tamanho_serializado(fig):
+    # Estimativa a partir do tamanho dos arrays, sem gerar o JSON da figura inteira
+    layout = len(json.dumps(fig.layout.to_plotly_json(), default=str))
+    return layout + tamanho_traces(fig.data) + sum(tamanho_traces(quadro.data or ()) for quadro in fig.frames)
+
+def preparar_figura(fig, orcamento_bytes=ORCAMENTO_BYTES_PADRAO, reduzir=True):
+    # Trabalha sobre uma cópia: figuras em st.cache_resource são compartilhadas entre sessões
+    fig = go.Figure(fig)
+    compactar_traces(fig)
+    tamanho = tamanho_serializado(fig)
+    relatorio = {
+        'titulo': fig.layout.title.text or '',
+        'bytes_originais': tamanho,
+        'pontos_originais': contar_pontos(fig),
+        'reduzida': False,
+    }
+
+    for _ in range(TENTATIVAS_REDUCAO if reduzir else 0):
+        if tamanho <= orcamento_bytes:
+            break
+        # Margem de 10% porque parte do JSON (layout, frames, textos) não diminui com a redução
+        if not reduzir_traces(fig, orcamento_bytes / tamanho * 0.9):
+            break
+        relatorio['reduzida'] = True
+        tamanho = tamanho_serializado(fig)
+
+    relatorio.update({
+        'bytes': tamanho,
+        'pontos': contar_pontos(fig),
+        'dentro_orcamento': tamanho <= orcamento_bytes,
+    })
+    return fig, relatorio
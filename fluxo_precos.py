@@ -0,0 +1,167 @@
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Modo ao vivo do preço do Brent: uma fonte de ticks (feed simulado ou um arquivo acompanhado como num
+# "tail -f") alimenta, numa thread, um buffer circular de tamanho fixo com os ticks mais recentes e as
+# estatísticas do dia, atualizadas tick a tick. Um único fluxo por processo atende todos os visitantes:
+# cada um lê o buffer pela sequência do último tick que já viu.
+
+# "simulado" ou o caminho de um arquivo com linhas "instante;preço"
+FONTE_PRECOS_AO_VIVO = os.environ.get('FLUXO_PRECOS', 'simulado')
+INTERVALO_TICKS = float(os.environ.get('FLUXO_PRECOS_INTERVALO', 0.5))
+CAPACIDADE_BUFFER = 2000
+# Desvio de cada tick simulado, em retorno logarítmico
+VOLATILIDADE_TICK = 0.0004
+
+LINHA_TICK = re.compile(r'^\s*([^;,\t]+)[;,\t]\s*([-+]?\d+(?:[.,]\d+)?)\s*$')
+
+class BufferCircular:
+    def __init__(self, capacidade=CAPACIDADE_BUFFER):
+        self.capacidade = capacidade
+        self.instantes = np.empty(capacidade, dtype='datetime64[ns]')
+        self.precos = np.empty(capacidade)
+        # Número de ticks já recebidos: a sequência do próximo tick
+        self.total = 0
+        self.trava = threading.Lock()
+
+    def adicionar(self, instante, preco):
+        with self.trava:
+            posicao = self.total % self.capacidade
+            self.instantes[posicao] = np.datetime64(pd.Timestamp(instante).tz_localize(None), 'ns')
+            self.precos[posicao] = preco
+            self.total += 1
+
+    def desde(self, sequencia=0):
+        # Ticks com sequência >= sequencia que ainda estão no buffer, em ordem, e a sequência do próximo
+        with self.trava:
+            inicio = max(sequencia, self.total - self.capacidade)
+            posicoes = np.arange(inicio, self.total) % self.capacidade
+            return self.instantes[posicoes], self.precos[posicoes], self.total
+
+class EstatisticasDia:
+    # Abertura, máxima, mínima e último preço do dia, atualizadas em O(1) por tick; zeram na virada do dia
+    def __init__(self):
+        self.dia = None
+        self.quantidade = 0
+        self.abertura = self.maxima = self.minima = self.ultimo = self.anterior = None
+
+    def atualizar(self, instante, preco):
+        dia = pd.Timestamp(instante).date()
+        if dia != self.dia:
+            self.dia, self.quantidade = dia, 0
+            self.abertura = self.maxima = self.minima = preco
+            self.anterior = None
+        else:
+            self.anterior = self.ultimo
+        self.quantidade += 1
+        self.maxima = max(self.maxima, preco)
+        self.minima = min(self.minima, preco)
+        self.ultimo = preco
+
+    def resumo(self):
+        return {'dia': self.dia, 'quantidade': self.quantidade, 'abertura': self.abertura, 'maxima': self.maxima,
+                'minima': self.minima, 'ultimo': self.ultimo, 'anterior': self.anterior}
+
+class FonteSimulada:
+    # Passeio aleatório log-normal a partir de um preço inicial, um tick a cada "intervalo" segundos
+    def __init__(self, preco_inicial, intervalo=INTERVALO_TICKS, volatilidade=VOLATILIDADE_TICK, semente=None):
+        self.preco = float(preco_inicial)
+        self.intervalo = intervalo
+        self.volatilidade = volatilidade
+        self.gerador = np.random.default_rng(semente)
+
+    def ticks(self, parar):
+        while not parar.is_set():
+            self.preco *= np.exp(self.gerador.normal(-self.volatilidade ** 2 / 2, self.volatilidade))
+            yield pd.Timestamp.now(), round(float(self.preco), 2)
+            parar.wait(self.intervalo)
+
+class FonteArquivo:
+    # Lê as linhas já gravadas e depois acompanha o que for acrescentado; um arquivo truncado ou trocado
+    # (rotação) é lido de novo desde o início. Linhas que não são "instante;preço" (cabeçalho) são ignoradas
+    def __init__(self, caminho, intervalo=INTERVALO_TICKS):
+        self.caminho = caminho
+        self.intervalo = intervalo
+
+    @staticmethod
+    def interpretar(linha):
+        encontrado = LINHA_TICK.match(linha)
+        if encontrado is None:
+            return None
+        instante = pd.to_datetime(encontrado.group(1).strip(), errors='coerce')
+        if pd.isna(instante):
+            return None
+        return instante, float(encontrado.group(2).replace(',', '.'))
+
+    def ticks(self, parar):
+        arquivo, identidade, pendente = None, None, ''
+        while not parar.is_set():
+            try:
+                estado = os.stat(self.caminho)
+            except FileNotFoundError:
+                parar.wait(self.intervalo)
+                continue
+            if arquivo is None or (estado.st_ino, estado.st_dev) != identidade or estado.st_size < arquivo.tell():
+                if arquivo is not None:
+                    arquivo.close()
+                arquivo, identidade, pendente = open(self.caminho, encoding='utf-8'), (estado.st_ino, estado.st_dev), ''
+            linha = arquivo.readline()
+            # Uma linha ainda sem quebra está sendo escrita: guarda o começo e espera o resto
+            while linha.endswith('\n'):
+                tick = self.interpretar(pendente + linha)
+                pendente = ''
+                if tick is not None:
+                    yield tick
+                linha = arquivo.readline()
+            pendente += linha
+            parar.wait(self.intervalo)
+        if arquivo is not None:
+            arquivo.close()
+
+def criar_fonte(configuracao, preco_inicial):
+    if configuracao == 'simulado':
+        return FonteSimulada(preco_inicial)
+    return FonteArquivo(configuracao)
+
+class FluxoPrecos:
+    def __init__(self, fonte, capacidade=CAPACIDADE_BUFFER):
+        self.fonte = fonte
+        self.buffer = BufferCircular(capacidade)
+        self.estatisticas = EstatisticasDia()
+        self.trava = threading.Lock()
+        self.parar = threading.Event()
+        self.erro = None
+        self.thread = None
+
+    def iniciar(self):
+        self.thread = threading.Thread(target=self.consumir, name='fluxo_precos', daemon=True)
+        self.thread.start()
+        return self
+
+    def encerrar(self):
+        self.parar.set()
+
+    def consumir(self):
+        try:
+            for instante, preco in self.fonte.ticks(self.parar):
+                self.registrar(instante, preco)
+        except Exception as erro:
+            # A página mostra o erro em vez de ficar esperando ticks que não virão
+            self.erro = erro
+
+    def registrar(self, instante, preco):
+        with self.trava:
+            self.buffer.adicionar(instante, preco)
+            self.estatisticas.atualizar(instante, preco)
+
+    def resumo(self):
+        with self.trava:
+            return {**self.estatisticas.resumo(), 'sequencia': self.buffer.total}
+
+    def ticks(self, sequencia=0):
+        instantes, precos, total = self.buffer.desde(sequencia)
+        return pd.DataFrame({'Instante': instantes, 'Preco': precos}), total
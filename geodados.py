@@ -0,0 +1,90 @@
+import os
+import pandas as pd
+import plotly.express as px
+
+# Camada de dados dos GeoPlots: cada indicador é um CSV em dados_geo/ com as colunas
+# Ano, País, Código País (ISO-3) e Valor (milhões de barris/dia). Novos anos e países
+# entram apenas acrescentando linhas aos arquivos. Os arquivos distribuídos trazem só os maiores países de
+# um ano, então os totais e as participações são relativos aos países listados, não ao mundo.
+
+DIRETORIO_GEO = 'dados_geo'
+
+INDICADORES = {
+    'producao': {'titulo': 'Produtores de Petróleo', 'rotulo': 'Produção (milhões de barris/dia)'},
+    'exportacao': {'titulo': 'Exportadores de Petróleo', 'rotulo': 'Exportação (milhões de barris/dia)'},
+    'consumo': {'titulo': 'Consumidores de Petróleo', 'rotulo': 'Consumo (milhões de barris/dia)'},
+}
+
+def caminho_indicador(indicador, diretorio=DIRETORIO_GEO):
+    return os.path.join(diretorio, f'{indicador}.csv')
+
+def versao_geodados(diretorio=DIRETORIO_GEO):
+    # A versão muda sempre que algum arquivo é alterado, invalidando os caches do dashboard
+    partes = []
+    for indicador in INDICADORES:
+        caminho = caminho_indicador(indicador, diretorio)
+        if os.path.exists(caminho):
+            info = os.stat(caminho)
+            partes.append(f'{indicador}:{info.st_mtime_ns}:{info.st_size}')
+    return '|'.join(partes)
+
+def carregar_geodados(diretorio=DIRETORIO_GEO):
+    quadros = []
+    for indicador in INDICADORES:
+        caminho = caminho_indicador(indicador, diretorio)
+        if not os.path.exists(caminho):
+            continue
+        quadro = pd.read_csv(caminho, usecols=['Ano', 'País', 'Código País', 'Valor'])
+        quadro['Indicador'] = indicador
+        quadros.append(quadro)
+
+    if not quadros:
+        return pd.DataFrame(columns=['Ano', 'País', 'Código País', 'Valor', 'Indicador'])
+
+    dados = pd.concat(quadros, ignore_index=True)
+    dados['Ano'] = pd.to_numeric(dados['Ano'], errors='coerce')
+    dados['Valor'] = pd.to_numeric(dados['Valor'], errors='coerce')
+    dados['Código País'] = dados['Código País'].astype(str).str.strip().str.upper()
+    dados = dados.dropna(subset=['Ano', 'Valor'])
+    dados['Ano'] = dados['Ano'].astype(int)
+    # Em caso de linhas repetidas para o mesmo país e ano, vale a última do arquivo
+    dados = dados.drop_duplicates(subset=['Indicador', 'Ano', 'Código País'], keep='last')
+    return dados.reset_index(drop=True)
+
+def agregar_por_ano(dados, indicador):
+    agregados = dados[dados['Indicador'] == indicador].copy()
+    por_ano = agregados.groupby('Ano')['Valor']
+    agregados['Total dos Países Listados'] = por_ano.transform('sum')
+    agregados['Participação entre os Listados (%)'] = (agregados['Valor'] / agregados['Total dos Países Listados'] * 100).round(2)
+    agregados['Ranking'] = por_ano.rank(ascending=False, method='first').astype(int)
+    # A ordenação por ano define a ordem dos quadros da animação
+    return agregados.sort_values(['Ano', 'Ranking']).reset_index(drop=True)
+
+def criar_mapa_animado(agregados, indicador):
+    config = INDICADORES[indicador]
+    anos = agregados['Ano']
+    periodo = f'{anos.min()}' if anos.min() == anos.max() else f'{anos.min()}-{anos.max()}'
+
+    fig = px.choropleth(agregados,
+                        locations='Código País',
+                        color='Valor',
+                        hover_name='País',
+                        hover_data={'Participação entre os Listados (%)': True, 'Ranking': True, 'Código País': False},
+                        animation_frame='Ano',
+                        # Escala fixa entre os anos para que as cores sejam comparáveis na animação
+                        range_color=(0, agregados['Valor'].max()),
+                        labels={'Valor': config['rotulo']},
+                        title=f"{config['titulo']} (dados de {periodo})",
+                        color_continuous_scale=px.colors.sequential.Plasma,
+                        projection='natural earth')
+
+    fig.update_geos(showland=True, landcolor="lightgray",
+                    showcountries=True, countrycolor="Black")
+
+    # Começa exibindo o ano mais recente
+    if len(fig.frames) > 1:
+        for traco, traco_quadro in zip(fig.data, fig.frames[-1].data):
+            traco.update(traco_quadro)
+        fig.layout.sliders[0].active = len(fig.frames) - 1
+
+    return fig
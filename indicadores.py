@@ -0,0 +1,127 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from dados import COLUNA_PRECO
+
+# Indicadores técnicos do preço do Brent: médias móveis exponenciais (EMA), RSI de Wilder, MACD e Bandas de
+# Bollinger, vetorizados sobre o histórico inteiro. As médias exponenciais são filtros recursivos (lfilter) que
+# aceitam o valor anterior como estado inicial, e as Bandas de Bollinger só precisam dos últimos preços; com
+# esse estado guardado, dias acrescentados ao fim da série são calculados sem refazer o histórico.
+
+PERIODOS_EMA = [9, 21, 50, 200]
+PERIODO_RSI = 14
+MACD_RAPIDA, MACD_LENTA, MACD_SINAL = 12, 26, 9
+JANELA_BOLLINGER = 20
+DESVIOS_BOLLINGER = 2
+
+def filtro_exponencial(valores, alfa, inicial=None):
+    # y[t] = alfa * x[t] + (1 - alfa) * y[t - 1]; sem valor anterior, a série começa no primeiro valor
+    valores = np.asarray(valores, dtype=float)
+    if len(valores) == 0:
+        return valores
+    anterior = valores[0] if inicial is None else inicial
+    saida, _ = lfilter([alfa], [1, alfa - 1], valores, zi=[(1 - alfa) * anterior])
+    return saida
+
+def alfa_periodo(periodo):
+    return 2 / (periodo + 1)
+
+def assinatura(datas, valores):
+    # Identifica o histórico já calculado: qualquer dia alterado ou removido obriga a recalcular tudo
+    resumo = hashlib.sha256(np.asarray(datas, dtype='datetime64[ns]').tobytes())
+    resumo.update(np.asarray(valores, dtype=float).tobytes())
+    return resumo.hexdigest()
+
+def avancar(valores, estado=None, periodos_ema=PERIODOS_EMA):
+    # Calcula os indicadores dos valores novos a partir do estado do último dia já calculado (None: início
+    # da série). Devolve as colunas dos valores novos e o estado do novo último dia
+    valores = np.asarray(valores, dtype=float)
+    anterior = estado or {'quantidade': 0, 'preco': None, 'ema': {}, 'ganho': None, 'perda': None,
+                          'macd_rapida': None, 'macd_lenta': None, 'macd_sinal': None, 'cauda': np.empty(0)}
+    # Posição de cada valor novo na série completa, para os períodos de aquecimento
+    posicoes = anterior['quantidade'] + np.arange(len(valores))
+    colunas = {}
+
+    ema = {}
+    for periodo in periodos_ema:
+        ema[periodo] = filtro_exponencial(valores, alfa_periodo(periodo), anterior['ema'].get(periodo))
+        colunas[f'EMA_{periodo}'] = np.where(posicoes >= periodo - 1, ema[periodo], np.nan)
+
+    # RSI de Wilder: médias exponenciais (alfa = 1/período) dos ganhos e das perdas diárias; o primeiro dia
+    # da série não tem variação
+    inicio = 1 if anterior['preco'] is None else 0
+    variacoes = np.diff(valores if anterior['preco'] is None else np.concatenate([[anterior['preco']], valores]))
+    ganho, perda = np.full(len(valores), np.nan), np.full(len(valores), np.nan)
+    ganho[inicio:] = filtro_exponencial(np.clip(variacoes, 0, None), 1 / PERIODO_RSI, anterior['ganho'])
+    perda[inicio:] = filtro_exponencial(np.clip(-variacoes, 0, None), 1 / PERIODO_RSI, anterior['perda'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = np.where(perda > 0, 100 - 100 / (1 + ganho / perda), 100.0)
+    colunas['RSI'] = np.where(posicoes >= PERIODO_RSI, rsi, np.nan)
+
+    rapida = filtro_exponencial(valores, alfa_periodo(MACD_RAPIDA), anterior['macd_rapida'])
+    lenta = filtro_exponencial(valores, alfa_periodo(MACD_LENTA), anterior['macd_lenta'])
+    sinal = filtro_exponencial(rapida - lenta, alfa_periodo(MACD_SINAL), anterior['macd_sinal'])
+    colunas['MACD'] = np.where(posicoes >= MACD_LENTA - 1, rapida - lenta, np.nan)
+    colunas['MACD_Sinal'] = np.where(posicoes >= MACD_LENTA + MACD_SINAL - 2, sinal, np.nan)
+    colunas['MACD_Histograma'] = colunas['MACD'] - colunas['MACD_Sinal']
+
+    # Bollinger: média e desvio (populacional) de cada janela que termina num dia novo; a janela dos
+    # primeiros dias novos começa nos últimos preços do estado
+    combinados = np.concatenate([anterior['cauda'], valores])
+    media, desvio = np.full(len(valores), np.nan), np.full(len(valores), np.nan)
+    primeiro = max(0, JANELA_BOLLINGER - 1 - len(anterior['cauda']))
+    if len(combinados) >= JANELA_BOLLINGER and primeiro < len(valores):
+        janelas = sliding_window_view(combinados, JANELA_BOLLINGER)[len(anterior['cauda']) + primeiro - JANELA_BOLLINGER + 1:]
+        media[primeiro:], desvio[primeiro:] = janelas.mean(axis=1), janelas.std(axis=1)
+    colunas['Bollinger_Media'] = media
+    colunas['Bollinger_Superior'] = media + DESVIOS_BOLLINGER * desvio
+    colunas['Bollinger_Inferior'] = media - DESVIOS_BOLLINGER * desvio
+
+    if len(valores) == 0:
+        return colunas, estado
+    novo_estado = {
+        'quantidade': anterior['quantidade'] + len(valores),
+        'preco': valores[-1],
+        'ema': {periodo: ema[periodo][-1] for periodo in periodos_ema},
+        'ganho': ganho[-1] if np.isfinite(ganho[-1]) else None,
+        'perda': perda[-1] if np.isfinite(perda[-1]) else None,
+        'macd_rapida': rapida[-1],
+        'macd_lenta': lenta[-1],
+        'macd_sinal': sinal[-1],
+        'cauda': combinados[-(JANELA_BOLLINGER - 1):],
+    }
+    return colunas, novo_estado
+
+def serie_precos(precos):
+    return precos[['Data', COLUNA_PRECO]].dropna().drop_duplicates('Data', keep='last').sort_values('Data').reset_index(drop=True)
+
+def calcular_indicadores(precos, periodos_ema=PERIODOS_EMA):
+    # Devolve a tabela (Data e uma coluna por indicador) e o estado para estender_indicadores
+    serie = serie_precos(precos)
+    colunas, estado = avancar(serie[COLUNA_PRECO].to_numpy(), None, periodos_ema)
+    if estado is not None:
+        estado.update(data=serie['Data'].iloc[-1], periodos_ema=tuple(periodos_ema),
+                      assinatura=assinatura(serie['Data'], serie[COLUNA_PRECO]))
+    return pd.DataFrame({'Data': serie['Data'], **colunas}), estado
+
+def estender_indicadores(tabela, estado, precos, periodos_ema=PERIODOS_EMA):
+    # Só os dias depois do último já calculado passam pelos filtros; se o histórico mudou (ou os períodos
+    # das EMAs), tudo é recalculado
+    serie = serie_precos(precos)
+    if estado is None or tuple(periodos_ema) != estado['periodos_ema']:
+        return calcular_indicadores(precos, periodos_ema)
+    calculados = serie[serie['Data'] <= estado['data']]
+    if len(calculados) != estado['quantidade'] or assinatura(calculados['Data'], calculados[COLUNA_PRECO]) != estado['assinatura']:
+        return calcular_indicadores(precos, periodos_ema)
+
+    novos = serie[serie['Data'] > estado['data']]
+    if novos.empty:
+        return tabela, estado
+    colunas, novo_estado = avancar(novos[COLUNA_PRECO].to_numpy(), estado, periodos_ema)
+    novo_estado.update(data=novos['Data'].iloc[-1], periodos_ema=tuple(periodos_ema),
+                       assinatura=assinatura(serie['Data'], serie[COLUNA_PRECO]))
+    return pd.concat([tabela, pd.DataFrame({'Data': novos['Data'], **colunas})], ignore_index=True), novo_estado
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# Estruturas de consulta por intervalo sobre arrays ordenados por data.
+# Os intervalos são fechados: [inicio, fim] em posições do array.
+
+def construir_tabela_esparsa(valores, maior=True):
+    # Nível k guarda a posição do extremo de cada janela [i, i + 2^k); construção O(n log n)
+    valores = np.asarray(valores, dtype=float)
+    n = len(valores)
+    niveis = [np.arange(n)]
+    k = 1
+    while (1 << k) <= n:
+        anterior = niveis[-1]
+        meio = 1 << (k - 1)
+        esquerda, direita = anterior[:n - (1 << k) + 1], anterior[meio:meio + n - (1 << k) + 1]
+        if maior:
+            escolha = valores[esquerda] >= valores[direita]
+        else:
+            escolha = valores[esquerda] <= valores[direita]
+        niveis.append(np.where(escolha, esquerda, direita))
+        k += 1
+    return niveis
+
+def consultar_tabela_esparsa(niveis, valores, inicio, fim, maior=True):
+    # Posição do extremo em [inicio, fim] em O(1): duas janelas de tamanho 2^k que cobrem o intervalo
+    inicio, fim = int(inicio), int(fim)
+    k = (fim - inicio + 1).bit_length() - 1
+    esquerda = int(niveis[k][inicio])
+    direita = int(niveis[k][fim - (1 << k) + 1])
+    if maior:
+        return esquerda if valores[esquerda] >= valores[direita] else direita
+    return esquerda if valores[esquerda] <= valores[direita] else direita
+
+def posicoes_intervalo(datas, data_inicio, data_fim):
+    # Converte datas em posições [inicio, fim] de um array de datas ordenado; intervalo vazio quando inicio > fim.
+    # Datas None equivalem ao início ou ao fim do histórico
+    inicio = 0 if data_inicio is None else int(np.searchsorted(datas, np.datetime64(pd.Timestamp(data_inicio)), side='left'))
+    fim = len(datas) - 1 if data_fim is None else int(np.searchsorted(datas, np.datetime64(pd.Timestamp(data_fim)), side='right')) - 1
+    return inicio, fim
+
+class IndiceIntervalos:
+    # Mínimo, máximo, média e desvio padrão de qualquer intervalo de datas em O(1),
+    # com tabelas esparsas para os extremos e somas acumuladas para os momentos
+    def __init__(self, datas, valores):
+        self.datas = np.asarray(datas, dtype='datetime64[ns]')
+        self.valores = np.asarray(valores, dtype=float)
+        self.tabela_minimo = construir_tabela_esparsa(self.valores, maior=False)
+        self.tabela_maximo = construir_tabela_esparsa(self.valores, maior=True)
+        # Valores centrados na média geral reduzem o cancelamento numérico em soma - soma de quadrados
+        self.referencia = float(self.valores.mean()) if len(self.valores) else 0.0
+        centrados = self.valores - self.referencia
+        self.soma = np.concatenate([[0.0], np.cumsum(centrados)])
+        self.soma_quadrados = np.concatenate([[0.0], np.cumsum(centrados ** 2)])
+
+    def posicoes(self, data_inicio=None, data_fim=None):
+        return posicoes_intervalo(self.datas, data_inicio, data_fim)
+
+    def estatisticas(self, data_inicio=None, data_fim=None):
+        inicio, fim = self.posicoes(data_inicio, data_fim)
+        quantidade = fim - inicio + 1
+        if quantidade <= 0:
+            return {'quantidade': 0, 'min': np.nan, 'max': np.nan, 'media': np.nan, 'desvio': np.nan}
+
+        soma = self.soma[fim + 1] - self.soma[inicio]
+        soma_quadrados = self.soma_quadrados[fim + 1] - self.soma_quadrados[inicio]
+        media_centrada = soma / quantidade
+        if quantidade > 1:
+            # Desvio amostral (ddof=1), o mesmo padrão do pandas
+            variancia = max((soma_quadrados - quantidade * media_centrada ** 2) / (quantidade - 1), 0.0)
+            desvio = float(np.sqrt(variancia))
+        else:
+            desvio = np.nan
+
+        return {
+            'quantidade': quantidade,
+            'min': float(self.valores[consultar_tabela_esparsa(self.tabela_minimo, self.valores, inicio, fim, maior=False)]),
+            'max': float(self.valores[consultar_tabela_esparsa(self.tabela_maximo, self.valores, inicio, fim, maior=True)]),
+            'media': float(media_centrada + self.referencia),
+            'desvio': desvio,
+        }
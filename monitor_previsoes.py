@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+# Monitoramento da previsão em produção: cada preço atual obtido pela página de ML é gravado com o valor
+# previsto para o mesmo dia (ou, sem linha para ele, para a data prevista mais recente) num log só de acréscimos (SQLite, instante em segundos como chave). Cada linha
+# já traz as somas da janela móvel (erro absoluto, erro percentual e erro com sinal): a linha nova soma a
+# sua contribuição à da anterior e subtrai a do registro que sai da janela, então MAE, MAPE e viés nunca
+# são recalculados a partir do log inteiro.
+
+CAMINHO_MONITOR = os.environ.get('MONITOR_PREVISOES', 'monitor_previsoes.db')
+# Registros na janela móvel; as somas gravadas dependem dela, então mudá-la pede um log novo
+JANELA_MONITOR = 20
+# Visitas seguidas reaproveitam a mesma busca do preço atual: dentro deste intervalo, só o primeiro par conta
+INTERVALO_MINIMO_REGISTRO = 300
+LIMITE_MAPE_PADRAO = 5.0
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS registros (
+    instante INTEGER PRIMARY KEY,
+    observado REAL NOT NULL,
+    previsto REAL NOT NULL,
+    soma_erro_absoluto REAL NOT NULL,
+    soma_erro_percentual REAL NOT NULL,
+    soma_erro REAL NOT NULL,
+    quantidade INTEGER NOT NULL
+);
+"""
+
+def conectar(caminho=CAMINHO_MONITOR):
+    conexao = sqlite3.connect(caminho, timeout=10)
+    conexao.execute('PRAGMA journal_mode=WAL')
+    conexao.executescript(ESQUEMA)
+    return conexao
+
+def contribuicao(observado, previsto):
+    # Erro com sinal positivo quando a previsão ficou acima do preço observado
+    erro = previsto - observado
+    return abs(erro), abs(erro) / abs(observado) * 100, erro
+
+def registrar_previsao(observado, previsto, instante=None, caminho=CAMINHO_MONITOR, janela=JANELA_MONITOR,
+                       intervalo_minimo=INTERVALO_MINIMO_REGISTRO):
+    # Devolve True se o par foi gravado
+    if observado is None or previsto is None or pd.isna(observado) or pd.isna(previsto) or observado == 0:
+        return False
+    instante = int(time.time() if instante is None else instante)
+    novo = contribuicao(observado, previsto)
+
+    conexao = conectar(caminho)
+    try:
+        # Trava de escrita desde a leitura da última linha: duas sessões não gravam o mesmo intervalo
+        conexao.execute('BEGIN IMMEDIATE')
+        ultimo = conexao.execute(
+            'SELECT instante, soma_erro_absoluto, soma_erro_percentual, soma_erro, quantidade FROM registros ORDER BY instante DESC LIMIT 1').fetchone()
+        if ultimo is not None and instante - ultimo[0] < intervalo_minimo:
+            conexao.rollback()
+            return False
+        somas = [0.0, 0.0, 0.0] if ultimo is None else list(ultimo[1:4])
+        quantidade = 0 if ultimo is None else ultimo[4]
+        if quantidade == janela:
+            # O registro que sai da janela é o janela-ésimo mais recente
+            saindo = conexao.execute('SELECT observado, previsto FROM registros ORDER BY instante DESC LIMIT 1 OFFSET ?',
+                                     (janela - 1,)).fetchone()
+            somas = [soma - valor for soma, valor in zip(somas, contribuicao(*saindo))]
+            quantidade -= 1
+        somas = [soma + valor for soma, valor in zip(somas, novo)]
+        conexao.execute('INSERT INTO registros VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (instante, float(observado), float(previsto), *somas, quantidade + 1))
+        conexao.commit()
+    finally:
+        conexao.close()
+    return True
+
+def previsao_para_data(previsoes, data):
+    # Fins de semana, feriados e os dias depois do horizonte do modelo não têm linha: vale a data prevista mais
+    # recente até a data pedida. Devolve (data prevista, valor), ou (None, None) se não há previsão até ela
+    anteriores = previsoes[previsoes['Data'] <= pd.Timestamp(data)].dropna(subset=['Preco'])
+    if anteriores.empty:
+        return None, None
+    linha = anteriores.loc[anteriores['Data'].idxmax()]
+    return linha['Data'], float(linha['Preco'])
+
+def historico_monitor(caminho=CAMINHO_MONITOR):
+    with conectar(caminho) as conexao:
+        registros = pd.read_sql_query('SELECT * FROM registros ORDER BY instante', conexao)
+    conexao.close()
+    return pd.DataFrame({
+        'Instante': pd.to_datetime(registros['instante'], unit='s'),
+        'Observado': registros['observado'],
+        'Previsto': registros['previsto'],
+        'MAE': registros['soma_erro_absoluto'] / registros['quantidade'],
+        'MAPE': registros['soma_erro_percentual'] / registros['quantidade'],
+        'Vies': registros['soma_erro'] / registros['quantidade'],
+    })
@@ -0,0 +1,124 @@
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+import requests
+
+from dados import COLUNA_PRECO, versao_arquivo
+from etl import converter_datas, converter_precos, detectar_codificacao, normalizar_nome
+
+# Séries derivadas do preço do Brent em outras unidades. A cotação diária USD/BRL de um arquivo local é
+# ligada a cada dia de preço por um merge as-of (a última cotação publicada até aquele dia) e as
+# conversões são feitas em colunas inteiras, uma vez por versão dos arquivos.
+#
+# O arquivo de câmbio pode ser a exportação da série 1 do SGS do Banco Central (colunas data;valor, datas
+# dd/mm/aaaa e vírgula decimal) ou qualquer CSV com colunas de data e cotação. Ele não acompanha o
+# repositório: sem ele o dashboard fica em USD/barril. Antes do Plano Real a série 1 do SGS está em cruzado,
+# cruzeiro e cruzeiro real, não em reais: essas cotações são descartadas e os preços anteriores a 1º/07/1994
+# ficam sem conversão. Para baixá-lo da API do SGS (passo opcional):
+#
+# Uso: python series_derivadas.py --inicio 1994-07-01
+
+CAMINHO_CAMBIO = os.path.join('dados_cambio', 'usd_brl.csv')
+# 42 galões americanos de 3,785411784 litros, os "159 litros" do texto da introdução
+LITROS_POR_BARRIL = 42 * 3.785411784
+# Cotações mais antigas que isso não são usadas (feriados longos ou falhas no arquivo de câmbio)
+VALIDADE_COTACAO = pd.Timedelta(days=7)
+# Primeiro dia do real: cotações anteriores estão em outras moedas
+INICIO_PLANO_REAL = pd.Timestamp('1994-07-01')
+
+URL_SGS_CAMBIO = os.environ.get('URL_SGS_CAMBIO', 'https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados')
+# A API do SGS devolve no máximo 10 anos de uma série diária por consulta
+ANOS_POR_CONSULTA_SGS = 10
+TEMPO_LIMITE_SGS = 30
+
+ALIASES_DATA = {'data', 'date', 'ds'}
+ALIASES_COTACAO = {'valor', 'cotacao', 'usd_brl', 'taxa', 'fechamento', 'close', 'ptax'}
+
+UNIDADE_PADRAO = 'USD/barril'
+UNIDADES = {
+    'USD/barril': {'coluna': COLUNA_PRECO, 'moeda': 'USD'},
+    'BRL/barril': {'coluna': 'Preco_BRL_barril', 'moeda': 'BRL'},
+    'BRL/litro': {'coluna': 'Preco_BRL_litro', 'moeda': 'BRL/litro'},
+}
+
+def versao_cambio(caminho=CAMINHO_CAMBIO):
+    return versao_arquivo(caminho) if os.path.exists(caminho) else None
+
+def carregar_cambio(caminho=CAMINHO_CAMBIO):
+    bruto = pd.read_csv(caminho, sep=None, engine='python', dtype=str, encoding=detectar_codificacao(caminho))
+    colunas = {coluna: normalizar_nome(coluna) for coluna in bruto.columns}
+    coluna_data = next((coluna for coluna, nome in colunas.items() if nome in ALIASES_DATA), None)
+    coluna_cotacao = next((coluna for coluna, nome in colunas.items() if nome in ALIASES_COTACAO), None)
+    if coluna_data is None or coluna_cotacao is None:
+        raise ValueError(f"{caminho}: colunas de data e cotação não encontradas em {list(bruto.columns)}")
+
+    cambio = pd.DataFrame({'Data': converter_datas(bruto[coluna_data]), 'Cotacao_USD_BRL': converter_precos(bruto[coluna_cotacao])})
+    cambio = cambio.dropna()
+    cambio = cambio[(cambio['Cotacao_USD_BRL'] > 0) & (cambio['Data'] >= INICIO_PLANO_REAL)]
+    return cambio.drop_duplicates(subset='Data', keep='last').sort_values('Data').reset_index(drop=True)
+
+def calcular_series_derivadas(precos, cambio):
+    # merge_asof exige as duas tabelas ordenadas pela chave; cada dia recebe a última cotação até ele
+    precos = precos[['Data', COLUNA_PRECO]].sort_values('Data').reset_index(drop=True)
+    # As chaves precisam da mesma resolução (a planilha chega em us, o CSV de câmbio em ns)
+    precos['Data'] = precos['Data'].astype('datetime64[ns]')
+    cambio = cambio.assign(Data=cambio['Data'].astype('datetime64[ns]'))
+    derivadas = pd.merge_asof(precos, cambio, on='Data', direction='backward', tolerance=VALIDADE_COTACAO)
+    derivadas['Preco_BRL_barril'] = derivadas[COLUNA_PRECO] * derivadas['Cotacao_USD_BRL']
+    derivadas['Preco_BRL_litro'] = derivadas['Preco_BRL_barril'] / LITROS_POR_BARRIL
+    return derivadas
+
+def serie_na_unidade(derivadas, unidade=UNIDADE_PADRAO):
+    # Mesmo esquema de carregar_precos (Data e COLUNA_PRECO), então qualquer gráfico pode usá-la
+    coluna = UNIDADES[unidade]['coluna']
+    serie = derivadas[['Data', coluna]].dropna()
+    if coluna != COLUNA_PRECO:
+        serie = serie.rename(columns={coluna: COLUNA_PRECO})
+    return serie.reset_index(drop=True)
+
+def fator_unidade(cambio, unidade=UNIDADE_PADRAO):
+    # Para valores que só existem em USD/barril (preço do dia, preço ao vivo): a última cotação do arquivo
+    if unidade == UNIDADE_PADRAO:
+        return 1.0
+    cotacao = float(cambio['Cotacao_USD_BRL'].iloc[-1])
+    return cotacao / LITROS_POR_BARRIL if UNIDADES[unidade]['coluna'] == 'Preco_BRL_litro' else cotacao
+
+def baixar_cambio(data_inicio, data_fim, caminho=CAMINHO_CAMBIO):
+    # Série 1 do SGS (dólar comercial, venda) em consultas de até 10 anos; o arquivo é trocado de uma vez,
+    # então o dashboard nunca lê um arquivo pela metade
+    registros = []
+    inicio, fim = pd.Timestamp(data_inicio), pd.Timestamp(data_fim)
+    while inicio <= fim:
+        limite = min(fim, inicio + pd.DateOffset(years=ANOS_POR_CONSULTA_SGS) - pd.Timedelta(days=1))
+        resposta = requests.get(URL_SGS_CAMBIO, params={'formato': 'json', 'dataInicial': f'{inicio:%d/%m/%Y}',
+                                                        'dataFinal': f'{limite:%d/%m/%Y}'}, timeout=TEMPO_LIMITE_SGS)
+        resposta.raise_for_status()
+        registros.extend(resposta.json())
+        inicio = limite + pd.Timedelta(days=1)
+
+    tabela = pd.DataFrame(registros, columns=['data', 'valor'])
+    diretorio = os.path.dirname(caminho) or '.'
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix='.csv')
+    os.close(descritor)
+    tabela.to_csv(temporario, sep=';', index=False)
+    os.replace(temporario, caminho)
+    return tabela
+
+def main():
+    parser = argparse.ArgumentParser(description="Baixa a cotação diária USD/BRL (série 1 do SGS) para as unidades em reais")
+    parser.add_argument('--inicio', default=f'{INICIO_PLANO_REAL:%Y-%m-%d}',
+                        help="Primeiro dia; antes do Plano Real (1º/07/1994) a série não está em reais e é descartada")
+    parser.add_argument('--fim', default=f'{pd.Timestamp.today():%Y-%m-%d}')
+    parser.add_argument('--saida', default=CAMINHO_CAMBIO)
+    argumentos = parser.parse_args()
+
+    tabela = baixar_cambio(argumentos.inicio, argumentos.fim, argumentos.saida)
+    cambio = carregar_cambio(argumentos.saida)
+    print(f"{len(tabela)} cotações gravadas em {argumentos.saida}; {len(cambio)} válidas de "
+          f"{cambio['Data'].min():%d/%m/%Y} a {cambio['Data'].max():%d/%m/%Y}")
+
+if __name__ == "__main__":
+    main()
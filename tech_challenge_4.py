@@ -1,13 +1,37 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import os
 import requests
 from api_key import NEWS_API_KEY
 import matplotlib.pyplot as plt
 from bs4 import BeautifulSoup
 from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from analise_eventos import gerar_eventos
+from alinhamento_noticias import atualizar_alinhamento, noticias_por_pregao
+from arquivo_noticias import arquivar_noticias, buscar_no_arquivo, intervalo_arquivo, versao_arquivo_noticias
+from cache_disco import CACHE_PAGINAS, em_disco
+from dados import carregar_precos, versao_dados as versao_precos, calcular_medias_moveis, carregar_previsoes
+from cenarios import MODELOS as MODELOS_CENARIOS, simular_cenarios
+from choques import IndiceChoques
+from decomposicao import decompor_precos, perfil_sazonal
+from correlacoes import FREQUENCIAS, JANELAS_PADRAO, TRANSFORMACOES, alinhar_series, calcular_correlacoes, carregar_series_macro, versao_macro
+from comparacao_periodos import comparar_periodos, tabela_comparacao, criar_figura_box
+from etl import converter_precos
+from indice_intervalos import IndiceIntervalos
+from indicadores import DESVIOS_BOLLINGER, JANELA_BOLLINGER, MACD_LENTA, MACD_RAPIDA, MACD_SINAL, PERIODO_RSI, PERIODOS_EMA, estender_indicadores
+from series_derivadas import UNIDADES, UNIDADE_PADRAO, INICIO_PLANO_REAL, versao_cambio, carregar_cambio, calcular_series_derivadas, serie_na_unidade, fator_unidade
+from figuras import ORCAMENTO_BYTES_PADRAO, preparar_figura
+from fluxo_precos import FONTE_PRECOS_AO_VIVO, INTERVALO_TICKS, FluxoPrecos, criar_fonte
+from monitor_previsoes import JANELA_MONITOR, LIMITE_MAPE_PADRAO, INTERVALO_MINIMO_REGISTRO, historico_monitor, previsao_para_data, registrar_previsao
+from geodados import INDICADORES as INDICADORES_GEO, versao_geodados, carregar_geodados, agregar_por_ano, criar_mapa_animado
 
 # ## Documentação do Projeto: Análise do Preço do Petróleo Brent
 
@@ -30,34 +54,43 @@ from datetime import datetime
 # #### 3.1 Funções Auxiliares
 
 # - **obter_preco_atual()**: Realiza o web scraping no Google para obter o preço atual do petróleo Brent.
-# - **carregar_dados(caminho_arquivo)**: Carrega e processa os dados de um arquivo Excel, limpando e renomeando colunas conforme necessário.
+# - **carregar_dados(caminho_arquivo)**: Carrega e processa os dados de um arquivo Excel, limpando e renomeando colunas conforme necessário (em `dados.py`, compartilhado com a API HTTP).
+# - **calcular_medias_moveis(dados)** e **carregar_previsoes()**: Médias móveis em ordem cronológica e série de previsões do modelo (também em `dados.py`).
 # - **buscar_noticias(api_key, query='petróleo', language='pt')**: Busca notícias relacionadas ao petróleo utilizando a API do NewsAPI.
+# - **iniciar_busca_externa(chave, funcao, *args)** e **aguardar_busca_externa(futuro, prazo)**: Executam buscas externas (web scraping e NewsAPI) em segundo plano; cada página desenha seus gráficos locais primeiro e preenche os valores externos quando a busca termina ou o tempo limite da página (`ORCAMENTO_LATENCIA`) se esgota. As requisições têm tempo limite próprio (`TEMPO_LIMITE_PRECO_ATUAL`, `TEMPO_LIMITE_NEWSAPI`) e uma busca ainda em andamento não é submetida de novo.
+# - **seletor_preco_ao_vivo()** e **exibir_preco_ao_vivo(completo)**: Modo ao vivo do preço atual. Um fluxo por processo (`obter_fluxo_precos()`, ver `fluxo_precos.py`) lê os ticks de um feed simulado ou de um arquivo acompanhado (`FLUXO_PRECOS`) para um buffer circular; um fragmento atualiza só as métricas do dia e o gráfico intradiário a cada `ATUALIZACAO_AO_VIVO` segundos, sem refazer o resto da página, e a figura de cada tick é montada uma vez para todos os visitantes.
+# - **versao_dados()**: Retorna a versão da série exibida (arquivo de preços, data de modificação e tamanho e, fora de USD, o arquivo de câmbio e a unidade), usada como chave dos caches.
+# - **seletor_unidade()** e **carregar_dados_unidade(versao, unidade)**: Permitem exibir todos os gráficos em USD/barril, BRL/barril ou BRL/litro. A cotação USD/BRL de `dados_cambio/usd_brl.csv` é ligada a cada dia por um merge as-of e as conversões ficam em cache por versão dos arquivos (ver `series_derivadas.py`). Em reais a série começa em 1º/07/1994: antes do Plano Real a série do SGS não está em reais e os preços ficam sem conversão. O arquivo não acompanha o projeto: é um passo opcional, `python series_derivadas.py` o baixa da série 1 do SGS do Banco Central; sem ele só USD/barril fica disponível. Os títulos dos eixos e os textos de hover seguem a unidade escolhida; o preço do dia e o preço ao vivo, que só existem em USD, são convertidos pela última cotação, e a página de ML fica em USD, a unidade do modelo.
+# - **carregar_precos()**: Lê os preços já normalizados do armazenamento `dados_canonicos/` gerado por `etl.py`; sem ele, processa `petroleo.xlsx` com `carregar_dados`.
+# - **exibir_grafico(fig)**: Envia a figura ao navegador com datas e números em arrays binários (ver `figuras.py`), registra o tamanho serializado e, acima de `ORCAMENTO_BYTES_GRAFICO`, reduz as linhas longas mantendo máximos e mínimos. Os tamanhos da página aparecem na barra lateral.
+# - **obter_aquecimento()**: Na primeira execução do processo, calcula em segundo plano os dados e as figuras das páginas sem controles (COVID-19, Crise de 2008, Primavera Árabe, Guerra do Golfo, quedas e aumentos detectados, GeoPlot e os cenários padrão da página de ML). Os resultados ficam em `cache_paginas.db` (ver `cache_disco.py`), por versão dos dados e do código dos módulos do projeto e com tamanho máximo (`CACHE_PAGINAS_LIMITE_MB`, descartando os itens usados há mais tempo), então um reinício só lê o que já estava pronto. A barra lateral mostra o progresso e avisa quando as páginas estão prontas; `AQUECER_CACHE=0` desliga o aquecimento.
+# - **obter_indice_precos(versao, dados)**: Índice de intervalos (ver `indice_intervalos.py`) com mínimo, máximo, média e desvio padrão de qualquer intervalo de datas em O(1), construído uma vez por versão dos dados.
 
 # #### 3.2 Seções do Dashboard
 
 # ##### 3.2.1 Introdução
 
-# - **introducao(dados)**: Exibe uma introdução sobre o mercado de petróleo, incluindo o preço atual do Brent e um gráfico histórico com eventos marcantes.
+# - **introducao(dados)**: Exibe uma introdução sobre o mercado de petróleo, incluindo o preço atual do Brent (ou, no modo ao vivo, as métricas do dia e o gráfico intradiário) e um gráfico histórico com eventos marcantes.
   
 # ##### 3.2.2 Dados Brutos
 
-# - **exibir(dados)**: Exibe um menu com diferentes opções para visualizar os dados brutos, evolução dos preços ao longo do tempo, estatísticas descritivas, análise de tendências e geoplots.
+# - **exibir(dados)**: Exibe um menu com diferentes opções para visualizar os dados brutos, evolução dos preços ao longo do tempo, estatísticas descritivas, análise de tendências, geoplots, choques de retorno, comparação de períodos e correlações com séries macroeconômicas.
 
 # ##### 3.2.3 Quedas
 
-# - **quedas(dados)**: Exibe um submenu com análises específicas sobre as quedas do preço do petróleo, como o impacto da COVID-19 e a Crise Financeira de 2008.
+# - **quedas(dados)**: Exibe um submenu com análises específicas sobre as quedas do preço do petróleo, como o impacto da COVID-19 e a Crise Financeira de 2008, além das maiores quedas detectadas automaticamente.
 
 # ##### 3.2.4 Aumentos
 
-# - **aumentos(dados)**: Exibe um submenu com análises específicas sobre os aumentos do preço do petróleo, como a Primavera Árabe e a Guerra do Golfo.
+# - **aumentos(dados)**: Exibe um submenu com análises específicas sobre os aumentos do preço do petróleo, como a Primavera Árabe e a Guerra do Golfo, além dos maiores aumentos detectados automaticamente.
 
 # ##### 3.2.5 Notícias
 
-# - **buscar_noticias(api_key, query='petróleo', language='pt')**: Busca e exibe notícias relacionadas ao petróleo utilizando a API do NewsAPI.
+# - **exibir_noticias()**: Exibe as notícias do arquivo local (`noticias.db`, ver `arquivo_noticias.py`), com busca por palavras, filtro de datas e paginação, e permite ordenar e filtrar pelo movimento do Brent no pregão de cada notícia (ver `alinhamento_noticias.py`). A NewsAPI é consultada em segundo plano e cada artigo novo é guardado no arquivo, sem repetir URLs.
 
 # ##### 3.2.6 Machine Learning
 
-# - **criar_grafico_previsoes()**: Exibe a previsão de preços do petróleo Brent utilizando modelos de machine learning, comparando com o preço atual obtido via web scraping.
+# - **criar_grafico_previsoes()**: Exibe a previsão de preços do petróleo Brent utilizando modelos de machine learning, comparando com o preço atual obtido via web scraping, com um leque de cenários de Monte Carlo (ver `cenarios.py`) em cache por modelo, horizonte e semente. Cada preço atual obtido é gravado com o valor previsto para o dia (ou, quando o modelo não tem linha para ele, como depois do fim do horizonte, o da data prevista mais recente, indicada abaixo do valor) num log só de acréscimos (`monitor_previsoes.db`, ver `monitor_previsoes.py`) que já guarda as somas da janela móvel; **exibir_monitor_previsoes()** mostra MAE, MAPE e viés móveis num gráfico de deriva com limite de alerta.
 
 # ##### 3.2.7 Conclusão
 
@@ -65,11 +98,15 @@ from datetime import datetime
 
 # ### 4. Funções de Plotagem
 
-# - **plotar_evolucao_preco_interativo(dados, data_inicio, data_fim)**: Plota a evolução do preço do petróleo Brent em um intervalo de datas selecionado.
-# - **plotar_analise_tendencias(dados)**: Plota a análise de tendências nos preços do petróleo Brent com médias móveis.
+# - **plotar_evolucao_preco_interativo(dados, data_inicio, data_fim)**: Plota a evolução do preço do petróleo Brent em um intervalo de datas selecionado, com marcadores nos pregões que têm notícias arquivadas.
+# - **adicionar_marcadores_noticias(fig, data_inicio, data_fim)**: Acrescenta a um gráfico de preço os pregões com notícias, com os retornos do dia e do dia seguinte já calculados no alinhamento ("—" quando ainda não há o pregão seguinte). Quando nenhuma notícia do arquivo cai num pregão do histórico (notícias mais novas que o último preço), devolve o aviso exibido abaixo do gráfico.
+# - **plotar_analise_tendencias(dados)**: Plota a análise de tendências nos preços do petróleo Brent com médias móveis e, opcionalmente, a tendência, a sazonalidade anual e o resíduo da decomposição STL (ver `decomposicao.py`), calculada uma vez por versão dos dados, com o efeito sazonal médio por mês, e os indicadores técnicos (EMAs, Bandas de Bollinger, RSI e MACD, ver `indicadores.py`), em cache por versão dos dados; quando a série só ganha dias novos no fim, apenas esses dias são calculados a partir do estado dos filtros, que fica no cache em disco junto com a tabela e vale também depois de um reinício.
 # - **plotar_impacto_covid(dados)**: Plota o impacto da COVID-19 nos preços do petróleo Brent.
+# - **plotar_comparacao_periodos(dados)**: Compara a distribuição de preços de qualquer número de períodos definidos pelo usuário, com quartis, bigodes e outliers calculados no servidor (ver `comparacao_periodos.py`).
+# - **plotar_correlacoes(dados)**: Correlações e betas móveis do Brent contra as séries macroeconômicas de `dados_macro/` (CSV ou Parquet), ligadas aos pregões por um merge as-of e calculadas por somas acumuladas, em várias janelas, sobre variações ou níveis e em frequência diária, semanal ou mensal (ver `correlacoes.py`).
 # - **plotar_comparacao_pre_pandemia(dados)**: Plota a comparação de preços antes, durante e pós-pandemia.
 # - **plotar_eventos_vacina(dados)**: Plota o impacto de eventos específicos durante a pandemia nos preços do petróleo Brent.
+# - **plotar_mapa_geo(indicador)**: Plota o mapa animado por ano de um indicador (produção, exportação ou consumo) a partir dos arquivos em `dados_geo/`, com figura e agregados em cache por versão dos dados. A participação de cada país é relativa ao total dos países listados nos arquivos, não ao total mundial.
 # - **plotar_mapa_producao()**: Plota o mapa dos principais produtores de petróleo.
 # - **plotar_mapa_exportacao()**: Plota o mapa dos principais exportadores de petróleo.
 # - **plotar_mapa_consumo()**: Plota o mapa dos principais consumidores de petróleo.
@@ -78,9 +115,12 @@ from datetime import datetime
 # - **plotar_volatilidade(dados)**: Plota a volatilidade dos preços do petróleo durante a Crise Financeira de 2008.
 # - **plotar_comparacao_prepos_primavera_arabe(dados)**: Plota a comparação de preços antes e depois da Primavera Árabe.
 # - **plotar_primavera_arabe(dados)**: Plota o impacto da Primavera Árabe nos preços do petróleo Brent.
-# - **plotar_dispersao_retornos(dados)**: Plota a dispersão dos retornos diários dos preços do petróleo Brent.
+# - **plotar_dispersao_retornos(dados)**: Plota a dispersão dos retornos diários dos preços do petróleo Brent, destacando os maiores choques do período.
+# - **plotar_maiores_choques(dados)**: Lista e destaca os maiores choques de retorno de qualquer intervalo de datas, consultando o índice de `choques.py`.
 # - **plotar_guerra_golfo(dados)**: Plota o impacto da Guerra do Golfo nos preços do petróleo Brent.
 # - **plotar_volatilidade_guerra_golfo(dados)**: Plota a volatilidade dos preços do petróleo durante a Guerra do Golfo.
+# - **plotar_episodio(dados, episodio, mudancas_regime)**: Plota uma queda ou aumento detectado automaticamente (ver `analise_eventos.py`).
+# - **plotar_eventos_detectados(dados, eventos, tipo)**: Plota e lista todas as quedas ou aumentos detectados no histórico, com as mudanças de regime; o último episódio, do último pico ou vale até o preço mais recente, aparece marcado como em aberto.
 
 # ### 5. Função Principal
 
@@ -100,33 +140,65 @@ from datetime import datetime
 
 # 3. **Navegar pelo Dashboard**: Utilize o menu lateral para navegar pelas diferentes seções do dashboard e explorar as análises do preço do petróleo Brent.
 
+# 4. **ETL (opcional)**: Normaliza a planilha, o CSV do IPEA e o CSV de previsões em `dados_canonicos/` (Parquet), com um relatório de validação. Quando esse diretório existe, o dashboard, a API e o treinamento leem dele:
+#     ```bash
+#     python etl.py --precos petroleo.xlsx 2024-07-02_ipea.csv --previsoes Filtered_DataFrame_2020-2025.csv
+#     ```
+
+# 5. **API HTTP (opcional)**: Para consumir os preços, indicadores e previsões sem abrir o dashboard:
+#     ```bash
+#     python api_http.py --porta 8000
+#     curl "http://127.0.0.1:8000/precos?inicio=2020-01-01&fim=2020-12-31"
+#     ```
+
+# 6. **Treinar o Modelo (opcional)**: O pipeline do notebook pode ser executado pela linha de comando (requer `pip install prophet`). O melhor modelo da grade de hiperparâmetros é salvo em `modelos/` (local, fora do git) e passa a ser usado na página de ML:
+#     ```bash
+#     python treinamento.py --dados petroleo.xlsx --processos 4
+#     ```
+
+# 7. **Teste de Carga (opcional)**: Simula várias sessões simultâneas navegando pelo dashboard, com o Google e a NewsAPI substituídos por servidores locais, e mostra a latência (p50/p95/p99) por página, a vazão e a memória:
+#     ```bash
+#     python teste_carga.py --sessoes 8 --repeticoes 3 --latencia-google 0.5 --latencia-noticias 1.0
+#     ```
+
 # ### 7. Considerações Finais
 
 # Este projeto fornece uma análise abrangente do mercado de petróleo Brent, utilizando uma combinação de técnicas de web scraping, visualização de dados e machine learning. As visualizações interativas e as análises detalhadas ajudam a compreender melhor os fatores que influenciam os preços do petróleo ao longo do tempo.
 
+# Endereços das buscas externas; o teste de carga (teste_carga.py) os troca por servidores locais
+URL_PRECO_ATUAL = os.environ.get('URL_PRECO_ATUAL', "https://www.google.com/search?q=cota%C3%A7%C3%A3o+petroleo+brent")
+URL_NEWSAPI = os.environ.get('URL_NEWSAPI', 'https://newsapi.org/v2/everything')
+# Tempo limite (segundos) de cada requisição, abaixo do tempo que a página espera (ORCAMENTO_LATENCIA): uma
+# busca travada libera o worker em vez de ocupar o executor das buscas externas indefinidamente
+TEMPO_LIMITE_PRECO_ATUAL = 2.5
+TEMPO_LIMITE_NEWSAPI = 4.5
+
 def obter_preco_atual():
-    url = "https://www.google.com/search?q=cota%C3%A7%C3%A3o+petroleo+brent"
+    url = URL_PRECO_ATUAL
     headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"}
-    requisicao = requests.get(url, headers=headers)
+    requisicao = requests.get(url, headers=headers, timeout=TEMPO_LIMITE_PRECO_ATUAL)
     site = BeautifulSoup(requisicao.text, "html.parser")
     cot  = site.find("span", class_="NprOob")
     return cot.get_text()
 
-def carregar_dados(caminho_arquivo):
-    dados = pd.read_excel(caminho_arquivo, sheet_name='Planilha1')
-    dados = dados.loc[:, ~dados.columns.duplicated()]
-    if 'Preço - petróleo bruto - Brent (FOB)' in dados.columns:
-        dados = dados.rename(columns={'Preço - petróleo bruto - Brent (FOB)': 'Preco_petroleo_bruto_Brent_FOB'})
-    dados['Data'] = pd.to_datetime(dados['Data'], errors='coerce')
-    dados['Preco_petroleo_bruto_Brent_FOB'] = pd.to_numeric(dados['Preco_petroleo_bruto_Brent_FOB'], errors='coerce')
-    dados = dados.dropna(subset=['Data', 'Preco_petroleo_bruto_Brent_FOB'])
-    return dados
+@st.cache_data
+@em_disco
+def carregar_precos_cache(versao):
+    return carregar_precos()
+
+@st.cache_resource
+@em_disco
+def obter_indice_precos(versao, _dados):
+    serie = _dados.sort_values('Data')
+    return IndiceIntervalos(serie['Data'], serie['Preco_petroleo_bruto_Brent_FOB'])
 
 def buscar_noticias(api_key, query='petróleo', language='pt'):
-    url = f'https://newsapi.org/v2/everything?q={query}&language={language}&apiKey={api_key}'
-    response = requests.get(url)
+    url = f'{URL_NEWSAPI}?q={query}&language={language}&apiKey={api_key}'
+    response = requests.get(url, timeout=TEMPO_LIMITE_NEWSAPI)
     if response.status_code == 200:
         artigos = response.json().get('articles')
+        # Tudo o que a API devolve vai para o arquivo local, que a página de notícias consulta
+        arquivar_noticias(artigos)
         artigos_filtrados = [
             artigo for artigo in artigos 
             if ('petróleo' in artigo['title'].lower() if artigo['title'] else False) or 
@@ -136,9 +208,204 @@ def buscar_noticias(api_key, query='petróleo', language='pt'):
     else:
         return None
 
+#------------------------------------------------------BUSCAS EXTERNAS--------------------------------------------------------------------------
+
+# Tempo máximo (segundos) que cada página espera pelos dados externos antes de exibir "Indisponível".
+# Os gráficos com dados locais são desenhados antes, sem depender desse tempo.
+ORCAMENTO_LATENCIA = {'Introdução': 3.0, 'ML': 3.0, 'Notícias': 5.0}
+VALIDADE_BUSCA_EXTERNA = 300
+TEXTO_CARREGANDO = "Carregando..."
+TEXTO_INDISPONIVEL = "Indisponível"
+
+@st.cache_resource
+def obter_buscas_externas():
+    # Compartilhado entre sessões: uma busca em andamento é reaproveitada por todos os visitantes
+    return {'executor': ThreadPoolExecutor(max_workers=4), 'buscas': {}, 'trava': threading.Lock()}
+
+def iniciar_busca_externa(chave, funcao, *args):
+    estado = obter_buscas_externas()
+    with estado['trava']:
+        busca = estado['buscas'].get(chave)
+        expirada = busca is None or time.monotonic() - busca['inicio'] > VALIDADE_BUSCA_EXTERNA
+        # Buscas que falharam são refeitas na próxima visita
+        falhou = busca is not None and busca['futuro'].done() and busca['futuro'].exception() is not None
+        # Uma busca ainda em andamento nunca é submetida de novo, mesmo expirada: só ocuparia outro worker
+        em_andamento = busca is not None and not busca['futuro'].done()
+        if (expirada or falhou) and not em_andamento:
+            busca = {'inicio': time.monotonic(), 'futuro': estado['executor'].submit(funcao, *args)}
+            estado['buscas'][chave] = busca
+        return busca['futuro']
+
+def prazo_pagina(pagina):
+    return time.monotonic() + ORCAMENTO_LATENCIA[pagina]
+
+def aguardar_busca_externa(futuro, prazo):
+    try:
+        return futuro.result(timeout=max(0.0, prazo - time.monotonic()))
+    except Exception:
+        return None
+
+#------------------------------------------------------PREÇO AO VIVO--------------------------------------------------------------------------
+
+# Intervalo (segundos) entre as atualizações do fragmento ao vivo; os ticks chegam no ritmo da fonte
+ATUALIZACAO_AO_VIVO = max(INTERVALO_TICKS, 1.0)
+
+@st.cache_resource
+def obter_fluxo_precos():
+    # Iniciado na primeira sessão que liga o modo ao vivo e compartilhado pelas demais; o feed simulado parte
+    # do último preço histórico
+    precos = carregar_precos_cache(versao_precos()).sort_values('Data')
+    return FluxoPrecos(criar_fonte(FONTE_PRECOS_AO_VIVO, precos['Preco_petroleo_bruto_Brent_FOB'].iloc[-1])).iniciar()
+
+def preco_ao_vivo_ativo():
+    return st.session_state.get('preco_ao_vivo', False)
+
+def seletor_preco_ao_vivo():
+    st.sidebar.toggle("Preço ao vivo", key='preco_ao_vivo',
+                      help="Acompanha o preço tick a tick (feed simulado ou o arquivo em FLUXO_PRECOS) no lugar do web scraping.")
+
+@st.cache_data(max_entries=8)
+def obter_figura_ao_vivo(sequencia, fator, unidade_moeda, _fluxo):
+    # Chave pela sequência do último tick (e pela unidade): os visitantes que atualizam no mesmo tick recebem a mesma figura
+    ticks, total = _fluxo.ticks()
+    ticks = ticks.iloc[:max(0, len(ticks) - (total - sequencia))]
+    fig = go.Figure(go.Scatter(x=ticks['Instante'], y=ticks['Preco'] * fator, mode='lines', name='Brent ao vivo', line=dict(color='blue')))
+    # uirevision mantém o zoom do usuário entre as atualizações
+    fig.update_layout(title='Preço Intradiário do Petróleo Brent (ao vivo)', xaxis_title='Horário', yaxis_title=f'Preço ({unidade_moeda})',
+                      height=350, uirevision='ao_vivo')
+    return fig
+
+@st.fragment(run_every=ATUALIZACAO_AO_VIVO)
+def exibir_preco_ao_vivo(completo=True):
+    # Só este trecho roda a cada atualização; os gráficos do histórico continuam como estão. O resumo (página
+    # de ML) fica em USD, como a previsão ao lado; a versão completa segue a unidade escolhida
+    fluxo = obter_fluxo_precos()
+    resumo = fluxo.resumo()
+    fator, unidade_moeda = (fator_unidade_selecionada(), moeda()) if completo else (1.0, 'USD')
+    if fluxo.erro is not None:
+        st.warning(f"Fonte de preços ao vivo indisponível: {fluxo.erro}")
+        return
+    if resumo['ultimo'] is None:
+        st.metric(f"Preço ao Vivo do Petróleo Brent ({unidade_moeda})", TEXTO_CARREGANDO)
+        return
+    variacao = None if resumo['anterior'] is None else f"{(resumo['ultimo'] - resumo['anterior']) * fator:+.2f}"
+    if not completo:
+        st.metric("Preço ao Vivo do Petróleo Brent (USD)", f"{resumo['ultimo']:.2f}", variacao)
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric(f"Preço ao Vivo do Petróleo Brent ({unidade_moeda})", f"{resumo['ultimo'] * fator:.2f}", variacao, help=ajuda_conversao())
+    col2.metric("Variação no Dia", f"{resumo['ultimo'] / resumo['abertura'] - 1:+.2%}")
+    col3.metric(f"Máxima / Mínima do Dia ({unidade_moeda})", f"{resumo['maxima'] * fator:.2f} / {resumo['minima'] * fator:.2f}")
+    col4.metric("Ticks no Dia", f"{resumo['quantidade']:,}")
+    st.plotly_chart(obter_figura_ao_vivo(resumo['sequencia'], fator, unidade_moeda, fluxo), key='grafico_ao_vivo')
+
+#------------------------------------------------------UNIDADES DE PREÇO--------------------------------------------------------------------------
+
+def unidade_selecionada():
+    unidade = st.session_state.get('unidade_preco', UNIDADE_PADRAO)
+    return unidade if unidade == UNIDADE_PADRAO or versao_cambio() else UNIDADE_PADRAO
+
+def moeda():
+    return UNIDADES[unidade_selecionada()]['moeda']
+
+@st.cache_data
+def obter_fator_unidade(versao_arquivo_cambio, unidade):
+    return fator_unidade(carregar_cambio(), unidade)
+
+def fator_unidade_selecionada():
+    # Converte valores que só existem em USD/barril (preço do dia, preço ao vivo) para a unidade escolhida
+    unidade = unidade_selecionada()
+    return 1.0 if unidade == UNIDADE_PADRAO else obter_fator_unidade(versao_cambio(), unidade)
+
+def ajuda_conversao():
+    if unidade_selecionada() == UNIDADE_PADRAO:
+        return None
+    return "Convertido de USD/barril pela última cotação de `dados_cambio/usd_brl.csv`."
+
+def preco_atual_na_unidade(preco_atual):
+    # O preço do web scraping chega como texto em USD/barril ("85,12")
+    if not preco_atual or unidade_selecionada() == UNIDADE_PADRAO:
+        return preco_atual
+    valor = converter_precos(pd.Series([preco_atual])).iloc[0]
+    return preco_atual if pd.isna(valor) else f"{valor * fator_unidade_selecionada():.2f}"
+
+def versao_dados():
+    # Versão da série exibida: os caches dos índices e análises dependem também da unidade e do câmbio
+    unidade = unidade_selecionada()
+    if unidade == UNIDADE_PADRAO:
+        return versao_precos()
+    return f"{versao_precos()}|{versao_cambio()}|{unidade}"
+
+@st.cache_data
+@em_disco
+def obter_series_derivadas(versao, versao_arquivo_cambio):
+    return calcular_series_derivadas(carregar_precos(), carregar_cambio())
+
+@st.cache_data
+def carregar_dados_unidade(versao, unidade):
+    # A junção com o câmbio acontece uma vez por versão dos arquivos; cada unidade é só uma coluna dela
+    return serie_na_unidade(obter_series_derivadas(versao_precos(), versao_cambio()), unidade)
+
+def seletor_unidade():
+    unidades = list(UNIDADES) if versao_cambio() else [UNIDADE_PADRAO]
+    if st.session_state.get('unidade_preco') not in unidades:
+        st.session_state['unidade_preco'] = UNIDADE_PADRAO
+    st.sidebar.selectbox("Unidade do preço", unidades, key='unidade_preco')
+    if st.session_state['unidade_preco'] != UNIDADE_PADRAO:
+        st.sidebar.caption(f"Em reais, a série começa em {INICIO_PLANO_REAL:%d/%m/%Y} (Plano Real); antes disso não há cotação em reais.")
+    elif len(unidades) == 1:
+        st.sidebar.caption("Para ver os preços em reais (por barril e por litro), baixe a cotação diária USD/BRL com "
+                           "`python series_derivadas.py` (grava `dados_cambio/usd_brl.csv`) e recarregue a página.")
+
+#------------------------------------------------------GRÁFICOS--------------------------------------------------------------------------
+
+# Tamanho máximo (bytes de JSON) de cada figura enviada ao navegador; acima dele as linhas longas são reduzidas
+ORCAMENTO_BYTES_GRAFICO = ORCAMENTO_BYTES_PADRAO
+
+def exibir_grafico(fig, orcamento_bytes=ORCAMENTO_BYTES_GRAFICO):
+    fig, relatorio = preparar_figura(fig, orcamento_bytes)
+    mostrar_grafico(fig, relatorio, orcamento_bytes)
+
+def mostrar_grafico(fig, relatorio, orcamento_bytes=ORCAMENTO_BYTES_GRAFICO):
+    if moeda() != 'USD':
+        # Os gráficos são escritos em USD; os títulos dos eixos e os textos de hover acompanham a unidade escolhida
+        fig.for_each_yaxis(lambda eixo: eixo.update(title_text=eixo.title.text.replace('(USD)', f'({moeda()})')) if eixo.title.text else None)
+        fig.for_each_trace(lambda trace: trace.update(hovertemplate=trace.hovertemplate.replace('(USD)', f'({moeda()})'))
+                           if getattr(trace, 'hovertemplate', None) else None)
+    st.plotly_chart(fig)
+    st.session_state.setdefault('tamanhos_graficos', []).append(relatorio)
+    if relatorio['reduzida']:
+        st.caption(f"Gráfico simplificado para {relatorio['pontos']:,} de {relatorio['pontos_originais']:,} pontos "
+                   f"({relatorio['bytes_originais'] / 1e6:.1f} MB → {relatorio['bytes'] / 1e6:.1f} MB), mantendo máximos e mínimos.")
+    if not relatorio['dentro_orcamento']:
+        st.warning(f"Gráfico com {relatorio['bytes'] / 1e6:.1f} MB, acima do limite de {orcamento_bytes / 1e6:.1f} MB.")
+
+@st.cache_data
+@em_disco
+def obter_figura(nome, versao, _dados):
+    # Figuras das páginas sem controles (FIGURAS_PAGINAS), já preparadas para o envio; o aquecimento as calcula
+    # antes da primeira visita
+    return preparar_figura(FIGURAS_PAGINAS[nome](_dados, versao), ORCAMENTO_BYTES_GRAFICO)
+
+def exibir_figura_pagina(nome, dados):
+    mostrar_grafico(*obter_figura(nome, versao_dados(), dados))
+
+def exibir_tamanhos_graficos():
+    tamanhos = st.session_state.get('tamanhos_graficos')
+    if not tamanhos:
+        return
+    with st.sidebar.expander("Tamanho dos gráficos"):
+        tabela = pd.DataFrame(tamanhos)[['titulo', 'pontos', 'bytes', 'reduzida']]
+        tabela['KB'] = (tabela.pop('bytes') / 1024).round(1)
+        st.dataframe(tabela, hide_index=True)
+
 #------------------------------------------------------INTRODUÇÃO--------------------------------------------------------------------------
 
 def introducao(dados):
+    prazo = prazo_pagina('Introdução')
+    ao_vivo = preco_ao_vivo_ativo()
+    busca_preco = None if ao_vivo else iniciar_busca_externa('preco_atual', obter_preco_atual)
     st.title("Análise do Preço do Petróleo Brent")
     st.markdown("""
     <div style= padding: 15px; ">
@@ -170,13 +437,18 @@ def introducao(dados):
     </div>
     """, unsafe_allow_html=True)
 
-    preco_atual = obter_preco_atual()
-    st.metric("Preço Atual do Petróleo Brent (USD)", preco_atual)
+    if ao_vivo:
+        exibir_preco_ao_vivo()
+    else:
+        espaco_preco = st.empty()
+        espaco_preco.metric(f"Preço Atual do Petróleo Brent ({moeda()})", TEXTO_CARREGANDO)
 
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(x=dados['Data'], y=dados['Preco_petroleo_bruto_Brent_FOB'], mode='lines', name='Preço do Brent (FOB)', line=dict(color='blue')))
 
+    faixa = obter_indice_precos(versao_dados(), dados).estatisticas()
+
     eventos = [
         {'data': '1990-08-02', 'evento': 'Guerra do Golfo', 'cor': 'red'},
         {'data': '2008-09-15', 'evento': 'Crise do Subprime', 'cor': 'orange'},
@@ -187,12 +459,12 @@ def introducao(dados):
     for evento in eventos:
         fig.add_shape(
             type="line",
-            x0=evento['data'], y0=dados['Preco_petroleo_bruto_Brent_FOB'].min(),
-            x1=evento['data'], y1=dados['Preco_petroleo_bruto_Brent_FOB'].max(),
+            x0=evento['data'], y0=faixa['min'],
+            x1=evento['data'], y1=faixa['max'],
             line=dict(color=evento['cor'], width=2, dash="dash")
         )
         fig.add_annotation(
-            x=evento['data'], y=dados['Preco_petroleo_bruto_Brent_FOB'].max(),
+            x=evento['data'], y=faixa['max'],
             ax=0, ay=-30,
             text=evento['evento'], showarrow=True, arrowhead=2,
             arrowcolor=evento['cor'], arrowsize=1, arrowwidth=2,
@@ -223,8 +495,16 @@ def introducao(dados):
         ),
         margin=dict(b=100) 
     )
+    aviso_noticias = adicionar_marcadores_noticias(fig)
 
-    st.plotly_chart(fig)
+    exibir_grafico(fig)
+    if aviso_noticias:
+        st.caption(aviso_noticias)
+
+    if not ao_vivo:
+        preco_atual = aguardar_busca_externa(busca_preco, prazo)
+        espaco_preco.metric(f"Preço Atual do Petróleo Brent ({moeda()})", preco_atual_na_unidade(preco_atual) or TEXTO_INDISPONIVEL,
+                            help=ajuda_conversao())
 
 #------------------------------------------------------FIM INTRODUÇÃO--------------------------------------------------------------------------
 
@@ -281,8 +561,8 @@ def exibir(dados):
 
     submenu = option_menu(
         menu_title="",  
-        options=["Dados Brutos", "Preço ao Longo do Tempo", "Estatísticas Descritivas", "Análise de Tendências", "GeoPlot"],
-        icons=["table", "line-chart", "bar-chart", "trend-up"],
+        options=["Dados Brutos", "Preço ao Longo do Tempo", "Estatísticas Descritivas", "Análise de Tendências", "GeoPlot", "Choques de Retorno", "Comparação de Períodos", "Correlações"],
+        icons=["table", "line-chart", "bar-chart", "trend-up", "globe", "lightning", "distribute-horizontal", "diagram-3"],
         menu_icon="cast",
         default_index=0,
         orientation="horizontal"
@@ -317,15 +597,23 @@ def exibir(dados):
     elif submenu == "Estatísticas Descritivas":
         st.subheader("Estatísticas Descritivas")
         st.write("Veja as estatísticas descritivas dos preços do petróleo Brent.")
-        st.write(dados.describe())
+        # Só a coluna de preço: o describe da coluna de datas mistura contagem e datas numa coluna que o Arrow não converte
+        st.write(dados.describe(include='number'))
 
         st.subheader("Valores Importantes")
+        indice = obter_indice_precos(versao_dados(), dados)
+        data_min = pd.Timestamp(indice.datas[0]).date()
+        data_max = pd.Timestamp(indice.datas[-1]).date()
+        data_inicio, data_fim = st.slider("Selecione o intervalo de datas", min_value=data_min, max_value=data_max, value=(data_min, data_max), format="DD/MM/YYYY", key="intervalo_estatisticas")
+
+        faixa = indice.estatisticas(data_inicio, data_fim)
+        inicio, fim = indice.posicoes(data_inicio, data_fim)
         estatisticas = {
-            "Menor Valor": dados['Preco_petroleo_bruto_Brent_FOB'].min(),
-            "Maior Valor": dados['Preco_petroleo_bruto_Brent_FOB'].max(),
-            "Média": dados['Preco_petroleo_bruto_Brent_FOB'].mean(),
-            "Mediana": dados['Preco_petroleo_bruto_Brent_FOB'].median(),
-            "Desvio Padrão": dados['Preco_petroleo_bruto_Brent_FOB'].std()
+            "Menor Valor": faixa['min'],
+            "Maior Valor": faixa['max'],
+            "Média": faixa['media'],
+            "Mediana": np.median(indice.valores[inicio:fim + 1]) if faixa['quantidade'] else np.nan,
+            "Desvio Padrão": faixa['desvio']
         }
         st.write(pd.DataFrame(estatisticas, index=[0]))
 
@@ -350,6 +638,15 @@ def exibir(dados):
         elif geoplot_submenu == "Consumo":
             plotar_mapa_consumo()
 
+    elif submenu == "Choques de Retorno":
+        plotar_maiores_choques(dados)
+
+    elif submenu == "Comparação de Períodos":
+        plotar_comparacao_periodos(dados)
+
+    elif submenu == "Correlações":
+        plotar_correlacoes(dados)
+
 #------------------------------------------------------FIM MENU DADOS BRUTOS--------------------------------------------------------------------------
 
 
@@ -362,17 +659,60 @@ def plotar_evolucao_preco_interativo(dados, data_inicio, data_fim):
     fig = px.line(dados_filtrados, x='Data', y='Preco_petroleo_bruto_Brent_FOB', title='Evolução do Preço do Petróleo Brent')
     fig.update_xaxes(title_text='Data')
     fig.update_yaxes(title_text='Preço (USD)')
-    st.plotly_chart(fig)
+    aviso_noticias = adicionar_marcadores_noticias(fig, data_inicio, data_fim)
+    exibir_grafico(fig)
+    if aviso_noticias:
+        st.caption(aviso_noticias)
     return dados_filtrados
 
+@st.cache_data
+@em_disco
+def obter_decomposicao(versao, _dados):
+    return decompor_precos(_dados)
+
+@st.cache_resource
+def obter_ultimos_indicadores():
+    # Tabela e estado dos indicadores da última versão calculada neste processo, por unidade e períodos das EMAs
+    return {'trava': threading.Lock(), 'calculados': {}}
+
+@em_disco
+def calcular_indicadores_versao(versao, unidade, periodos_ema, _dados):
+    # Uma nova versão que só acrescenta dias à anterior parte do estado guardado; senão, é recalculada inteira.
+    # O disco guarda a tabela junto com o estado, para que um reinício possa continuar dele
+    memoria = obter_ultimos_indicadores()
+    with memoria['trava']:
+        tabela, estado = memoria['calculados'].get((unidade, periodos_ema), (None, None))
+    return estender_indicadores(tabela, estado, _dados, periodos_ema)
+
+@st.cache_data
+def obter_indicadores(versao, unidade, periodos_ema, _dados):
+    # A memória do processo é atualizada fora do cache em disco: um acerto no disco também a preenche
+    tabela, estado = calcular_indicadores_versao(versao, unidade, periodos_ema, _dados)
+    memoria = obter_ultimos_indicadores()
+    with memoria['trava']:
+        memoria['calculados'][(unidade, periodos_ema)] = (tabela, estado)
+    return tabela
+
+# Indicadores técnicos do gráfico de tendências: as EMAs ficam sobre o preço, RSI e MACD em gráficos próprios
+EMAS = {f'EMA {periodo} Dias': f'EMA_{periodo}' for periodo in PERIODOS_EMA}
+ROTULO_BOLLINGER = f'Bandas de Bollinger ({JANELA_BOLLINGER}, {DESVIOS_BOLLINGER})'
+ROTULO_RSI = f'RSI ({PERIODO_RSI})'
+ROTULO_MACD = f'MACD ({MACD_RAPIDA}, {MACD_LENTA}, {MACD_SINAL})'
+
+# Componentes da decomposição STL que podem ser acrescentados ao gráfico de tendências
+COMPONENTES_STL = {
+    'Tendência (STL)': 'Tendencia_STL',
+    'Sazonalidade Anual (STL)': 'Sazonalidade_STL',
+    'Resíduo (STL)': 'Residuo_STL',
+}
+
 def plotar_analise_tendencias(dados):
     st.subheader("Análise de Tendências")
     st.write("Explore as tendências nos preços do petróleo Brent.")
 
-    dados['Media_Movel_30'] = dados['Preco_petroleo_bruto_Brent_FOB'].rolling(window=30).mean()
-    dados['Media_Movel_90'] = dados['Preco_petroleo_bruto_Brent_FOB'].rolling(window=90).mean()
-    dados['Media_Movel_365'] = dados['Preco_petroleo_bruto_Brent_FOB'].rolling(window=365).mean()
-    dados['Media_Geral'] = dados['Preco_petroleo_bruto_Brent_FOB'].mean()
+    decomposicao = obter_decomposicao(versao_dados(), dados)
+    indicadores = obter_indicadores(versao_dados(), unidade_selecionada(), tuple(PERIODOS_EMA), dados)
+    dados = calcular_medias_moveis(dados).merge(decomposicao, on='Data', how='left').merge(indicadores, on='Data', how='left')
 
     st.write("Selecione um intervalo de datas para visualizar a análise de tendências.")
     data_min = dados['Data'].min().date()
@@ -385,9 +725,19 @@ def plotar_analise_tendencias(dados):
     else:
         dados_filtrados = dados[(dados['Data'] >= pd.to_datetime(data_inicio)) & (dados['Data'] <= pd.to_datetime(data_fim))]
 
-        medias_moveis = st.multiselect('Selecione as médias móveis que deseja visualizar:',
-                                       ['Média Móvel 30 Dias', 'Média Móvel 90 Dias', 'Média Móvel 365 Dias', 'Média Geral'],
-                                       default=['Média Móvel 30 Dias', 'Média Móvel 90 Dias', 'Média Móvel 365 Dias', 'Média Geral'])
+        faixa = obter_indice_precos(versao_dados(), dados).estatisticas(data_inicio, data_fim)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric(f"Mínimo ({moeda()})", f"{faixa['min']:.2f}")
+        col2.metric(f"Máximo ({moeda()})", f"{faixa['max']:.2f}")
+        col3.metric(f"Média do Período ({moeda()})", f"{faixa['media']:.2f}")
+        col4.metric(f"Desvio Padrão ({moeda()})", f"{faixa['desvio']:.2f}")
+
+        medias_moveis = st.multiselect('Selecione as médias móveis e os componentes que deseja visualizar:',
+                                       ['Média Móvel 30 Dias', 'Média Móvel 90 Dias', 'Média Móvel 365 Dias', 'Média Geral'] + list(COMPONENTES_STL)
+                                       + list(EMAS) + [ROTULO_BOLLINGER, ROTULO_RSI, ROTULO_MACD],
+                                       default=['Média Móvel 30 Dias', 'Média Móvel 90 Dias', 'Média Móvel 365 Dias', 'Média Geral'],
+                                       help="Os componentes STL separam o preço em tendência, sazonalidade anual e resíduo (preço = tendência + sazonalidade + resíduo). "
+                                            "RSI e MACD aparecem em gráficos próprios, abaixo do gráfico de preços.")
 
         fig = go.Figure()
         fig.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados['Preco_petroleo_bruto_Brent_FOB'], mode='lines', name='Preço do Brent (FOB)'))
@@ -404,31 +754,221 @@ def plotar_analise_tendencias(dados):
         if 'Média Geral' in medias_moveis:
             fig.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados['Media_Geral'], mode='lines', name='Média Geral', line=dict(dash='dash')))
 
+        for rotulo, coluna in EMAS.items():
+            if rotulo in medias_moveis:
+                fig.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados[coluna], mode='lines', name=rotulo))
+
+        if ROTULO_BOLLINGER in medias_moveis:
+            fig.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados['Bollinger_Superior'], mode='lines', name='Banda Superior',
+                                     line=dict(color='gray', width=1)))
+            fig.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados['Bollinger_Inferior'], mode='lines', name='Banda Inferior',
+                                     line=dict(color='gray', width=1), fill='tonexty', fillcolor='rgba(128, 128, 128, 0.15)'))
+            fig.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados['Bollinger_Media'], mode='lines',
+                                     name=f'Média de {JANELA_BOLLINGER} Dias (Bollinger)', line=dict(color='gray', width=1, dash='dot')))
+
+        if 'Tendência (STL)' in medias_moveis:
+            fig.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados['Tendencia_STL'], mode='lines', name='Tendência (STL)',
+                                     line=dict(color='black', width=2)))
+
+        # Sazonalidade e resíduo oscilam em torno de zero: ficam num eixo próprio, à direita
+        for rotulo in ['Sazonalidade Anual (STL)', 'Resíduo (STL)']:
+            if rotulo in medias_moveis:
+                fig.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados[COMPONENTES_STL[rotulo]], mode='lines', name=rotulo,
+                                         yaxis='y2', opacity=0.6))
+        if {'Sazonalidade Anual (STL)', 'Resíduo (STL)'} & set(medias_moveis):
+            fig.update_layout(yaxis2=dict(title='Sazonalidade e Resíduo (USD)', overlaying='y', side='right', showgrid=False, zeroline=True),
+                              legend=dict(x=1.08))
+
         fig.update_layout(title='Análise de Tendências nos Preços do Petróleo Brent',
                           xaxis_title='Data',
                           yaxis_title='Preço (USD)')
 
-        st.plotly_chart(fig)
-
-        csv = dados_filtrados.to_csv(index=False).encode('utf-8')
+        exibir_grafico(fig)
+
+        if 'Sazonalidade Anual (STL)' in medias_moveis:
+            perfil = perfil_sazonal(decomposicao)
+            fig_perfil = px.bar(perfil, x='Mes', y='Sazonalidade_STL', title='Efeito Sazonal Médio por Mês (Últimos 5 Anos)',
+                                labels={'Mes': 'Mês', 'Sazonalidade_STL': 'Efeito sazonal (USD)'})
+            fig_perfil.update_xaxes(tickmode='array', tickvals=list(range(1, 13)),
+                                    ticktext=['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'])
+            exibir_grafico(fig_perfil)
+
+        if ROTULO_RSI in medias_moveis:
+            fig_rsi = go.Figure(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados['RSI'], mode='lines', name=ROTULO_RSI, line=dict(color='purple')))
+            # Acima de 70 (sobrecompra) e abaixo de 30 (sobrevenda)
+            fig_rsi.add_hrect(y0=30, y1=70, fillcolor='purple', opacity=0.08, line_width=0)
+            fig_rsi.update_layout(title=f'Índice de Força Relativa - {ROTULO_RSI}', xaxis_title='Data', yaxis_title='RSI', yaxis_range=[0, 100], height=300)
+            exibir_grafico(fig_rsi)
+
+        if ROTULO_MACD in medias_moveis:
+            fig_macd = go.Figure()
+            fig_macd.add_trace(go.Bar(x=dados_filtrados['Data'], y=dados_filtrados['MACD_Histograma'], name='Histograma',
+                                      marker_color=np.where(dados_filtrados['MACD_Histograma'] >= 0, 'seagreen', 'indianred')))
+            fig_macd.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados['MACD'], mode='lines', name='MACD', line=dict(color='blue')))
+            fig_macd.add_trace(go.Scatter(x=dados_filtrados['Data'], y=dados_filtrados['MACD_Sinal'], mode='lines', name='Sinal', line=dict(color='orange')))
+            fig_macd.update_layout(title=ROTULO_MACD, xaxis_title='Data', yaxis_title='MACD (USD)', height=300)
+            exibir_grafico(fig_macd)
+
+        # Com os indicadores e os componentes STL, o CSV só é gerado quando o botão é clicado
         st.download_button(
             label="Baixar dados como CSV",
-            data=csv,
+            data=lambda: dados_filtrados.to_csv(index=False).encode('utf-8'),
             file_name='analise_tendencias_preco_petroleo_brent.csv',
             mime='text/csv',
         )
 
-#------------------------------------------------------INICIO PLOTS COVID-19--------------------------------------------------------------------------
-def plotar_impacto_covid(dados):
-    st.subheader("Impacto da COVID-19")
+#------------------------------------------------------INICIO PLOTS COMPARAÇÃO DE PERÍODOS--------------------------------------------------------------------------
+
+@st.cache_data
+@em_disco
+def obter_comparacao_periodos(versao, periodos, _dados):
+    indice = obter_indice_precos(versao, _dados)
+    return comparar_periodos(indice.datas, indice.valores, periodos)
+
+def plotar_comparacao_periodos(dados):
+    st.subheader("Comparação de Períodos")
     st.write("""
-        A pandemia de COVID-19 teve um impacto profundo e significativo nos mercados globais, incluindo o mercado de petróleo. 
-        Durante a pandemia, a demanda por petróleo caiu drasticamente devido ao lockdown global e às restrições de viagem. 
-        Isso resultou em uma queda acentuada nos preços do petróleo em 2020. Com a recuperação gradual da economia e o ajuste da produção pela OPEP+, 
-        os preços começaram a se recuperar no final de 2020 e ao longo de 2021.
+        Defina quantos períodos quiser para comparar a distribuição do preço do petróleo Brent.
+        Os quartis, bigodes e outliers de cada período são calculados no servidor.
+    """)
+
+    periodos_padrao = pd.DataFrame({
+        'Nome': ['Guerra do Golfo', 'Crise de 2008', 'Primavera Árabe', 'Pandemia'],
+        'Início': pd.to_datetime(['1990-08-01', '2008-01-01', '2010-12-01', '2020-01-01']).date,
+        'Fim': pd.to_datetime(['1991-02-28', '2008-12-31', '2011-12-31', '2020-12-31']).date,
+    })
+    periodos_editados = st.data_editor(
+        periodos_padrao,
+        num_rows="dynamic",
+        column_config={
+            'Início': st.column_config.DateColumn(format="DD/MM/YYYY"),
+            'Fim': st.column_config.DateColumn(format="DD/MM/YYYY"),
+        },
+        key="periodos_comparacao",
+    )
+
+    periodos_validos = periodos_editados.dropna()
+    invalidos = periodos_validos[periodos_validos['Início'] > periodos_validos['Fim']]
+    if not invalidos.empty:
+        st.error("Data de início não pode ser maior que a data de fim.")
+        return
+    periodos = tuple((str(linha['Nome']), str(linha['Início']), str(linha['Fim'])) for _, linha in periodos_validos.iterrows())
+
+    resumos = obter_comparacao_periodos(versao_dados(), periodos, dados)
+    if not resumos:
+        st.warning("Nenhum dado encontrado nos períodos informados.")
+        return
+
+    exibir_grafico(criar_figura_box(resumos, 'Comparação de Preços do Petróleo Brent por Período'))
+
+    tabela = tabela_comparacao(resumos).rename(columns={
+        'nome': 'Período', 'inicio': 'Início', 'fim': 'Fim', 'quantidade': 'Dias', 'minimo': 'Mínimo', 'q1': 'Q1',
+        'mediana': 'Mediana', 'q3': 'Q3', 'maximo': 'Máximo', 'bigode_inferior': 'Bigode Inferior',
+        'bigode_superior': 'Bigode Superior', 'media': 'Média', 'desvio': 'Desvio Padrão', 'outliers': 'Outliers',
+        'delta_mediana_primeiro_%': 'Δ Mediana vs 1º Período (%)', 'delta_mediana_anterior_%': 'Δ Mediana vs Anterior (%)',
+        'delta_media_anterior_%': 'Δ Média vs Anterior (%)'})
+    st.write(tabela)
+
+    csv = tabela.to_csv(index=False).encode('utf-8')
+    st.download_button(
+        label="Baixar comparação como CSV",
+        data=csv,
+        file_name='comparacao_periodos_preco_petroleo_brent.csv',
+        mime='text/csv',
+    )
+
+#------------------------------------------------------FIM PLOTS COMPARAÇÃO DE PERÍODOS--------------------------------------------------------------------------
+
+#------------------------------------------------------INICIO PLOTS CORRELAÇÕES--------------------------------------------------------------------------
+
+JANELAS_CORRELACAO = [21, 63, 126, 252, 504]
+
+@st.cache_data
+@em_disco
+def obter_painel_macro(versao, versao_arquivos_macro, _dados):
+    # Séries de dados_macro/ ligadas aos pregões uma vez por versão dos arquivos; cada combinação de séries e
+    # janelas só refaz as somas acumuladas
+    return alinhar_series(_dados, carregar_series_macro())
+
+@st.cache_data
+@em_disco
+def obter_correlacoes(versao, versao_arquivos_macro, series, janelas, transformacao, frequencia, _dados):
+    painel = obter_painel_macro(versao, versao_arquivos_macro, _dados)
+    return calcular_correlacoes(painel, series, janelas, transformacao, frequencia)
+
+@st.cache_data
+@em_disco
+def obter_figuras_correlacoes(versao, versao_arquivos_macro, series, janelas, transformacao, frequencia, _dados):
+    # Uma linha por série e janela: com muitas séries, montar e reduzir as figuras custa mais que as correlações
+    resultado = obter_correlacoes(versao, versao_arquivos_macro, series, janelas, transformacao, frequencia, _dados)
+    resultado = resultado.assign(Janela=resultado['Janela'].astype(str) + ' períodos')
+
+    fig = px.line(resultado, x='Data', y='Correlacao', color='Serie', line_dash='Janela', title='Correlação Móvel com o Preço do Petróleo Brent',
+                  labels={'Correlacao': 'Correlação', 'Serie': 'Série'})
+    fig.add_hline(y=0, line=dict(color='gray', width=1, dash='dot'))
+    fig.update_yaxes(range=[-1, 1])
+
+    fig_beta = px.line(resultado, x='Data', y='Beta', color='Serie', line_dash='Janela', title='Beta Móvel do Preço do Petróleo Brent',
+                       labels={'Serie': 'Série'})
+    fig_beta.add_hline(y=0, line=dict(color='gray', width=1, dash='dot'))
+    return [preparar_figura(figura, ORCAMENTO_BYTES_GRAFICO) for figura in (fig, fig_beta)]
+
+def plotar_correlacoes(dados):
+    st.subheader("Correlações com Séries Macroeconômicas")
+    st.write("""
+        Compare o preço do petróleo Brent com outras séries, como a força do dólar, a inflação e o custo de transporte.
+        As correlações e os betas são calculados em janelas móveis: o beta indica quanto o Brent variou, em média, para cada unidade de variação da série.
     """)
 
+    versao_arquivos = versao_macro()
+    if not versao_arquivos:
+        st.info("Nenhuma série encontrada. Adicione arquivos CSV ou Parquet em `dados_macro/`, com uma coluna de data e uma ou mais colunas numéricas (cada coluna vira uma série).")
+        return
+
+    painel = obter_painel_macro(versao_dados(), versao_arquivos, dados)
+    nomes = [coluna for coluna in painel.columns if coluna != 'Brent']
+    if not nomes:
+        st.warning("Os arquivos de `dados_macro/` não têm coluna de data ou valores numéricos reconhecidos.")
+        return
+
+    col1, col2 = st.columns(2)
+    series = col1.multiselect("Séries", nomes, default=nomes, key="correlacoes_series")
+    janelas = col2.multiselect("Janelas (em períodos)", JANELAS_CORRELACAO, default=JANELAS_PADRAO, key="correlacoes_janelas")
+    col3, col4 = st.columns(2)
+    transformacao = col3.selectbox("Comparar", list(TRANSFORMACOES), format_func=TRANSFORMACOES.get, key="correlacoes_transformacao")
+    frequencia = col4.selectbox("Frequência", list(FREQUENCIAS), format_func=FREQUENCIAS.get, key="correlacoes_frequencia")
+    if not series or not janelas:
+        st.warning("Selecione pelo menos uma série e uma janela.")
+        return
+
+    parametros = (versao_dados(), versao_arquivos, tuple(series), tuple(sorted(janelas)), transformacao, frequencia, dados)
+    resultado = obter_correlacoes(*parametros)
+    if resultado.empty:
+        st.warning("Não há observações em comum suficientes entre o Brent e as séries escolhidas para essas janelas.")
+        return
+    for figura, relatorio in obter_figuras_correlacoes(*parametros):
+        mostrar_grafico(figura, relatorio)
+
+    tabela = resultado.groupby(['Serie', 'Janela'], sort=False).agg(
+        Data=('Data', 'last'), Correlacao_Atual=('Correlacao', 'last'), Correlacao_Media=('Correlacao', 'mean'), Beta_Atual=('Beta', 'last')).reset_index()
+    tabela = tabela.round({'Correlacao_Atual': 2, 'Correlacao_Media': 2, 'Beta_Atual': 3}).rename(columns={
+        'Serie': 'Série', 'Correlacao_Atual': 'Correlação Atual', 'Correlacao_Media': 'Correlação Média', 'Beta_Atual': 'Beta Atual'})
+    st.write(tabela)
+
+    # Uma linha por dia, série e janela: o CSV só é gerado quando o botão é clicado
+    st.download_button(
+        label="Baixar correlações como CSV",
+        data=lambda: resultado.to_csv(index=False).encode('utf-8'),
+        file_name='correlacoes_moveis_preco_petroleo_brent.csv',
+        mime='text/csv',
+    )
+
+#------------------------------------------------------FIM PLOTS CORRELAÇÕES--------------------------------------------------------------------------
+
+#------------------------------------------------------INICIO PLOTS COVID-19--------------------------------------------------------------------------
+def figura_impacto_covid(dados, versao):
     dados_covid = dados[(dados['Data'] >= '2019-01-01') & (dados['Data'] <= '2021-12-31')]
+    faixa = obter_indice_precos(versao, dados).estatisticas('2019-01-01', '2021-12-31')
     
     fig = go.Figure()
 
@@ -437,11 +977,11 @@ def plotar_impacto_covid(dados):
                              line=dict(color='blue')))
 
     fig.add_shape(type="line",
-                  x0='2020-03-11', y0=dados_covid['Preco_petroleo_bruto_Brent_FOB'].min(),
-                  x1='2020-03-11', y1=dados_covid['Preco_petroleo_bruto_Brent_FOB'].max(),
+                  x0='2020-03-11', y0=faixa['min'],
+                  x1='2020-03-11', y1=faixa['max'],
                                     line=dict(color="red", width=2, dash="dash"))
 
-    fig.add_annotation(x='2020-03-11', y=dados_covid['Preco_petroleo_bruto_Brent_FOB'].max(),
+    fig.add_annotation(x='2020-03-11', y=faixa['max'],
                        text="Início da Pandemia ",
                        showarrow=True, arrowhead=1)
 
@@ -456,8 +996,20 @@ def plotar_impacto_covid(dados):
     fig.update_layout(title='Impacto da COVID-19 no Preço do Petróleo Brent (2019-2021)',
                       xaxis_title='Data',
                       yaxis_title='Preço (USD)')
-    st.plotly_chart(fig)
+    return fig
 
+def plotar_impacto_covid(dados):
+    st.subheader("Impacto da COVID-19")
+    st.write("""
+        A pandemia de COVID-19 teve um impacto profundo e significativo nos mercados globais, incluindo o mercado de petróleo. 
+        Durante a pandemia, a demanda por petróleo caiu drasticamente devido ao lockdown global e às restrições de viagem. 
+        Isso resultou em uma queda acentuada nos preços do petróleo em 2020. Com a recuperação gradual da economia e o ajuste da produção pela OPEP+, 
+        os preços começaram a se recuperar no final de 2020 e ao longo de 2021.
+    """)
+
+    exibir_figura_pagina('impacto_covid', dados)
+
+    dados_covid = dados[(dados['Data'] >= '2019-01-01') & (dados['Data'] <= '2021-12-31')]
     csv = dados_covid.to_csv(index=False).encode('utf-8')
     st.download_button(
         label="Baixar dados como CSV",
@@ -466,6 +1018,17 @@ def plotar_impacto_covid(dados):
         mime='text/csv',
     )
 
+def figura_comparacao_pre_pandemia(dados, versao):
+    periodos = (
+        ('Antes da Pandemia (2019)', '2019-01-01', '2019-12-31'),
+        ('Durante a Pandemia (2020)', '2020-01-01', '2020-12-31'),
+        ('Pós Pandemia (2021)', '2021-01-01', '2021-12-31'),
+    )
+    resumos = obter_comparacao_periodos(versao, periodos, dados)
+    fig = criar_figura_box(resumos, 'Comparação de Preços do Petróleo Brent Antes (2019), Durante (2020) e Pós Pandemia (2021)')
+
+    return fig
+
 def plotar_comparacao_pre_pandemia(dados):
     st.subheader("Comparação de Preços Antes, Durante e Pós-Pandemia")
     st.write("""
@@ -473,37 +1036,32 @@ def plotar_comparacao_pre_pandemia(dados):
         Ele ajuda a visualizar como a pandemia afetou os preços e como eles se comportaram após o fim das restrições mais rigorosas.
     """)
 
-    pre_covid_2019 = dados[(dados['Data'] >= '2019-01-01') & (dados['Data'] < '2020-01-01')]
-    durante_covid_2020 = dados[(dados['Data'] >= '2020-01-01') & (dados['Data'] < '2021-01-01')]
-    pos_covid_2021 = dados[(dados['Data'] >= '2021-01-01') & (dados['Data'] < '2022-01-01')]
+    exibir_figura_pagina('comparacao_pre_pandemia', dados)
 
+def figura_eventos_vacina(dados, versao):
+    dados_eventos = dados[(dados['Data'] >= '2020-01-01') & (dados['Data'] <= '2021-12-31')]
+    faixa = obter_indice_precos(versao, dados).estatisticas('2020-01-01', '2021-12-31')
+    
     fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dados_eventos['Data'], y=dados_eventos['Preco_petroleo_bruto_Brent_FOB'],
+                             mode='lines', name='Preço do Brent (FOB)', line=dict(color='blue')))
+    
+    fig.add_shape(type="line", x0='2020-03-11', y0=faixa['min'],
+                  x1='2020-03-11', y1=faixa['max'], line=dict(color="red", width=2, dash="dash"))
+    fig.add_annotation(x='2020-03-11', y=faixa['max'],
+                       text="Início da Pandemia", showarrow=True, arrowhead=1)
+    
+    fig.add_shape(type="line", x0='2020-12-14', y0=faixa['min'],
+                  x1='2020-12-14', y1=faixa['max'], line=dict(color="green", width=2, dash="dash"))
+    fig.add_annotation(x='2020-12-14', y=faixa['max'],
+                       text="Início da Vacinação", showarrow=True, arrowhead=1)
 
-    fig.add_trace(go.Box(
-        y=pre_covid_2019['Preco_petroleo_bruto_Brent_FOB'],
-        name='Antes da Pandemia (2019)',
-        marker_color='blue'
-    ))
-
-    fig.add_trace(go.Box(
-        y=durante_covid_2020['Preco_petroleo_bruto_Brent_FOB'],
-        name='Durante a Pandemia (2020)',
-        marker_color='red'
-    ))
-
-    fig.add_trace(go.Box(
-        y=pos_covid_2021['Preco_petroleo_bruto_Brent_FOB'],
-        name='Pós Pandemia (2021)',
-        marker_color='green'
-    ))
-
-    fig.update_layout(
-        title='Comparação de Preços do Petróleo Brent Antes (2019), Durante (2020) e Pós Pandemia (2021)',
-        yaxis_title='Preço (USD)',
-        boxmode='group'
-    )
-
-    st.plotly_chart(fig)
+    fig.update_layout(title='Impacto das vacinas Durante a Pandemia no Preço do Petróleo Brent (2020-2021)',
+                      xaxis_title='Data',
+                      yaxis_title='Preço (USD)')
+    fig.add_trace(go.Scatter(x=[None], y=[None], mode='lines', line=dict(color='red', dash='dash'), showlegend=True, name='Início da Pandemia'))
+    fig.add_trace(go.Scatter(x=[None], y=[None], mode='lines', line=dict(color='green', dash='dash'), showlegend=True, name='Início da Vacinação'))
+    return fig
 
 def plotar_eventos_vacina(dados):
     st.subheader("Impacto de Eventos Específicos Durante a Pandemia")
@@ -523,115 +1081,61 @@ def plotar_eventos_vacina(dados):
 
         Este gráfico detalha as flutuações nos preços do petróleo Brent durante esses eventos críticos, destacando a volatilidade do mercado em resposta às mudanças globais.
     """)
-    dados_eventos = dados[(dados['Data'] >= '2020-01-01') & (dados['Data'] <= '2021-12-31')]
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dados_eventos['Data'], y=dados_eventos['Preco_petroleo_bruto_Brent_FOB'],
-                             mode='lines', name='Preço do Brent (FOB)', line=dict(color='blue')))
-    
-    fig.add_shape(type="line", x0='2020-03-11', y0=dados_eventos['Preco_petroleo_bruto_Brent_FOB'].min(),
-                  x1='2020-03-11', y1=dados_eventos['Preco_petroleo_bruto_Brent_FOB'].max(), line=dict(color="red", width=2, dash="dash"))
-    fig.add_annotation(x='2020-03-11', y=dados_eventos['Preco_petroleo_bruto_Brent_FOB'].max(),
-                       text="Início da Pandemia", showarrow=True, arrowhead=1)
-    
-    fig.add_shape(type="line", x0='2020-12-14', y0=dados_eventos['Preco_petroleo_bruto_Brent_FOB'].min(),
-                  x1='2020-12-14', y1=dados_eventos['Preco_petroleo_bruto_Brent_FOB'].max(), line=dict(color="green", width=2, dash="dash"))
-    fig.add_annotation(x='2020-12-14', y=dados_eventos['Preco_petroleo_bruto_Brent_FOB'].max(),
-                       text="Início da Vacinação", showarrow=True, arrowhead=1)
-
-    fig.update_layout(title='Impacto das vacinas Durante a Pandemia no Preço do Petróleo Brent (2020-2021)',
-                      xaxis_title='Data',
-                      yaxis_title='Preço (USD)')
-    fig.add_trace(go.Scatter(x=[None], y=[None], mode='lines', line=dict(color='red', dash='dash'), showlegend=True, name='Início da Pandemia'))
-    fig.add_trace(go.Scatter(x=[None], y=[None], mode='lines', line=dict(color='green', dash='dash'), showlegend=True, name='Início da Vacinação'))
-    st.plotly_chart(fig)
+    exibir_figura_pagina('eventos_vacina', dados)
 
 #------------------------------------------------------FIM PLOTS COVID-19--------------------------------------------------------------------------    
 
 #------------------------------------------------------INICIO GEO-PLOTS--------------------------------------------------------------------------
 
-def plotar_mapa_producao():
-    produtores = pd.DataFrame({
-        'País': ['United States', 'Russia', 'Saudi Arabia', 'Canada', 'Iraq', 'China', 'United Arab Emirates', 'Brazil', 'Iran', 'Kuwait'],
-        'Produção (milhões de barris/dia)': [11.307, 9.865, 9.264, 4.201, 4.102, 3.888, 3.138, 2.939, 2.665, 2.625],
-        'Código País': ['USA', 'RUS', 'SAU', 'CAN', 'IRQ', 'CHN', 'ARE', 'BRA', 'IRN', 'KWT']
-    })
+@st.cache_data
+@em_disco
+def carregar_geodados_agregados(versao):
+    dados_geo = carregar_geodados()
+    return {indicador: agregar_por_ano(dados_geo, indicador) for indicador in INDICADORES_GEO}
 
-    fig = px.choropleth(produtores, 
-                        locations='Código País', 
-                        color='Produção (milhões de barris/dia)',
-                        hover_name='País', 
-                        title='Principais Produtores de Petróleo (dados de 2020)',
-                        color_continuous_scale=px.colors.sequential.Plasma,
-                        projection='natural earth')
+@st.cache_resource
+@em_disco
+def obter_mapa_geo(indicador, versao):
+    agregados = carregar_geodados_agregados(versao)[indicador]
+    return criar_mapa_animado(agregados, indicador)
 
-    fig.update_geos(showland=True, landcolor="lightgray",
-                    showcountries=True, countrycolor="Black")
+def plotar_mapa_geo(indicador):
+    versao = versao_geodados()
+    agregados = carregar_geodados_agregados(versao)[indicador]
 
-    st.plotly_chart(fig)
+    if agregados.empty:
+        st.warning("Nenhum dado encontrado para este mapa na pasta dados_geo.")
+        return
 
-    st.write("### Legenda")
-    st.table(produtores[['País', 'Produção (milhões de barris/dia)','Código País']])
-
-def plotar_mapa_exportacao():
-    exportadores = pd.DataFrame({
-        'País': ['Saudi Arabia', 'Russia', 'Iraq', 'United States', 'Canada', 'United Arab Emirates', 'Kuwait', 'Nigeria', 'Qatar', 'Angola'],
-        'Exportação (milhões de barris/dia)': [10.600, 5.225, 3.800, 3.770, 3.596, 2.296, 2.050, 1.979, 1.477, 1.420],
-        'Código País': ['SAU', 'RUS', 'IRQ', 'USA', 'CAN', 'ARE', 'KWT', 'NGA', 'QAT', 'AGO']
-    })
-
-    fig = px.choropleth(exportadores, 
-                        locations='Código País', 
-                        color='Exportação (milhões de barris/dia)',
-                        hover_name='País', 
-                        title='Principais Exportadores de Petróleo (dados de 2018)',
-                        color_continuous_scale=px.colors.sequential.Plasma,
-                        projection='natural earth')
-
-    fig.update_geos(showland=True, landcolor="lightgray",
-                    showcountries=True, countrycolor="Black")
-
-    st.plotly_chart(fig)
+    exibir_grafico(obter_mapa_geo(indicador, versao))
 
     st.write("### Legenda")
-    st.table(exportadores[['País', 'Exportação (milhões de barris/dia)']])
-
-def plotar_mapa_consumo():
-    consumidores = pd.DataFrame({
-        'País': ['United States', 'China', 'India', 'Japan', 'Saudi Arabia', 'Russia', 'South Korea', 'Canada', 'Brazil', 'Germany'],
-        'Consumo (milhões de barris/dia)': [19.400, 14.056, 5.271, 3.812, 3.788, 3.317, 2.760, 2.403, 2.398, 2.281],
-        'Código País': ['USA', 'CHN', 'IND', 'JPN', 'SAU', 'RUS', 'KOR', 'CAN', 'BRA', 'DEU']
-    })
-
-    fig = px.choropleth(consumidores, 
-                        locations='Código País', 
-                        color='Consumo (milhões de barris/dia)',
-                        hover_name='País', 
-                        title='Principais Consumidores de Petróleo (dados de 2019)',
-                        color_continuous_scale=px.colors.sequential.Plasma,
-                        projection='natural earth')
+    anos = sorted(agregados['Ano'].unique(), reverse=True)
+    ano = st.selectbox("Ano", anos, key=f"ano_geo_{indicador}") if len(anos) > 1 else anos[0]
+    legenda = agregados[agregados['Ano'] == ano].head(10)
+    rotulo = INDICADORES_GEO[indicador]['rotulo']
+    st.table(legenda[['País', 'Valor', 'Participação entre os Listados (%)', 'Código País']].rename(columns={'Valor': rotulo}))
+    st.caption(f"""
+        Os arquivos de dados_geo trazem {agregados.loc[agregados['Ano'] == ano, 'País'].nunique()} países em {ano}, não o mundo inteiro:
+        a participação é a fatia de cada país no total dos países listados.
+    """)
 
-    fig.update_geos(showland=True, landcolor="lightgray",
-                    showcountries=True, countrycolor="Black")
+def plotar_mapa_producao():
+    plotar_mapa_geo('producao')
 
-    st.plotly_chart(fig)
+def plotar_mapa_exportacao():
+    plotar_mapa_geo('exportacao')
 
-    st.write("### Legenda")
-    st.table(consumidores[['País', 'Consumo (milhões de barris/dia)']])
+def plotar_mapa_consumo():
+    plotar_mapa_geo('consumo')
 
 #------------------------------------------------------FIM GEO-PLOTS--------------------------------------------------------------------------
 
 #------------------------------------------------------INICIO SUBPRIME--------------------------------------------------------------------------
 
-def plotar_falencia_lehman_brothers(dados):
-    st.subheader("Falência do Lehman Brothers")
-    st.write("""
-        Em 15 de setembro de 2008, o Lehman Brothers, um dos maiores bancos de investimento dos Estados Unidos, declarou falência. 
-        Este evento é frequentemente visto como o auge da crise financeira global de 2008. A falência do Lehman Brothers teve um impacto significativo 
-        nos mercados financeiros globais, incluindo o mercado de petróleo.
-    """)
-
+def figura_falencia_lehman_brothers(dados, versao):
     dados_lehman = dados[(dados['Data'] >= '2007-01-01') & (dados['Data'] <= '2009-12-31')]
+    faixa = obter_indice_precos(versao, dados).estatisticas('2007-01-01', '2009-12-31')
     
     fig = go.Figure()
 
@@ -640,11 +1144,11 @@ def plotar_falencia_lehman_brothers(dados):
                              line=dict(color='blue')))
 
     fig.add_shape(type="line",
-                  x0='2008-09-15', y0=dados_lehman['Preco_petroleo_bruto_Brent_FOB'].min(),
-                  x1='2008-09-15', y1=dados_lehman['Preco_petroleo_bruto_Brent_FOB'].max(),
+                  x0='2008-09-15', y0=faixa['min'],
+                  x1='2008-09-15', y1=faixa['max'],
                   line=dict(color="red", width=2, dash="dash"))
 
-    fig.add_annotation(x='2008-09-15', y=dados_lehman['Preco_petroleo_bruto_Brent_FOB'].max(),
+    fig.add_annotation(x='2008-09-15', y=faixa['max'],
                        text="Falência do Lehman Brothers",
                        showarrow=True, arrowhead=1,
                        yshift=10)
@@ -655,8 +1159,19 @@ def plotar_falencia_lehman_brothers(dados):
         yaxis_title='Preço (USD)'
     )
 
-    st.plotly_chart(fig)
+    return fig
 
+def plotar_falencia_lehman_brothers(dados):
+    st.subheader("Falência do Lehman Brothers")
+    st.write("""
+        Em 15 de setembro de 2008, o Lehman Brothers, um dos maiores bancos de investimento dos Estados Unidos, declarou falência. 
+        Este evento é frequentemente visto como o auge da crise financeira global de 2008. A falência do Lehman Brothers teve um impacto significativo 
+        nos mercados financeiros globais, incluindo o mercado de petróleo.
+    """)
+
+    exibir_figura_pagina('falencia_lehman_brothers', dados)
+
+    dados_lehman = dados[(dados['Data'] >= '2007-01-01') & (dados['Data'] <= '2009-12-31')]
     csv = dados_lehman.to_csv(index=False).encode('utf-8')
     st.download_button(
         label="Baixar dados da Falência do Lehman Brothers como CSV",
@@ -665,15 +1180,9 @@ def plotar_falencia_lehman_brothers(dados):
         mime='text/csv',
     )
 
-def plotar_aprovacao_tarp(dados):
-    st.subheader("Aprovação do TARP")
-    st.write("""
-        Em 3 de outubro de 2008, o governo dos Estados Unidos aprovou o Programa de Alívio de Ativos Problemáticos (TARP) para estabilizar o sistema financeiro. 
-        O TARP autorizou o Departamento do Tesouro a gastar até 700 bilhões de dólares para comprar ativos tóxicos e fornecer capital a instituições financeiras. 
-        Esta medida teve um impacto significativo nos mercados financeiros, incluindo o mercado de petróleo.
-    """)
-
+def figura_aprovacao_tarp(dados, versao):
     dados_tarp = dados[(dados['Data'] >= '2007-01-01') & (dados['Data'] <= '2009-12-31')]
+    faixa = obter_indice_precos(versao, dados).estatisticas('2007-01-01', '2009-12-31')
     
     fig = go.Figure()
 
@@ -682,11 +1191,11 @@ def plotar_aprovacao_tarp(dados):
                              line=dict(color='blue')))
 
     fig.add_shape(type="line",
-                  x0='2008-10-03', y0=dados_tarp['Preco_petroleo_bruto_Brent_FOB'].min(),
-                  x1='2008-10-03', y1=dados_tarp['Preco_petroleo_bruto_Brent_FOB'].max(),
+                  x0='2008-10-03', y0=faixa['min'],
+                  x1='2008-10-03', y1=faixa['max'],
                   line=dict(color="green", width=2, dash="dash"))
 
-    fig.add_annotation(x='2008-10-03', y=dados_tarp['Preco_petroleo_bruto_Brent_FOB'].max(),
+    fig.add_annotation(x='2008-10-03', y=faixa['max'],
                        text="Aprovação do TARP",
                        showarrow=True, arrowhead=1,
                        yshift=-10)
@@ -696,8 +1205,19 @@ def plotar_aprovacao_tarp(dados):
         xaxis_title='Data',
         yaxis_title='Preço (USD)'
     )
-    st.plotly_chart(fig)
+    return fig
+
+def plotar_aprovacao_tarp(dados):
+    st.subheader("Aprovação do TARP")
+    st.write("""
+        Em 3 de outubro de 2008, o governo dos Estados Unidos aprovou o Programa de Alívio de Ativos Problemáticos (TARP) para estabilizar o sistema financeiro. 
+        O TARP autorizou o Departamento do Tesouro a gastar até 700 bilhões de dólares para comprar ativos tóxicos e fornecer capital a instituições financeiras. 
+        Esta medida teve um impacto significativo nos mercados financeiros, incluindo o mercado de petróleo.
+    """)
+
+    exibir_figura_pagina('aprovacao_tarp', dados)
 
+    dados_tarp = dados[(dados['Data'] >= '2007-01-01') & (dados['Data'] <= '2009-12-31')]
     csv = dados_tarp.to_csv(index=False).encode('utf-8')
     st.download_button(
         label="Baixar dados da Aprovação do TARP como CSV",
@@ -706,6 +1226,20 @@ def plotar_aprovacao_tarp(dados):
         mime='text/csv',
     )
 
+def calcular_volatilidade(dados, data_inicio, data_fim):
+    periodo = dados[(dados['Data'] >= data_inicio) & (dados['Data'] <= data_fim)].copy()
+    periodo['Retornos_Diarios'] = periodo['Preco_petroleo_bruto_Brent_FOB'].pct_change()
+    periodo['Volatilidade'] = periodo['Retornos_Diarios'].rolling(window=30).std()
+    return periodo
+
+def figura_volatilidade(dados, versao):
+    dados_volatilidade = calcular_volatilidade(dados, '2007-01-01', '2009-12-31')
+
+    fig = px.line(dados_volatilidade, x='Data', y='Volatilidade', title='Volatilidade dos Preços do Petróleo Brent (2007-2009)')
+    fig.update_xaxes(title_text='Data')
+    fig.update_yaxes(title_text='Volatilidade (30 dias)')
+    return fig
+
 def plotar_volatilidade(dados):
     st.subheader("Volatilidade dos Preços do Petróleo")
     st.write("""
@@ -713,15 +1247,9 @@ def plotar_volatilidade(dados):
         Isso reflete a incerteza e o pânico no mercado à medida que os preços do petróleo flutuavam drasticamente.
     """)
 
-    dados_volatilidade = dados[(dados['Data'] >= '2007-01-01') & (dados['Data'] <= '2009-12-31')]
-    dados_volatilidade['Retornos Diários'] = dados_volatilidade['Preco_petroleo_bruto_Brent_FOB'].pct_change()
-    dados_volatilidade['Volatilidade'] = dados_volatilidade['Retornos Diários'].rolling(window=30).std()
-
-    fig = px.line(dados_volatilidade, x='Data', y='Volatilidade', title='Volatilidade dos Preços do Petróleo Brent (2007-2009)')
-    fig.update_xaxes(title_text='Data')
-    fig.update_yaxes(title_text='Volatilidade (30 dias)')
-    st.plotly_chart(fig)
+    exibir_figura_pagina('volatilidade', dados)
 
+    dados_volatilidade = calcular_volatilidade(dados, '2007-01-01', '2009-12-31')
     csv = dados_volatilidade[['Data', 'Volatilidade']].dropna().to_csv(index=False).encode('utf-8')
     st.download_button(
         label="Baixar dados de Volatilidade como CSV",
@@ -735,31 +1263,26 @@ def plotar_volatilidade(dados):
 
 #------------------------------------------------------INICIO PLOTS PRIMAVERA-ARABE--------------------------------------------------------------------------
 
+def figura_comparacao_prepos_primavera_arabe(dados, versao):
+    periodos = (
+        ('Antes da Primavera Árabe', '2008-01-01', '2009-12-31'),
+        ('Durante a Primavera Árabe', '2010-01-01', '2011-12-31'),
+        ('Após a Primavera Árabe', '2012-01-01', '2014-12-31'),
+    )
+    resumos = obter_comparacao_periodos(versao, periodos, dados)
+    fig = criar_figura_box(resumos, 'Comparação de Preços do Petróleo Brent Antes, Durante e Após a Primavera Árabe')
+
+    return fig
+
 def plotar_comparacao_prepos_primavera_arabe(dados):
     st.subheader("Comparação de Preços Antes e Depois da Primavera Árabe")
     st.write("""
         Este gráfico compara os preços do petróleo Brent antes, durante e depois da Primavera Árabe, destacando o impacto dos eventos nos preços.
     """)
 
-    pre_arabe = dados[(dados['Data'] >= '2008-01-01') & (dados['Data'] < '2010-01-01')]
-    durante_arabe = dados[(dados['Data'] >= '2010-01-01') & (dados['Data'] < '2012-01-01')]
-    pos_arabe = dados[(dados['Data'] >= '2012-01-01') & (dados['Data'] <= '2014-12-31')]
-
-    fig = go.Figure()
-
-    fig.add_trace(go.Box(y=pre_arabe['Preco_petroleo_bruto_Brent_FOB'], name='Antes da Primavera Árabe', marker_color='blue'))
-    fig.add_trace(go.Box(y=durante_arabe['Preco_petroleo_bruto_Brent_FOB'], name='Durante a Primavera Árabe', marker_color='red'))
-    fig.add_trace(go.Box(y=pos_arabe['Preco_petroleo_bruto_Brent_FOB'], name='Após a Primavera Árabe', marker_color='green'))
-
-    fig.update_layout(
-        title='Comparação de Preços do Petróleo Brent Antes, Durante e Após a Primavera Árabe',
-        yaxis_title='Preço (USD)',
-        boxmode='group'
-    )
-
-    st.plotly_chart(fig)
+    exibir_figura_pagina('comparacao_prepos_primavera_arabe', dados)
 
-    dados_comparacao = pd.concat([pre_arabe, durante_arabe, pos_arabe])
+    dados_comparacao = dados[(dados['Data'] >= '2008-01-01') & (dados['Data'] <= '2014-12-31')]
     csv = dados_comparacao.to_csv(index=False).encode('utf-8')
     st.download_button(
         label="Baixar dados como CSV",
@@ -768,31 +1291,9 @@ def plotar_comparacao_prepos_primavera_arabe(dados):
         mime='text/csv',
     )
 
-def plotar_primavera_arabe(dados):
-    st.markdown("""
-    <div class="section-container">
-        <h2>Impacto da Primavera Árabe no Preço do Petróleo Brent</h2>
-        <p>
-            A Primavera Árabe, que começou em 2010, teve impactos significativos nas economias do Oriente Médio e Norte da África. Esses eventos aumentaram a incerteza global sobre a oferta de petróleo, elevando os preços de aproximadamente 90 para 125 dólares por barril em 2011.
-        </p>
-        <p>
-            A instabilidade política resultou em:
-        </p>
-        <ul>
-            <li>Interrupção da produção na Líbia e Iémen, reduzindo drasticamente a capacidade de exportação.</li>
-            <li>Reajustes nas políticas energéticas, com países como os EUA aumentando a produção doméstica.</li>
-            <li>Mudanças no poder geopolítico, afetando a capacidade da OPEP de coordenar políticas de produção.</li>
-            <li>Oportunidades para novos produtores, como Arábia Saudita e Rússia, aumentarem sua influência.</li>
-            <li>Maior investimento em energias renováveis e tecnologias de eficiência energética.</li>
-            <li>Impactos econômicos globais, como inflação e aumento nos custos de transporte e produção.</li>
-        </ul>
-        <p>
-            Vamos analisar como esses eventos afetaram os preços do petróleo Brent durante esse período.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
+def figura_primavera_arabe(dados, versao):
     dados_arabe = dados[(dados['Data'] >= '2010-01-01') & (dados['Data'] <= '2013-12-31')]
+    faixa = obter_indice_precos(versao, dados).estatisticas('2010-01-01', '2013-12-31')
 
     fig = go.Figure()
 
@@ -808,12 +1309,12 @@ def plotar_primavera_arabe(dados):
     for evento in eventos:
         fig.add_shape(
             type="line",
-            x0=evento['data'], y0=dados_arabe['Preco_petroleo_bruto_Brent_FOB'].min(),
-            x1=evento['data'], y1=dados_arabe['Preco_petroleo_bruto_Brent_FOB'].max(),
+            x0=evento['data'], y0=faixa['min'],
+            x1=evento['data'], y1=faixa['max'],
             line=dict(color=evento['cor'], width=2, dash="dash")
         )
         fig.add_annotation(
-            x=evento['data'], y=dados_arabe['Preco_petroleo_bruto_Brent_FOB'].max(),
+            x=evento['data'], y=faixa['max'],
             text=evento['evento'], showarrow=True, arrowhead=1,
             font=dict(color=evento['cor'], size=12),
             textangle=-65
@@ -845,8 +1346,35 @@ def plotar_primavera_arabe(dados):
         margin=dict(b=100)  
     )
 
-    st.plotly_chart(fig)
+    return fig
 
+def plotar_primavera_arabe(dados):
+    st.markdown("""
+    <div class="section-container">
+        <h2>Impacto da Primavera Árabe no Preço do Petróleo Brent</h2>
+        <p>
+            A Primavera Árabe, que começou em 2010, teve impactos significativos nas economias do Oriente Médio e Norte da África. Esses eventos aumentaram a incerteza global sobre a oferta de petróleo, elevando os preços de aproximadamente 90 para 125 dólares por barril em 2011.
+        </p>
+        <p>
+            A instabilidade política resultou em:
+        </p>
+        <ul>
+            <li>Interrupção da produção na Líbia e Iémen, reduzindo drasticamente a capacidade de exportação.</li>
+            <li>Reajustes nas políticas energéticas, com países como os EUA aumentando a produção doméstica.</li>
+            <li>Mudanças no poder geopolítico, afetando a capacidade da OPEP de coordenar políticas de produção.</li>
+            <li>Oportunidades para novos produtores, como Arábia Saudita e Rússia, aumentarem sua influência.</li>
+            <li>Maior investimento em energias renováveis e tecnologias de eficiência energética.</li>
+            <li>Impactos econômicos globais, como inflação e aumento nos custos de transporte e produção.</li>
+        </ul>
+        <p>
+            Vamos analisar como esses eventos afetaram os preços do petróleo Brent durante esse período.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    exibir_figura_pagina('primavera_arabe', dados)
+
+    dados_arabe = dados[(dados['Data'] >= '2010-01-01') & (dados['Data'] <= '2013-12-31')]
     csv = dados_arabe.to_csv(index=False).encode('utf-8')
     st.download_button(
         label="Baixar dados como CSV",
@@ -855,19 +1383,26 @@ def plotar_primavera_arabe(dados):
         mime='text/csv',
     )
 
+def figura_dispersao_retornos(dados, versao):
+    indice = obter_indice_choques(versao, dados)
+    dados_filtrados = indice.serie('2009-01-01', '2014-12-31').rename(columns={'Retorno': 'Retornos_Diarios'})
+    choques = indice.maiores_choques('2009-01-01', '2014-12-31', n=5)
+
+    fig = px.scatter(dados_filtrados, x='Data', y='Retornos_Diarios', title='Dispersão dos Retornos Diários do Preço do Petróleo Brent (2009-2014)', color='Retornos_Diarios', labels={'Retornos_Diarios': 'Retornos Diários'})
+    fig.add_trace(go.Scatter(x=choques['Data'], y=choques['Retorno'], mode='markers', name='Maiores Choques',
+                             marker=dict(symbol='circle-open', size=14, color='black', line=dict(width=2))))
+    fig.update_layout(xaxis_title='Data', yaxis_title='Retornos Diários', legend=dict(orientation="h", yanchor="top", y=-0.2))
+    return fig
+
 def plotar_dispersao_retornos(dados):
     st.subheader("Dispersão dos Retornos Diários do Preço do Petróleo Brent (2009-2014)")
     st.write("""
         Este gráfico mostra a dispersão dos retornos diários do preço do petróleo Brent, destacando a volatilidade durante o período de 2009 a 2014.
     """)
 
-    dados_filtrados = dados[(dados['Data'] >= '2009-01-01') & (dados['Data'] <= '2014-12-31')]
-    dados_filtrados['Retornos_Diarios'] = dados_filtrados['Preco_petroleo_bruto_Brent_FOB'].pct_change()
-
-    fig = px.scatter(dados_filtrados, x='Data', y='Retornos_Diarios', title='Dispersão dos Retornos Diários do Preço do Petróleo Brent (2009-2014)', color='Retornos_Diarios', labels={'Retornos_Diarios': 'Retornos Diários'})
-    fig.update_layout(xaxis_title='Data', yaxis_title='Retornos Diários')
-    st.plotly_chart(fig)
+    exibir_figura_pagina('dispersao_retornos', dados)
 
+    dados_filtrados = obter_indice_choques(versao_dados(), dados).serie('2009-01-01', '2014-12-31').rename(columns={'Retorno': 'Retornos_Diarios'})
     csv = dados_filtrados[['Data', 'Retornos_Diarios']].dropna().to_csv(index=False).encode('utf-8')
     st.download_button(
         label="Baixar dados como CSV",
@@ -879,29 +1414,9 @@ def plotar_dispersao_retornos(dados):
 
 #------------------------------------------------------INICIO PLOTS GUERRA_GOLFO--------------------------------------------------------------------------
 
-def plotar_guerra_golfo(dados):
-    st.subheader("Impacto da Guerra do Golfo no Preço do Petróleo Brent")
-    st.write("""
-        A Guerra do Golfo, ocorrida entre 1990 e 1991, foi um conflito de curta duração, mas de grande impacto global, especialmente no mercado de petróleo. Este gráfico ilustra a evolução dos preços do petróleo Brent durante a guerra, destacando eventos cruciais que influenciaram esses preços. Vamos explorar como esses eventos moldaram o mercado de petróleo e as economias globais.
-    """)
-
-    st.write("""
-        **Contexto Histórico:**
-
-        1. **Invasão do Kuwait (2 de agosto de 1990):**
-        
-        Em 2 de agosto de 1990, o Iraque, liderado por Saddam Hussein, invadiu o Kuwait, um dos maiores produtores de petróleo do mundo. Esta invasão não só provocou um aumento imediato nos preços do petróleo devido ao medo de uma interrupção significativa na oferta global, mas também gerou uma reação internacional que culminaria em um conflito militar.
-
-        2. **Início da Operação Tempestade no Deserto (17 de janeiro de 1991):**
-        
-        A resposta internacional veio na forma de uma coalizão liderada pelos Estados Unidos, que iniciou a Operação Tempestade no Deserto em 17 de janeiro de 1991. Esta operação tinha como objetivo liberar o Kuwait e proteger os interesses petrolíferos na região. Durante este período, a incerteza continuou a manter os preços do petróleo elevados.
-
-        3. **Fim da Guerra do Golfo (28 de fevereiro de 1991):**
-        
-        A guerra terminou oficialmente em 28 de fevereiro de 1991, quando as forças da coalizão declararam a libertação do Kuwait. Com o fim do conflito, houve uma expectativa de estabilização na produção e fornecimento de petróleo, o que levou a uma diminuição gradual nos preços.
-    """)
-
+def figura_guerra_golfo(dados, versao):
     dados_golfo = dados[(dados['Data'] >= '1990-01-01') & (dados['Data'] <= '1991-12-31')]
+    faixa = obter_indice_precos(versao, dados).estatisticas('1990-01-01', '1991-12-31')
 
     fig = go.Figure()
 
@@ -917,12 +1432,12 @@ def plotar_guerra_golfo(dados):
     for evento in eventos:
         fig.add_shape(
             type="line",
-            x0=evento['data'], y0=dados_golfo['Preco_petroleo_bruto_Brent_FOB'].min(),
-            x1=evento['data'], y1=dados_golfo['Preco_petroleo_bruto_Brent_FOB'].max(),
+            x0=evento['data'], y0=faixa['min'],
+            x1=evento['data'], y1=faixa['max'],
             line=dict(color=evento['cor'], width=2, dash="dash")
         )
         fig.add_annotation(
-            x=evento['data'], y=dados_golfo['Preco_petroleo_bruto_Brent_FOB'].max(),
+            x=evento['data'], y=faixa['max'],
             ax=0, ay=-30,
             text=evento['evento'], showarrow=True, arrowhead=2,
             arrowcolor=evento['cor'], arrowsize=1, arrowwidth=2,
@@ -956,8 +1471,33 @@ def plotar_guerra_golfo(dados):
         margin=dict(b=100)  
     )
 
-    st.plotly_chart(fig)
+    return fig
 
+def plotar_guerra_golfo(dados):
+    st.subheader("Impacto da Guerra do Golfo no Preço do Petróleo Brent")
+    st.write("""
+        A Guerra do Golfo, ocorrida entre 1990 e 1991, foi um conflito de curta duração, mas de grande impacto global, especialmente no mercado de petróleo. Este gráfico ilustra a evolução dos preços do petróleo Brent durante a guerra, destacando eventos cruciais que influenciaram esses preços. Vamos explorar como esses eventos moldaram o mercado de petróleo e as economias globais.
+    """)
+
+    st.write("""
+        **Contexto Histórico:**
+
+        1. **Invasão do Kuwait (2 de agosto de 1990):**
+        
+        Em 2 de agosto de 1990, o Iraque, liderado por Saddam Hussein, invadiu o Kuwait, um dos maiores produtores de petróleo do mundo. Esta invasão não só provocou um aumento imediato nos preços do petróleo devido ao medo de uma interrupção significativa na oferta global, mas também gerou uma reação internacional que culminaria em um conflito militar.
+
+        2. **Início da Operação Tempestade no Deserto (17 de janeiro de 1991):**
+        
+        A resposta internacional veio na forma de uma coalizão liderada pelos Estados Unidos, que iniciou a Operação Tempestade no Deserto em 17 de janeiro de 1991. Esta operação tinha como objetivo liberar o Kuwait e proteger os interesses petrolíferos na região. Durante este período, a incerteza continuou a manter os preços do petróleo elevados.
+
+        3. **Fim da Guerra do Golfo (28 de fevereiro de 1991):**
+        
+        A guerra terminou oficialmente em 28 de fevereiro de 1991, quando as forças da coalizão declararam a libertação do Kuwait. Com o fim do conflito, houve uma expectativa de estabilização na produção e fornecimento de petróleo, o que levou a uma diminuição gradual nos preços.
+    """)
+
+    exibir_figura_pagina('guerra_golfo', dados)
+
+    dados_golfo = dados[(dados['Data'] >= '1990-01-01') & (dados['Data'] <= '1991-12-31')]
     csv = dados_golfo.to_csv(index=False).encode('utf-8')
     st.download_button(
         label="Baixar dados como CSV",
@@ -966,21 +1506,23 @@ def plotar_guerra_golfo(dados):
         mime='text/csv',
     )
 
+def figura_volatilidade_guerra_golfo(dados, versao):
+    dados_golfo = calcular_volatilidade(dados, '1990-01-01', '1991-12-31')
+
+    fig = px.line(dados_golfo, x='Data', y='Volatilidade', title='Volatilidade dos Preços do Petróleo Brent Durante a Guerra do Golfo')
+    fig.update_xaxes(title_text='Data')
+    fig.update_yaxes(title_text='Volatilidade (30 dias)')
+    return fig
+
 def plotar_volatilidade_guerra_golfo(dados):
     st.subheader("Volatilidade dos Preços do Petróleo Durante a Guerra do Golfo")
     st.write("""
         Este gráfico mostra a volatilidade dos preços do petróleo Brent durante a Guerra do Golfo.
     """)
 
-    dados_golfo = dados[(dados['Data'] >= '1990-01-01') & (dados['Data'] <= '1991-12-31')]
-    dados_golfo['Retornos_Diarios'] = dados_golfo['Preco_petroleo_bruto_Brent_FOB'].pct_change()
-    dados_golfo['Volatilidade'] = dados_golfo['Retornos_Diarios'].rolling(window=30).std()
-
-    fig = px.line(dados_golfo, x='Data', y='Volatilidade', title='Volatilidade dos Preços do Petróleo Brent Durante a Guerra do Golfo')
-    fig.update_xaxes(title_text='Data')
-    fig.update_yaxes(title_text='Volatilidade (30 dias)')
-    st.plotly_chart(fig)
+    exibir_figura_pagina('volatilidade_guerra_golfo', dados)
 
+    dados_golfo = calcular_volatilidade(dados, '1990-01-01', '1991-12-31')
     csv = dados_golfo[['Data', 'Volatilidade']].dropna().to_csv(index=False).encode('utf-8')
     st.download_button(
         label="Baixar dados como CSV",
@@ -990,9 +1532,243 @@ def plotar_volatilidade_guerra_golfo(dados):
     )
 #------------------------------------------------------FIM PLOTS GUERRA_GOLFO--------------------------------------------------------------------------
 
+#------------------------------------------------------INICIO PLOTS EVENTOS DETECTADOS--------------------------------------------------------------------------
+
+# Períodos já cobertos pelas páginas com análise própria; episódios detectados dentro deles não viram novas opções de menu
+JANELAS_QUEDAS = [('2019-01-01', '2021-12-31'), ('2007-01-01', '2009-12-31')]
+JANELAS_AUMENTOS = [('2010-01-01', '2013-12-31'), ('1990-01-01', '1991-12-31')]
+EPISODIOS_NO_MENU = 3
+
+@st.cache_data
+@em_disco
+def obter_eventos_detectados(versao, _dados):
+    return gerar_eventos(_dados)
+
+def rotulo_episodio(episodio):
+    inicio, fim = episodio['Inicio'].year, episodio['Fim'].year
+    periodo = f"{inicio}" if inicio == fim else f"{inicio}-{fim}"
+    aberto = ", em aberto" if episodio['Em_Aberto'] else ""
+    return f"{periodo} ({episodio['Variacao']:+.0%}{aberto})"
+
+def episodios_menu(episodios, tipo, janelas):
+    selecionados = episodios[episodios['Tipo'] == tipo]
+    for inicio, fim in janelas:
+        selecionados = selecionados[(selecionados['Fim'] < inicio) | (selecionados['Inicio'] > fim)]
+    selecionados = selecionados.reindex(selecionados['Variacao'].abs().sort_values(ascending=False).index)
+    selecionados = selecionados.head(EPISODIOS_NO_MENU).sort_values('Inicio')
+    return {rotulo_episodio(episodio): episodio for _, episodio in selecionados.iterrows()}
+
+def plotar_episodio(dados, episodio, mudancas_regime):
+    st.write(f"""
+        Episódio detectado automaticamente: o preço do petróleo Brent foi de {episodio['Preco_Inicio']:.2f} {moeda()} em {episodio['Inicio']:%d/%m/%Y}
+        para {episodio['Preco_Fim']:.2f} {moeda()} em {episodio['Fim']:%d/%m/%Y}, uma variação de {episodio['Variacao']:.1%} em {episodio['Duracao_Dias']} dias.
+    """)
+    if episodio['Em_Aberto']:
+        st.caption("Episódio em aberto: o movimento ainda não terminou num pico ou vale confirmado, e o fim é o último preço disponível.")
+
+    margem = pd.Timedelta(days=max(90, episodio['Duracao_Dias'] // 4))
+    dados_episodio = dados[(dados['Data'] >= episodio['Inicio'] - margem) & (dados['Data'] <= episodio['Fim'] + margem)]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Variação", f"{episodio['Variacao']:.1%}")
+    col2.metric("Duração (dias)", episodio['Duracao_Dias'])
+    col3.metric(f"Preço Final ({moeda()})", f"{episodio['Preco_Fim']:.2f}")
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dados_episodio['Data'], y=dados_episodio['Preco_petroleo_bruto_Brent_FOB'],
+                             mode='lines', name='Preço do Brent (FOB)', line=dict(color='blue')))
+
+    cor = 'red' if episodio['Tipo'] == 'Queda' else 'green'
+    fig.add_vrect(x0=episodio['Inicio'], x1=episodio['Fim'], fillcolor=cor, opacity=0.15, line_width=0)
+    fig.add_trace(go.Scatter(x=[episodio['Inicio'], episodio['Fim']], y=[episodio['Preco_Inicio'], episodio['Preco_Fim']],
+                             mode='markers', name='Início e Fim do Episódio', marker=dict(color=cor, size=10)))
+
+    for mudanca in mudancas_regime:
+        if dados_episodio['Data'].min() <= mudanca <= dados_episodio['Data'].max():
+            fig.add_vline(x=mudanca, line=dict(color='gray', width=1, dash='dot'))
+    fig.add_trace(go.Scatter(x=[None], y=[None], mode='lines', line=dict(color='gray', dash='dot'), showlegend=True, name='Mudança de Regime'))
+
+    fig.update_layout(title=f"{episodio['Tipo']} do Preço do Petróleo Brent ({rotulo_episodio(episodio)})",
+                      xaxis_title='Data',
+                      yaxis_title='Preço (USD)')
+    exibir_grafico(fig)
+
+    csv = dados_episodio.to_csv(index=False).encode('utf-8')
+    st.download_button(
+        label="Baixar dados como CSV",
+        data=csv,
+        file_name=f"episodio_{episodio['Tipo'].lower()}_{episodio['Inicio']:%Y%m%d}.csv",
+        mime='text/csv',
+    )
+
+def figura_eventos_detectados(dados, versao, tipo):
+    eventos = obter_eventos_detectados(versao, dados)
+    episodios = eventos['episodios'][eventos['episodios']['Tipo'] == tipo]
+    titulo = "Quedas" if tipo == 'Queda' else "Aumentos"
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dados['Data'], y=dados['Preco_petroleo_bruto_Brent_FOB'], mode='lines', name='Preço do Brent (FOB)', line=dict(color='blue')))
+
+    cor = 'red' if tipo == 'Queda' else 'green'
+    for _, episodio in episodios.iterrows():
+        fig.add_vrect(x0=episodio['Inicio'], x1=episodio['Fim'], fillcolor=cor, opacity=0.15, line_width=0)
+    for mudanca in eventos['mudancas_regime']:
+        fig.add_vline(x=mudanca, line=dict(color='gray', width=1, dash='dot'))
+    fig.add_trace(go.Scatter(x=[None], y=[None], mode='lines', line=dict(color='gray', dash='dot'), showlegend=True, name='Mudança de Regime'))
+
+    fig.update_layout(title=f'{titulo} do Preço do Petróleo Brent',
+                      xaxis_title='Data',
+                      yaxis_title='Preço (USD)',
+                      height=600)
+    return fig
+
+def plotar_eventos_detectados(dados, eventos, tipo):
+    titulo = "Quedas" if tipo == 'Queda' else "Aumentos"
+    st.subheader(f"{titulo} Detectados Automaticamente")
+    st.write(f"""
+        Episódios identificados sobre todo o histórico a partir dos picos e vales do preço, com variação de pelo menos 30%.
+        As linhas pontilhadas marcam as mudanças de regime na volatilidade dos retornos diários. O último episódio pode
+        estar em aberto: vai do último pico ou vale até o preço mais recente, sem extremo confirmado no fim.
+    """)
+
+    episodios = eventos['episodios'][eventos['episodios']['Tipo'] == tipo]
+    maximo = eventos['maximo_drawdown']
+    st.metric("Máximo Drawdown do Histórico",
+              f"{maximo['variacao']:.1%}",
+              help=f"De {maximo['preco_pico']:.2f} {moeda()} em {maximo['data_pico']:%d/%m/%Y} até {maximo['preco_vale']:.2f} {moeda()} em {maximo['data_vale']:%d/%m/%Y}")
+
+    exibir_figura_pagina('quedas_detectadas' if tipo == 'Queda' else 'aumentos_detectados', dados)
+
+    tabela = episodios.assign(Variacao=(episodios['Variacao'] * 100).round(1)).rename(columns={
+        'Inicio': 'Início', 'Preco_Inicio': f'Preço Inicial ({moeda()})', 'Preco_Fim': f'Preço Final ({moeda()})',
+        'Variacao': 'Variação (%)', 'Duracao_Dias': 'Duração (dias)', 'Em_Aberto': 'Em Aberto'})
+    st.write(tabela.drop(columns='Tipo'))
+
+    csv = tabela.to_csv(index=False).encode('utf-8')
+    st.download_button(
+        label="Baixar eventos como CSV",
+        data=csv,
+        file_name=f'{titulo.lower()}_detectadas_preco_petroleo_brent.csv',
+        mime='text/csv',
+    )
+
+#------------------------------------------------------FIM PLOTS EVENTOS DETECTADOS--------------------------------------------------------------------------
+
+#------------------------------------------------------INICIO PLOTS CHOQUES--------------------------------------------------------------------------
+
+@st.cache_resource
+@em_disco
+def obter_indice_choques(versao, _dados):
+    return IndiceChoques(_dados)
+
+def plotar_maiores_choques(dados):
+    st.subheader("Maiores Choques de Retorno")
+    st.write("""
+        Selecione um intervalo de datas para listar os maiores movimentos diários do preço do petróleo Brent.
+        O z-score compara o retorno do dia com a média e o desvio padrão dos 60 dias anteriores.
+    """)
+
+    indice = obter_indice_choques(versao_dados(), dados)
+    data_min = pd.Timestamp(indice.datas[0]).date()
+    data_max = pd.Timestamp(indice.datas[-1]).date()
+
+    data_inicio, data_fim = st.slider("Selecione o intervalo de datas", min_value=data_min, max_value=data_max, value=(data_min, data_max), format="DD/MM/YYYY", key="intervalo_choques")
+    col1, col2 = st.columns(2)
+    quantidade = col1.number_input("Quantidade de choques", min_value=1, max_value=100, value=10)
+    criterio = col2.radio("Ordenar por", ['Retorno', 'Z-Score'], horizontal=True)
+
+    choques = indice.maiores_choques(data_inicio, data_fim, n=int(quantidade), criterio='retorno' if criterio == 'Retorno' else 'zscore')
+    serie = indice.serie(data_inicio, data_fim)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=serie['Data'], y=serie['Preco'], mode='lines', name='Preço do Brent (FOB)', line=dict(color='blue')))
+    fig.add_trace(go.Scatter(x=choques['Data'], y=choques['Preco'], mode='markers', name='Choques',
+                             marker=dict(size=10, color=np.where(choques['Retorno'] >= 0, 'green', 'red')),
+                             text=[f"{retorno:+.1%}" for retorno in choques['Retorno']],
+                             hovertemplate='%{x|%d/%m/%Y}<br>Preço: %{y:.2f}<br>Retorno: %{text}<extra></extra>'))
+    fig.update_layout(title='Maiores Choques de Retorno do Preço do Petróleo Brent',
+                      xaxis_title='Data',
+                      yaxis_title='Preço (USD)')
+    exibir_grafico(fig)
+
+    tabela = choques.assign(Retorno=(choques['Retorno'] * 100).round(2), Z_Score=choques['Z_Score'].round(2))
+    tabela = tabela.rename(columns={'Preco': f'Preço ({moeda()})', 'Retorno': 'Retorno (%)', 'Z_Score': 'Z-Score'})
+    st.write(tabela)
+
+    csv = tabela.to_csv(index=False).encode('utf-8')
+    st.download_button(
+        label="Baixar dados como CSV",
+        data=csv,
+        file_name='maiores_choques_preco_petroleo_brent.csv',
+        mime='text/csv',
+    )
+
+#------------------------------------------------------FIM PLOTS CHOQUES--------------------------------------------------------------------------
+
 #------------------------------------------------------INICIO PLOTS PREVISOES--------------------------------------------------------------------------
 
+# Valores iniciais dos controles da página de ML; são os cenários calculados no aquecimento
+CAMINHOS_CENARIOS = [10000, 20000, 50000, 100000]
+CAMINHOS_PADRAO = 20000
+SEMENTE_PADRAO = 42
+
+@st.cache_data
+@em_disco
+def obter_cenarios(versao, data_inicio, horizonte, modelo, caminhos, semente):
+    # As previsões são em USD, então os cenários partem sempre da série original, não da unidade escolhida
+    precos = carregar_precos_cache(versao).sort_values('Data')
+    precos = precos[precos['Data'] <= data_inicio]
+    return simular_cenarios(precos['Preco_petroleo_bruto_Brent_FOB'].to_numpy(), precos['Data'].to_numpy(), horizonte, modelo, caminhos, semente)
+
+def horizonte_cenarios(dados_historicos, dados_previsao):
+    # Os cenários partem do último dia histórico e vão, em dias úteis, até o fim da previsão
+    data_inicio = dados_historicos['Data'].iloc[-1]
+    return data_inicio, len(pd.bdate_range(data_inicio + pd.Timedelta(days=1), dados_previsao['Data'].iloc[-1]))
+
+def exibir_monitor_previsoes():
+    st.subheader("Monitoramento da Previsão")
+    st.markdown(f"""
+    <p style="text-align: justify;">
+    Cada preço atual obtido por web scraping é registrado junto com o valor previsto para o mesmo dia ou, quando o modelo não tem previsão para ele, para a data prevista mais recente (no máximo um registro a cada {INTERVALO_MINIMO_REGISTRO // 60} minutos).
+    O erro médio absoluto (MAE), o erro percentual médio (MAPE) e o viés (previsto menos observado) são acompanhados nos últimos {JANELA_MONITOR} registros.
+    </p>
+    """, unsafe_allow_html=True)
+
+    historico = historico_monitor()
+    if historico.empty:
+        st.info("Ainda não há registros: eles aparecem quando a página obtém o preço atual.")
+        return
+
+    limite = st.number_input("Limite de alerta do MAPE móvel (%)", min_value=0.5, value=LIMITE_MAPE_PADRAO, step=0.5, key="limite_mape")
+    ultimo = historico.iloc[-1]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("MAE Móvel (USD)", f"{ultimo['MAE']:.2f}")
+    col2.metric("MAPE Móvel", f"{ultimo['MAPE']:.2f}%")
+    col3.metric("Viés Móvel (USD)", f"{ultimo['Vies']:+.2f}")
+    col4.metric("Registros", f"{len(historico):,}")
+    if ultimo['MAPE'] > limite:
+        st.error(f"O MAPE móvel ({ultimo['MAPE']:.2f}%) está acima do limite de {limite:.2f}%: a previsão se afastou dos preços observados.")
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=historico['Instante'], y=historico['MAPE'], mode='lines', name='MAPE Móvel (%)', line=dict(color='red')))
+    acima = historico[historico['MAPE'] > limite]
+    fig.add_trace(go.Scatter(x=acima['Instante'], y=acima['MAPE'], mode='markers', name='Acima do Limite', marker=dict(color='darkred', size=8)))
+    fig.add_trace(go.Scatter(x=historico['Instante'], y=historico['Vies'], mode='lines', name='Viés Móvel', yaxis='y2',
+                             line=dict(color='gray', dash='dot')))
+    fig.add_hline(y=limite, line=dict(color='red', dash='dash'), annotation_text='Limite de alerta')
+    fig.update_layout(title='Deriva da Previsão do Petróleo Brent', xaxis_title='Registro', yaxis_title='MAPE (%)',
+                      yaxis2=dict(title='Viés (previsto - observado)', overlaying='y', side='right', showgrid=False, zeroline=True),
+                      legend=dict(x=1.08))
+    exibir_grafico(fig)
+
+def adicionar_faixa(fig, datas, inferior, superior, nome, cor):
+    fig.add_trace(go.Scatter(x=datas, y=superior, mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=datas, y=inferior, mode='lines', line=dict(width=0), fill='tonexty', fillcolor=cor, name=nome))
+
 def criar_grafico_previsoes():
+    prazo = prazo_pagina('ML')
+    ao_vivo = preco_ao_vivo_ativo()
+    busca_preco = None if ao_vivo else iniciar_busca_externa('preco_atual', obter_preco_atual)
     st.subheader("Previsão de Preços do Petróleo Brent")
 
     st.markdown("""
@@ -1008,20 +1784,24 @@ As previsões de preços do petróleo Brent até maio de 2025, indicadas pela li
 </p>
 """, unsafe_allow_html=True)
 
-    dados = pd.read_csv('Filtered_DataFrame_2020-2025.csv')
-    dados['Data'] = pd.to_datetime(dados['Data'])
+    if moeda() != 'USD':
+        st.info("As previsões, o preço atual e o monitoramento desta página ficam em USD/barril, a unidade em que o modelo foi treinado.")
 
-    dados_filtrados = dados[(dados['Data'] >= '2020-01-01') & (dados['Data'] <= '2025-05-20')]
-    dados_historicos = dados_filtrados[dados_filtrados['Data'] <= '2024-05-20']
-    dados_previsao = dados_filtrados[dados_filtrados['Data'] > '2024-05-20']
+    dados_filtrados = carregar_previsoes()
+    dados_historicos = dados_filtrados[dados_filtrados['Tipo'] == 'Historico']
+    dados_previsao = dados_filtrados[dados_filtrados['Tipo'] == 'Previsao']
     data_atual = datetime.now()
-    data_str = data_atual.strftime('%Y-%m-%d')
-    valor_previsto = dados_previsao[dados_previsao['Data'] == data_str]['Preco'].values
+    data_prevista, valor_previsto = previsao_para_data(dados_previsao, data_atual)
 
-    if len(valor_previsto) > 0:
-        valor_previsto = valor_previsto[0]
-    else:
-        valor_previsto = "N/A"
+    st.markdown("""
+    <p style="text-align: justify;">
+    As faixas laranjas mostram a incerteza da previsão: milhares de trajetórias simuladas a partir do último preço histórico, por movimento browniano geométrico ou reamostrando blocos de retornos dos últimos cinco anos. Metade dos cenários termina dentro da faixa escura e 90% dentro da faixa clara.
+    </p>
+    """, unsafe_allow_html=True)
+    col_modelo, col_caminhos, col_semente = st.columns(3)
+    modelo = col_modelo.selectbox("Modelo dos cenários", list(MODELOS_CENARIOS), format_func=MODELOS_CENARIOS.get, key="modelo_cenarios")
+    caminhos = col_caminhos.selectbox("Trajetórias simuladas", CAMINHOS_CENARIOS, index=CAMINHOS_CENARIOS.index(CAMINHOS_PADRAO), key="caminhos_cenarios")
+    semente = col_semente.number_input("Semente", min_value=0, value=SEMENTE_PADRAO, step=1, key="semente_cenarios")
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=dados_historicos['Data'], y=dados_historicos['Preco'], mode='lines', name='Histórico', line=dict(color='blue')))
@@ -1032,13 +1812,25 @@ As previsões de preços do petróleo Brent até maio de 2025, indicadas pela li
                                  y=[dados_historicos['Preco'].iloc[-1], dados_previsao['Preco'].iloc[0]],
                                  mode='lines', line=dict(color='blue'), showlegend=False))
 
+    if {'Preco_Inferior', 'Preco_Superior'} <= set(dados_previsao.columns):
+        # Intervalo de confiança do Prophet, presente nas previsões geradas por treinamento.py
+        adicionar_faixa(fig, dados_previsao['Data'], dados_previsao['Preco_Inferior'], dados_previsao['Preco_Superior'],
+                        'Intervalo do Modelo', 'rgba(255, 0, 0, 0.1)')
+
+    if not dados_historicos.empty and not dados_previsao.empty:
+        data_inicio, horizonte = horizonte_cenarios(dados_historicos, dados_previsao)
+        cenarios = obter_cenarios(versao_precos(), data_inicio, horizonte, modelo, caminhos, semente)
+        adicionar_faixa(fig, cenarios['Data'], cenarios['P5'], cenarios['P95'], 'Cenários 5%–95%', 'rgba(255, 165, 0, 0.2)')
+        adicionar_faixa(fig, cenarios['Data'], cenarios['P25'], cenarios['P75'], 'Cenários 25%–75%', 'rgba(255, 165, 0, 0.4)')
+        fig.add_trace(go.Scatter(x=cenarios['Data'], y=cenarios['P50'], mode='lines', name='Mediana dos Cenários',
+                                 line=dict(color='darkorange', dash='dash')))
+
     fig.update_layout(title='Previsão de Preços do Petróleo Brent (2020-2025)',
                       xaxis_title='Data',
                       yaxis_title='Preço (FOB)')
 
-    st.plotly_chart(fig)
-    preco_atual = obter_preco_atual()
-    
+    exibir_grafico(fig)
+
     st.markdown("""
     <p style="text-align: justify;">
     Utilizamos técnicas de web scraping para coletar os dados mais recentes do preço atual do petróleo Brent. Em seguida, comparamos esses dados com as previsões geradas pelo nosso modelo.
@@ -1046,8 +1838,19 @@ As previsões de preços do petróleo Brent até maio de 2025, indicadas pela li
     """, unsafe_allow_html=True)
 
     col1, col2 = st.columns(2)
-    col1.metric(label="Preço Atual do Petróleo Brent (USD)", value=preco_atual)
-    col2.metric(label="Valor Previsto no Gráfico (USD)", value=valor_previsto)
+    if ao_vivo:
+        with col1:
+            exibir_preco_ao_vivo(completo=False)
+    else:
+        espaco_preco = col1.empty()
+        espaco_preco.metric(label="Preço Atual do Petróleo Brent (USD)", value=TEXTO_CARREGANDO)
+    col2.metric(label="Valor Previsto no Gráfico (USD)", value="N/A" if valor_previsto is None else f"{valor_previsto:.2f}")
+    if data_prevista is None:
+        col2.caption("O modelo não tem previsão até a data de hoje.")
+    elif data_prevista.date() != data_atual.date():
+        # O monitoramento compara o preço de hoje com a previsão mais recente; a data dela fica visível
+        col2.caption(f"Sem previsão para hoje ({data_atual:%d/%m/%Y}): valor previsto para {data_prevista:%d/%m/%Y}, "
+                     f"{(data_atual.date() - data_prevista.date()).days} dias antes.")
 
     st.subheader("Prophet")
 
@@ -1060,19 +1863,139 @@ As previsões de preços do petróleo Brent até maio de 2025, indicadas pela li
     with open("ml_prophet.ipynb", "rb") as file:
         st.download_button(label="Baixar Notebook", data=file, file_name="notebook_projetos_analises.ipynb")
 
+    if not ao_vivo:
+        preco_atual = aguardar_busca_externa(busca_preco, prazo)
+        espaco_preco.metric(label="Preço Atual do Petróleo Brent (USD)", value=preco_atual or TEXTO_INDISPONIVEL)
+        if preco_atual and valor_previsto is not None:
+            registrar_previsao(converter_precos(pd.Series([preco_atual])).iloc[0], valor_previsto)
+
+    exibir_monitor_previsoes()
+
 
 #------------------------------------------------------FIM PLOTS PREVISOES--------------------------------------------------------------------------        
 
 #------------------------------------------------------FIM PLOTS--------------------------------------------------------------------------
 
+#------------------------------------------------------INICIO NOTÍCIAS--------------------------------------------------------------------------
+
+NOTICIAS_POR_PAGINA = 10
+ORDENACOES_NOTICIAS = {'data': 'Mais recentes', 'movimento': 'Maior movimento do Brent'}
+
+@st.cache_data
+def sincronizar_alinhamento(versao, versao_noticias):
+    # Alinha ao preço só os artigos que ainda não têm pregão nesta versão dos dados
+    return atualizar_alinhamento(versao, carregar_precos_cache(versao))
+
+@st.cache_data
+def obter_marcadores_noticias(versao, versao_noticias):
+    sincronizar_alinhamento(versao, versao_noticias)
+    return noticias_por_pregao(versao)
+
+def formatar_retorno_noticia(retorno):
+    return "—" if pd.isna(retorno) else f"{retorno:+.2%}"
+
+def adicionar_marcadores_noticias(fig, data_inicio=None, data_fim=None):
+    # Triângulos na base do gráfico, num eixo próprio, para não depender da unidade do preço exibido. Devolve
+    # um aviso quando o arquivo tem notícias, mas nenhuma cai num pregão do histórico de preços
+    versao = versao_precos()
+    marcadores = obter_marcadores_noticias(versao, versao_arquivo_noticias())
+    if marcadores.empty:
+        arquivo = intervalo_arquivo()
+        ultimo_preco = carregar_precos_cache(versao)['Data'].max()
+        if not arquivo['quantidade'] or arquivo['primeira'] <= ultimo_preco:
+            return None
+        return (f"As notícias do arquivo ({arquivo['quantidade']}, de {arquivo['primeira']:%d/%m/%Y} a {arquivo['ultima']:%d/%m/%Y}) "
+                f"são posteriores ao último preço do histórico ({ultimo_preco:%d/%m/%Y}), então o gráfico não tem marcadores de notícias.")
+    if data_inicio is not None:
+        marcadores = marcadores[(marcadores['dia_pregao'] >= pd.Timestamp(data_inicio)) & (marcadores['dia_pregao'] <= pd.Timestamp(data_fim))]
+    if marcadores.empty:
+        return None
+
+    retornos = marcadores['retorno_dia'].fillna(0)
+    titulos = marcadores['titulos'].str.split(' \| ').str[:3].str.join('<br>')
+    # Uma linha por marcador, com os retornos já formatados: um array numpy converteria tudo para texto
+    dados_hover = [[int(quantidade), formatar_retorno_noticia(dia), formatar_retorno_noticia(seguinte), titulo]
+                   for quantidade, dia, seguinte, titulo in zip(marcadores['quantidade'], marcadores['retorno_dia'],
+                                                                marcadores['retorno_seguinte'], titulos)]
+    fig.add_trace(go.Scatter(
+        x=marcadores['dia_pregao'], y=[0.02] * len(marcadores), yaxis='y2', mode='markers', name='Notícias',
+        marker=dict(symbol='triangle-up', size=(8 + (retornos.abs() * 400).clip(upper=12)).tolist(),
+                    color=np.where(retornos >= 0, 'green', 'red')),
+        customdata=dados_hover,
+        hovertemplate='%{x|%d/%m/%Y}: %{customdata[0]} notícia(s)<br>Brent no dia: %{customdata[1]}'
+                      '<br>Dia seguinte: %{customdata[2]}<br>%{customdata[3]}<extra></extra>',
+    ))
+    fig.update_layout(yaxis2=dict(overlaying='y', range=[0, 1], visible=False))
+    return None
+
+def exibir_noticias():
+    prazo = prazo_pagina('Notícias')
+    # A NewsAPI só alimenta o arquivo local, em segundo plano; a página lê sempre do arquivo
+    busca_noticias = iniciar_busca_externa('noticias', buscar_noticias, NEWS_API_KEY)
+    st.subheader("Notícias Relacionadas ao Petróleo")
+
+    arquivo = intervalo_arquivo()
+    if not arquivo['quantidade']:
+        # Arquivo vazio (primeira execução): espera a busca dentro do tempo limite da página
+        with st.spinner("Buscando notícias..."):
+            aguardar_busca_externa(busca_noticias, prazo)
+        arquivo = intervalo_arquivo()
+    if not arquivo['quantidade']:
+        if not busca_noticias.done():
+            st.warning("As notícias estão demorando para responder. Atualize a página em alguns instantes.")
+        else:
+            st.error("Não foi possível buscar as notícias. Verifique sua chave de API.")
+        return
+
+    versao = versao_precos()
+    sincronizar_alinhamento(versao, versao_arquivo_noticias())
+
+    col_busca, col_periodo = st.columns([2, 1])
+    termos = col_busca.text_input("Buscar no arquivo de notícias", placeholder="Ex.: opep produção", key="busca_noticias")
+    periodo = col_periodo.date_input("Período", value=(arquivo['primeira'].date(), arquivo['ultima'].date()), format="DD/MM/YYYY", key="periodo_noticias")
+    data_inicio = periodo[0] if periodo else None
+    data_fim = periodo[1] if len(periodo) > 1 else data_inicio
+
+    col_ordem, col_movimento = st.columns([2, 1])
+    ordenar_por = col_ordem.selectbox("Ordenar por", list(ORDENACOES_NOTICIAS), format_func=ORDENACOES_NOTICIAS.get, key="ordem_noticias")
+    movimento_minimo = col_movimento.slider("Movimento mínimo do Brent (%)", 0.0, 10.0, 0.0, 0.5, key="movimento_noticias",
+                                            help="Maior variação absoluta entre o pregão da notícia e o pregão seguinte")
+    filtros = dict(versao_precos=versao, ordenar_por=ordenar_por, movimento_minimo=movimento_minimo / 100 if movimento_minimo else None)
+
+    pagina = st.session_state.get('pagina_noticias', 1)
+    noticias, total = buscar_no_arquivo(termos, data_inicio, data_fim, pagina, NOTICIAS_POR_PAGINA, **filtros)
+    paginas = max(1, -(-total // NOTICIAS_POR_PAGINA))
+    if pagina > paginas:
+        # A busca mudou e a página escolhida deixou de existir
+        st.session_state['pagina_noticias'] = pagina = 1
+        noticias, total = buscar_no_arquivo(termos, data_inicio, data_fim, pagina, NOTICIAS_POR_PAGINA, **filtros)
+
+    st.caption(f"{total} de {arquivo['quantidade']} notícias arquivadas · página {pagina} de {paginas}")
+    if noticias.empty:
+        st.info("Nenhuma notícia encontrada para essa busca.")
+    for _, noticia in noticias.iterrows():
+        st.write(f"### {noticia['titulo']}")
+        st.write(f"**Fonte**: {noticia['fonte']} · {pd.Timestamp(noticia['publicada_em']):%d/%m/%Y}" if noticia['publicada_em'] else f"**Fonte**: {noticia['fonte']}")
+        st.write(noticia['descricao'])
+        if pd.notna(noticia['dia_pregao']):
+            seguinte = f"{noticia['retorno_seguinte']:+.2%}" if pd.notna(noticia['retorno_seguinte']) else "sem dados"
+            st.caption(f"Brent no pregão de {pd.Timestamp(noticia['dia_pregao']):%d/%m/%Y}: {noticia['retorno_dia']:+.2%} · pregão seguinte: {seguinte}")
+        st.write(f"[Leia mais]({noticia['url']})")
+
+    st.number_input("Página", min_value=1, max_value=paginas, step=1, key="pagina_noticias")
+
+#------------------------------------------------------FIM NOTÍCIAS--------------------------------------------------------------------------
+
 #------------------------------------------------------INICIO MENU QUEDAS--------------------------------------------------------------------------
 
 def quedas(dados):
     st.title("Análise do Preço do Petróleo Brent")
+    eventos = obter_eventos_detectados(versao_dados(), dados)
+    detectados = episodios_menu(eventos['episodios'], 'Queda', JANELAS_QUEDAS)
     submenu = option_menu(
         menu_title="",  
-        options=["Covid-19", "Crise Financeira 2008"],
-        icons=["virus", "dropbox"],
+        options=["Covid-19", "Crise Financeira 2008"] + list(detectados) + ["Todas as Quedas"],
+        icons=["virus", "dropbox"] + ["graph-down"] * len(detectados) + ["list-ul"],
         menu_icon="cast",
         default_index=0,
         orientation="horizontal"
@@ -1089,16 +2012,25 @@ def quedas(dados):
         plotar_aprovacao_tarp(dados)
         plotar_volatilidade(dados)
 
+    elif submenu in detectados:
+        st.title(f"Queda {submenu}")
+        plotar_episodio(dados, detectados[submenu], eventos['mudancas_regime'])
+
+    elif submenu == "Todas as Quedas":
+        plotar_eventos_detectados(dados, eventos, 'Queda')
+
 #------------------------------------------------------FIM MENU QUEDAS--------------------------------------------------------------------------
 
 #------------------------------------------------------INICIO MENU AUMENTOS--------------------------------------------------------------------------
 
 def aumentos(dados):
     st.title("Análise do Preço do Petróleo Brent")
+    eventos = obter_eventos_detectados(versao_dados(), dados)
+    detectados = episodios_menu(eventos['episodios'], 'Aumento', JANELAS_AUMENTOS)
     submenu = option_menu(
         menu_title="",  
-        options=["Primavera Árabe","Guerra do Golfo"],
-        icons=["globe", "peace"],
+        options=["Primavera Árabe","Guerra do Golfo"] + list(detectados) + ["Todos os Aumentos"],
+        icons=["globe", "peace"] + ["graph-up"] * len(detectados) + ["list-ul"],
         menu_icon="cast",
         default_index=0,
         orientation="horizontal"
@@ -1112,16 +2044,126 @@ def aumentos(dados):
         
     elif submenu == "Guerra do Golfo":
         st.title("Guerra do Golfo")
-        plotar_guerra_golfo(dados)
-        plotar_volatilidade_guerra_golfo(dados)
+        if dados['Data'].min() > pd.Timestamp('1991-12-31'):
+            # Em reais a série só começa no Plano Real, depois da guerra
+            st.info(f"Não há preços em reais antes de {INICIO_PLANO_REAL:%d/%m/%Y} (Plano Real). Escolha USD/barril na barra lateral para ver este período.")
+        else:
+            plotar_guerra_golfo(dados)
+            plotar_volatilidade_guerra_golfo(dados)
+
+    elif submenu in detectados:
+        st.title(f"Aumento {submenu}")
+        plotar_episodio(dados, detectados[submenu], eventos['mudancas_regime'])
+
+    elif submenu == "Todos os Aumentos":
+        plotar_eventos_detectados(dados, eventos, 'Aumento')
 
 #------------------------------------------------------FIM MENU AUMETOS--------------------------------------------------------------------------
 
+#------------------------------------------------------INICIO AQUECIMENTO DO CACHE--------------------------------------------------------------------------
+
+# Figuras das páginas sem controles, calculadas por obter_figura com a versão dos dados
+FIGURAS_PAGINAS = {
+    'impacto_covid': figura_impacto_covid,
+    'eventos_vacina': figura_eventos_vacina,
+    'comparacao_pre_pandemia': figura_comparacao_pre_pandemia,
+    'falencia_lehman_brothers': figura_falencia_lehman_brothers,
+    'aprovacao_tarp': figura_aprovacao_tarp,
+    'volatilidade': figura_volatilidade,
+    'primavera_arabe': figura_primavera_arabe,
+    'comparacao_prepos_primavera_arabe': figura_comparacao_prepos_primavera_arabe,
+    'dispersao_retornos': figura_dispersao_retornos,
+    'guerra_golfo': figura_guerra_golfo,
+    'volatilidade_guerra_golfo': figura_volatilidade_guerra_golfo,
+    'quedas_detectadas': partial(figura_eventos_detectados, tipo='Queda'),
+    'aumentos_detectados': partial(figura_eventos_detectados, tipo='Aumento'),
+}
+
+# Com AQUECER_CACHE=0 as páginas são calculadas só na primeira visita, como antes
+AQUECER_CACHE = os.environ.get('AQUECER_CACHE', '1') != '0'
+
+def aquecer_mapa_geo(indicador, versao):
+    if not carregar_geodados_agregados(versao)[indicador].empty:
+        obter_mapa_geo(indicador, versao)
+
+def aquecer_correlacoes(versao, versao_arquivos_macro, dados):
+    # Os valores iniciais da página: todas as séries, janelas padrão, variações diárias
+    nomes = tuple(coluna for coluna in obter_painel_macro(versao, versao_arquivos_macro, dados).columns if coluna != 'Brent')
+    if nomes:
+        obter_figuras_correlacoes(versao, versao_arquivos_macro, nomes, tuple(JANELAS_PADRAO), next(iter(TRANSFORMACOES)), next(iter(FREQUENCIAS)), dados)
+
+def tarefas_aquecimento(versao, dados):
+    # Tudo o que as páginas calculam sem depender dos controles, na unidade padrão (USD/barril)
+    tarefas = [
+        ('Índice de preços', obter_indice_precos, (versao, dados)),
+        ('Índice de choques', obter_indice_choques, (versao, dados)),
+        ('Quedas e aumentos detectados', obter_eventos_detectados, (versao, dados)),
+        ('Decomposição STL', obter_decomposicao, (versao, dados)),
+        ('Indicadores técnicos', obter_indicadores, (versao, UNIDADE_PADRAO, tuple(PERIODOS_EMA), dados)),
+    ]
+    tarefas += [(f'Gráfico {nome}', obter_figura, (nome, versao, dados)) for nome in FIGURAS_PAGINAS]
+    tarefas += [(f'Mapa {indicador}', aquecer_mapa_geo, (indicador, versao_geodados())) for indicador in INDICADORES_GEO]
+    if versao_macro():
+        tarefas.append(('Correlações', aquecer_correlacoes, (versao, versao_macro(), dados)))
+
+    previsoes = carregar_previsoes()
+    dados_historicos = previsoes[previsoes['Tipo'] == 'Historico']
+    dados_previsao = previsoes[previsoes['Tipo'] == 'Previsao']
+    if not dados_historicos.empty and not dados_previsao.empty:
+        cenarios = (versao, *horizonte_cenarios(dados_historicos, dados_previsao), next(iter(MODELOS_CENARIOS)), CAMINHOS_PADRAO, SEMENTE_PADRAO)
+        tarefas.append(('Cenários de Monte Carlo', obter_cenarios, cenarios))
+    return tarefas
+
+def executar_aquecimento(estado):
+    inicio = time.monotonic()
+    try:
+        versao = versao_precos()
+        dados = carregar_precos_cache(versao)
+        tarefas = tarefas_aquecimento(versao, dados)
+        estado['total'] = len(tarefas)
+        for rotulo, funcao, argumentos in tarefas:
+            estado['etapa'] = rotulo
+            try:
+                funcao(*argumentos)
+            except Exception as erro:
+                # Uma página com problema (ex.: sem arquivos em dados_geo) não impede o aquecimento das outras
+                estado['erros'].append(f"{rotulo}: {erro}")
+            estado['concluidas'] += 1
+    except Exception as erro:
+        estado['erros'].append(f"Preços: {erro}")
+    finally:
+        estado['duracao'] = time.monotonic() - inicio
+        estado['pronto'].set()
+
+@st.cache_resource
+def obter_aquecimento():
+    # Uma vez por processo: a primeira execução do script dispara o aquecimento em segundo plano, e as páginas
+    # que chegarem antes dele terminar calculam (ou leem do disco) o que precisarem, como sem aquecimento
+    estado = {'total': 0, 'concluidas': 0, 'etapa': None, 'erros': [], 'duracao': None, 'pronto': threading.Event()}
+    if AQUECER_CACHE:
+        threading.Thread(target=executar_aquecimento, args=(estado,), name='aquecimento_cache', daemon=True).start()
+    else:
+        estado['pronto'].set()
+    return estado
+
+def exibir_estado_aquecimento(estado):
+    if not estado['pronto'].is_set():
+        progresso = estado['concluidas'] / estado['total'] if estado['total'] else 0.0
+        st.sidebar.progress(progresso, text=f"Preparando as páginas ({estado['concluidas']} de {estado['total'] or '...'})")
+    elif AQUECER_CACHE:
+        resumo = CACHE_PAGINAS.resumo()
+        st.sidebar.caption(f"Páginas prontas em {estado['duracao']:.1f} s · cache em disco com {resumo['entradas']} itens "
+                           f"({resumo['bytes'] / 1e6:.1f} de {resumo['limite_bytes'] / 1e6:.0f} MB)")
+        if estado['erros']:
+            st.sidebar.caption("Não aquecidos: " + "; ".join(estado['erros']))
+
+#------------------------------------------------------FIM AQUECIMENTO DO CACHE--------------------------------------------------------------------------
+
 #------------------------------------------------------FUNÇÃO PRINCIPAL --------------------------------------------------------------------------
 def main():
     st.set_page_config(page_title="Análise do Preço do Petróleo Brent", layout="wide")
-    caminho_arquivo = 'petroleo.xlsx'
-    dados = carregar_dados(caminho_arquivo)
+    st.session_state['tamanhos_graficos'] = []
+    aquecimento = obter_aquecimento()
     with st.sidebar:
         selecionado = option_menu(
             menu_title="Menu Principal",  
@@ -1130,6 +2172,10 @@ def main():
             menu_icon="cast",  
             default_index=0,  
         )
+    seletor_unidade()
+    seletor_preco_ao_vivo()
+    unidade = unidade_selecionada()
+    dados = carregar_precos_cache(versao_precos()) if unidade == UNIDADE_PADRAO else carregar_dados_unidade(versao_dados(), unidade)
 
     if selecionado == "Introdução":
         introducao(dados)
@@ -1140,20 +2186,14 @@ def main():
     elif selecionado == "Aumentos":
         aumentos(dados)
     elif selecionado == "Notícias":
-        st.subheader("Notícias Relacionadas ao Petróleo")
-        noticias = buscar_noticias(NEWS_API_KEY)
-        if noticias:
-            for noticia in noticias:
-                st.write(f"### {noticia['title']}")
-                st.write(f"**Fonte**: {noticia['source']['name']}")
-                st.write(noticia['description'])
-                st.write(f"[Leia mais]({noticia['url']})")
-        else:
-            st.error("Não foi possível buscar as notícias. Verifique sua chave de API.")
+        exibir_noticias()
     elif selecionado == "ML":
         criar_grafico_previsoes()
     elif selecionado == "Conclusão":
         conclusao()
+
+    exibir_tamanhos_graficos()
+    exibir_estado_aquecimento(aquecimento)
    
 if __name__ == "__main__":
     main()
@@ -0,0 +1,301 @@
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+# Teste de carga do dashboard: N sessões headless (streamlit.testing) rodam ao mesmo tempo no mesmo processo,
+# como no servidor do Streamlit, e seguem um roteiro de navegação pelos menus e sliders. O Google e a NewsAPI
+# são substituídos por servidores locais com latência configurável. Ao final são mostrados p50/p95/p99 do
+# tempo de cada rerun por página, a vazão total e a memória de cada página. Os avisos registrados pelo
+# Streamlit e pelas bibliotecas durante um rerun (como a conversão de uma tabela para Arrow que falhou)
+# são contados à parte dos erros, por página.
+#
+# Uso: python teste_carga.py --sessoes 8 --repeticoes 3 --latencia-google 0.5 --latencia-noticias 1.0
+
+TEMPO_LIMITE_RERUN = 120
+PERCENTIS = [50, 95, 99]
+
+# Cada passo seleciona opções nos menus (principal e submenu) e, opcionalmente, move um slider da página
+# ou liga o modo ao vivo do preço
+ROTEIRO = [
+    {'pagina': 'Introdução', 'menus': ['Introdução']},
+    {'pagina': 'Introdução (ao vivo)', 'menus': ['Introdução'], 'ao_vivo': True},
+    {'pagina': 'Dados Brutos', 'menus': ['Dados Brutos', 'Dados Brutos']},
+    {'pagina': 'Preço ao Longo do Tempo', 'menus': ['Dados Brutos', 'Preço ao Longo do Tempo'], 'slider': 0},
+    {'pagina': 'Estatísticas Descritivas', 'menus': ['Dados Brutos', 'Estatísticas Descritivas'], 'slider': 'intervalo_estatisticas'},
+    {'pagina': 'Análise de Tendências', 'menus': ['Dados Brutos', 'Análise de Tendências'], 'slider': 0},
+    {'pagina': 'GeoPlot', 'menus': ['Dados Brutos', 'GeoPlot', 'Produção']},
+    {'pagina': 'Choques de Retorno', 'menus': ['Dados Brutos', 'Choques de Retorno'], 'slider': 'intervalo_choques'},
+    {'pagina': 'Comparação de Períodos', 'menus': ['Dados Brutos', 'Comparação de Períodos']},
+    {'pagina': 'Correlações', 'menus': ['Dados Brutos', 'Correlações']},
+    {'pagina': 'Covid-19', 'menus': ['Quedas', 'Covid-19']},
+    {'pagina': 'Crise Financeira 2008', 'menus': ['Quedas', 'Crise Financeira 2008']},
+    {'pagina': 'Todas as Quedas', 'menus': ['Quedas', 'Todas as Quedas']},
+    {'pagina': 'Primavera Árabe', 'menus': ['Aumentos', 'Primavera Árabe']},
+    {'pagina': 'Guerra do Golfo', 'menus': ['Aumentos', 'Guerra do Golfo']},
+    {'pagina': 'Notícias', 'menus': ['Notícias']},
+    {'pagina': 'ML', 'menus': ['ML']},
+    {'pagina': 'Conclusão', 'menus': ['Conclusão']},
+]
+
+SCRIPT_SESSAO = "import tech_challenge_4\ntech_challenge_4.main()\n"
+
+#------------------------------------------------------SERVIDORES LOCAIS--------------------------------------------------------------------------
+
+HTML_GOOGLE = '<html><body><span class="NprOob">85,12</span></body></html>'
+
+def noticias_simuladas(quantidade=20):
+    return {'status': 'ok', 'totalResults': quantidade, 'articles': [{
+        'source': {'id': None, 'name': f'Fonte {i}'},
+        'title': f'Preço do petróleo Brent: notícia simulada {i}',
+        'description': 'Texto simulado sobre o mercado de petróleo para o teste de carga.',
+        'url': f'http://localhost/noticia/{i}',
+        'publishedAt': (pd.Timestamp('2024-05-20') - pd.Timedelta(days=i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+    } for i in range(quantidade)]}
+
+def criar_servidor_simulado(corpo, tipo, latencia):
+    contador = {'requisicoes': 0}
+    trava = threading.Lock()
+
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with trava:
+                contador['requisicoes'] += 1
+            time.sleep(latencia)
+            self.send_response(200)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Manipulador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, contador
+
+def iniciar_servidores(latencia_google, latencia_noticias):
+    google, contador_google = criar_servidor_simulado(HTML_GOOGLE.encode('utf-8'), 'text/html; charset=utf-8', latencia_google)
+    noticias, contador_noticias = criar_servidor_simulado(
+        json.dumps(noticias_simuladas(), ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8', latencia_noticias)
+    # Lidas pelo dashboard na importação, então precisam estar definidas antes dela
+    os.environ['URL_PRECO_ATUAL'] = f'http://127.0.0.1:{google.server_port}/search'
+    os.environ['URL_NEWSAPI'] = f'http://127.0.0.1:{noticias.server_port}/v2/everything'
+    # As notícias e o preço simulados não devem ir para o arquivo de notícias nem para o monitoramento reais
+    os.environ.setdefault('ARQUIVO_NOTICIAS', os.path.join(tempfile.mkdtemp(), 'noticias.db'))
+    os.environ.setdefault('MONITOR_PREVISOES', os.path.join(tempfile.mkdtemp(), 'monitor_previsoes.db'))
+    return [google, noticias], {'google': contador_google, 'newsapi': contador_noticias}
+
+#------------------------------------------------------AVISOS--------------------------------------------------------------------------
+
+# Avisos que o Streamlit emite fora de um rerun (threads de aquecimento e das buscas externas)
+AVISOS_IGNORADOS = ['missing ScriptRunContext']
+
+class ContadorAvisos(logging.Handler):
+    # O rerun roda numa thread do AppTest: o aviso é atribuído à sessão pelo contexto do script, que traz o
+    # identificador gravado por executar_passo no session_state
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.por_sessao = Counter()
+        self.mensagens = Counter()
+        self.trava = threading.Lock()
+
+    def emit(self, record):
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        if record.levelno < logging.WARNING and record.exc_info is None:
+            return
+        mensagem = record.getMessage()
+        if any(ignorado in mensagem for ignorado in AVISOS_IGNORADOS):
+            return
+        if record.exc_info is not None:
+            mensagem = f"{mensagem} ({record.exc_info[1]!r})"
+        contexto = get_script_run_ctx(suppress_warning=True)
+        sessao = contexto.session_state['sessao_teste_carga'] if contexto is not None and 'sessao_teste_carga' in contexto.session_state else None
+        with self.trava:
+            self.por_sessao[sessao] += 1
+            self.mensagens[mensagem.splitlines()[0][:300]] += 1
+
+    def zerar(self, sessao):
+        with self.trava:
+            self.por_sessao.pop(sessao, None)
+
+    def contar(self, sessao):
+        with self.trava:
+            return self.por_sessao[sessao]
+
+CONTADOR_AVISOS = ContadorAvisos()
+
+def registrar_contador_avisos():
+    # Os loggers do Streamlit não propagam para a raiz: o contador entra em cada um. Os avisos do módulo
+    # warnings (pandas, pyarrow) passam pelo logger "py.warnings"
+    logging.captureWarnings(True)
+    nomes = [nome for nome in logging.Logger.manager.loggerDict if nome.startswith('streamlit')] + ['streamlit', 'py.warnings']
+    for nome in nomes:
+        logging.getLogger(nome).addHandler(CONTADOR_AVISOS)
+
+#------------------------------------------------------SESSÕES--------------------------------------------------------------------------
+
+def menu_roteirizado(menu_title, options, default_index=0, **kwargs):
+    # Substitui o option_menu (componente do navegador, sem suporte no modo headless): escolhe a opção
+    # do menu que estiver no passo atual do roteiro da sessão. A busca começa pelo fim porque o submenu
+    # "Dados Brutos" tem o mesmo nome da opção do menu principal
+    import streamlit as st
+    escolhidas = st.session_state.get('roteiro_menus', [])
+    return next((opcao for opcao in reversed(escolhidas) if opcao in options), options[default_index])
+
+def preparar_dashboard():
+    import tech_challenge_4
+    tech_challenge_4.option_menu = menu_roteirizado
+    # Como no servidor, as sessões só começam depois do aquecimento do cache das páginas
+    aquecimento = tech_challenge_4.obter_aquecimento()
+    aquecimento['pronto'].wait()
+    print(f"Aquecimento: {aquecimento['concluidas']} de {aquecimento['total']} itens em {aquecimento['duracao']:.1f} s")
+
+def mover_slider(sessao, slider, gerador):
+    controle = sessao.slider(key=slider) if isinstance(slider, str) else sessao.slider[slider]
+    inicio, fim = sorted(gerador.uniform(0, 1, size=2))
+    minimo, maximo = pd.Timestamp(controle.min), pd.Timestamp(controle.max)
+    # Os sliders de datas do dashboard trabalham com datetime.date
+    controle.set_value(tuple((minimo + (maximo - minimo) * fracao).date() for fracao in (inicio, fim)))
+
+def executar_passo(sessao, passo, gerador):
+    medicoes = []
+    sessao.session_state['roteiro_menus'] = passo['menus']
+    sessao.session_state['preco_ao_vivo'] = passo.get('ao_vivo', False)
+    sessao.session_state['sessao_teste_carga'] = id(sessao)
+    CONTADOR_AVISOS.zerar(id(sessao))
+    inicio = time.perf_counter()
+    sessao.run(timeout=TEMPO_LIMITE_RERUN)
+    medicoes.append((passo['pagina'], time.perf_counter() - inicio, len(sessao.exception), CONTADOR_AVISOS.contar(id(sessao))))
+
+    if 'slider' in passo and not sessao.exception:
+        mover_slider(sessao, passo['slider'], gerador)
+        CONTADOR_AVISOS.zerar(id(sessao))
+        inicio = time.perf_counter()
+        sessao.run(timeout=TEMPO_LIMITE_RERUN)
+        medicoes.append((f"{passo['pagina']} (slider)", time.perf_counter() - inicio, len(sessao.exception), CONTADOR_AVISOS.contar(id(sessao))))
+    return medicoes
+
+def executar_sessao(indice, repeticoes, semente):
+    from streamlit.testing.v1 import AppTest
+
+    gerador = np.random.default_rng(semente + indice)
+    sessao = AppTest.from_string(SCRIPT_SESSAO, default_timeout=TEMPO_LIMITE_RERUN)
+    roteiro = list(ROTEIRO)
+    medicoes = []
+    for _ in range(repeticoes):
+        # Cada sessão percorre as páginas em uma ordem diferente, como visitantes reais
+        random.Random(int(gerador.integers(1 << 31))).shuffle(roteiro)
+        for passo in roteiro:
+            medicoes.extend(executar_passo(sessao, passo, gerador))
+    return medicoes
+
+def medir_memoria_paginas():
+    # Passada sequencial, com uma sessão só, para que a memória alocada seja atribuída a uma página
+    from streamlit.testing.v1 import AppTest
+
+    memoria = {}
+    sessao = AppTest.from_string(SCRIPT_SESSAO, default_timeout=TEMPO_LIMITE_RERUN)
+    tracemalloc.start()
+    for passo in ROTEIRO:
+        sessao.session_state['roteiro_menus'] = passo['menus']
+        sessao.session_state['preco_ao_vivo'] = passo.get('ao_vivo', False)
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+        sessao.run(timeout=TEMPO_LIMITE_RERUN)
+        atual, pico = tracemalloc.get_traced_memory()
+        memoria[passo['pagina']] = {'pico_mb': (pico - antes) / 2 ** 20, 'retida_mb': (atual - antes) / 2 ** 20}
+    tracemalloc.stop()
+    return memoria
+
+#------------------------------------------------------RELATÓRIO--------------------------------------------------------------------------
+
+def resumir(medicoes, duracao, memoria):
+    tabela = pd.DataFrame(medicoes, columns=['pagina', 'segundos', 'erros', 'avisos'])
+    resumo = tabela.groupby('pagina').agg(reruns=('segundos', 'size'), erros=('erros', 'sum'), avisos=('avisos', 'sum'))
+    for percentil in PERCENTIS:
+        resumo[f'p{percentil}_ms'] = tabela.groupby('pagina')['segundos'].quantile(percentil / 100) * 1000
+    resumo['media_ms'] = tabela.groupby('pagina')['segundos'].mean() * 1000
+    paginas_memoria = pd.DataFrame(memoria).T
+    resumo = resumo.join(paginas_memoria, how='left')
+
+    geral = {
+        'reruns': int(len(tabela)),
+        'erros': int(tabela['erros'].sum()),
+        'avisos': int(tabela['avisos'].sum()),
+        'duracao_s': duracao,
+        'vazao_reruns_s': len(tabela) / duracao if duracao else 0.0,
+        **{f'p{percentil}_ms': float(np.percentile(tabela['segundos'], percentil) * 1000) for percentil in PERCENTIS},
+        # ru_maxrss é em KB no Linux
+        'memoria_maxima_processo_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    return resumo.round(1), geral
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do dashboard com sessões simultâneas")
+    parser.add_argument('--sessoes', type=int, default=8, help="Sessões simultâneas")
+    parser.add_argument('--repeticoes', type=int, default=2, help="Vezes que cada sessão percorre o roteiro")
+    parser.add_argument('--latencia-google', type=float, default=0.5, help="Segundos de resposta do Google simulado")
+    parser.add_argument('--latencia-noticias', type=float, default=1.0, help="Segundos de resposta da NewsAPI simulada")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--sem-memoria', action='store_true', help="Não executa a passada de memória por página")
+    parser.add_argument('--saida', help="Grava o relatório em JSON neste arquivo")
+    parser.add_argument('--falhar-com-avisos', action='store_true', help="Sai com código 1 se algum rerun registrar avisos")
+    argumentos = parser.parse_args()
+
+    # Os avisos do Streamlit de cada rerun (x sessões x páginas) esconderiam o relatório
+    os.environ.setdefault('STREAMLIT_LOGGER_LEVEL', 'error')
+    servidores, contadores = iniciar_servidores(argumentos.latencia_google, argumentos.latencia_noticias)
+    preparar_dashboard()
+    registrar_contador_avisos()
+
+    memoria = {} if argumentos.sem_memoria else medir_memoria_paginas()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=argumentos.sessoes) as executor:
+        futuros = [executor.submit(executar_sessao, indice, argumentos.repeticoes, argumentos.semente)
+                   for indice in range(argumentos.sessoes)]
+        medicoes = [medicao for futuro in futuros for medicao in futuro.result()]
+    duracao = time.perf_counter() - inicio
+
+    for servidor in servidores:
+        servidor.shutdown()
+
+    resumo, geral = resumir(medicoes, duracao, memoria)
+    geral['requisicoes_externas'] = {nome: contador['requisicoes'] for nome, contador in contadores.items()}
+    geral['mensagens_avisos'] = dict(CONTADOR_AVISOS.mensagens.most_common())
+
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(resumo)
+    print(f"\n{geral['reruns']} reruns em {duracao:.1f} s ({geral['vazao_reruns_s']:.2f} reruns/s) com {argumentos.sessoes} sessões, "
+          f"{geral['erros']} erros, {geral['avisos']} avisos")
+    print("Geral: " + ", ".join(f"p{percentil}={geral[f'p{percentil}_ms']:.0f} ms" for percentil in PERCENTIS))
+    print(f"Memória máxima do processo: {geral['memoria_maxima_processo_mb']:.0f} MB; "
+          f"requisições externas: {geral['requisicoes_externas']}")
+    for mensagem, quantidade in geral['mensagens_avisos'].items():
+        print(f"Aviso ({quantidade}x): {mensagem}")
+
+    if argumentos.saida:
+        with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump({'paginas': json.loads(resumo.to_json(orient='index')), 'geral': geral,
+                       'parametros': vars(argumentos)}, arquivo, ensure_ascii=False, indent=2)
+
+    if argumentos.falhar_com_avisos and (geral['erros'] or geral['avisos']):
+        raise SystemExit(f"{geral['erros']} erros e {geral['avisos']} avisos durante o teste de carga")
+
+if __name__ == "__main__":
+    main()
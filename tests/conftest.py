@@ -0,0 +1,23 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Os módulos do projeto ficam soltos na raiz do repositório, sem pacote instalado
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados import COLUNA_PRECO
+
+def pytest_configure(config):
+    # Execuções reais do dashboard: rodam com o resto da suíte; -m "not slow" as deixa de fora
+    config.addinivalue_line('markers', 'slow: execução de ponta a ponta que leva alguns segundos')
+
+@pytest.fixture
+def precos_sinteticos():
+    # Passeio aleatório log-normal em dias úteis, no formato de carregar_dados
+    gerador = np.random.default_rng(7)
+    datas = pd.bdate_range('2015-01-01', periods=1500)
+    precos = 60 * np.exp(np.cumsum(gerador.normal(0, 0.02, len(datas))))
+    return pd.DataFrame({'Data': datas, COLUNA_PRECO: precos})
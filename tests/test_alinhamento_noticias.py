@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from alinhamento_noticias import alinhar_noticias, atualizar_alinhamento, noticias_por_pregao
+from arquivo_noticias import arquivar_noticias, buscar_no_arquivo
+from dados import COLUNA_PRECO
+
+@pytest.fixture
+def precos():
+    # Quinta, sexta e segunda-feira
+    return pd.DataFrame({'Data': pd.to_datetime(['2024-05-16', '2024-05-17', '2024-05-20']), COLUNA_PRECO: [80.0, 84.0, 79.8]})
+
+def test_noticia_vai_para_o_pregao_do_dia_ou_seguinte(precos):
+    noticias = pd.DataFrame({'id': [1, 2, 3, 4],
+                             'publicada_em': ['2024-05-17T23:00:00Z', '2024-05-18T10:00:00Z', '2024-05-21T08:00:00Z', 'sem data']})
+    alinhados = alinhar_noticias(noticias, precos).set_index('noticia_id')
+    assert list(alinhados['dia_pregao'].iloc[:2]) == ['2024-05-17', '2024-05-20']
+    # Fim de semana conta para a segunda-feira; depois do último preço ou sem data, não há pregão
+    assert alinhados.loc[[3, 4], 'dia_pregao'].isna().all()
+    assert alinhados.loc[1, 'retorno_dia'] == pytest.approx(0.05)
+    assert alinhados.loc[1, 'retorno_seguinte'] == pytest.approx(-0.05)
+    assert alinhados.loc[2, 'movimento'] == pytest.approx(0.05)
+    assert np.isnan(alinhados.loc[2, 'retorno_seguinte'])
+
+def test_alinhamento_incremental_por_versao(tmp_path):
+    precos = pd.DataFrame({'Data': pd.to_datetime(['2024-05-16', '2024-05-17', '2024-05-20', '2024-05-21']),
+                           COLUNA_PRECO: [80.0, 88.0, 83.6, 84.436]})
+    caminho = str(tmp_path / 'noticias.db')
+    arquivar_noticias([{'url': 'https://exemplo.com/1', 'title': 'Brent sobe', 'publishedAt': '2024-05-16T10:00:00Z'},
+                       {'url': 'https://exemplo.com/2', 'title': 'Brent cai', 'publishedAt': '2024-05-19T10:00:00Z'}], caminho)
+    assert atualizar_alinhamento('v1', precos, caminho) == 2
+    # Nada pendente na mesma versão; uma versão nova dos preços realinha tudo
+    assert atualizar_alinhamento('v1', precos, caminho) == 0
+    assert atualizar_alinhamento('v2', precos, caminho) == 2
+
+    pregoes = noticias_por_pregao('v2', caminho)
+    assert list(pregoes['dia_pregao'].dt.strftime('%Y-%m-%d')) == ['2024-05-16', '2024-05-20']
+    assert list(pregoes['quantidade']) == [1, 1]
+    # Movimentos de 10% (alta da sexta, pregão seguinte à notícia de quinta) e 5% (queda da segunda): a ordem
+    # por movimento é a inversa da ordem por data
+    ordenadas, _ = buscar_no_arquivo(caminho=caminho, versao_precos='v2', ordenar_por='movimento')
+    assert list(ordenadas['titulo']) == ['Brent sobe', 'Brent cai']
+    np.testing.assert_allclose(ordenadas['movimento'], [0.10, 0.05])
+    filtradas, total = buscar_no_arquivo(caminho=caminho, versao_precos='v2', movimento_minimo=0.06)
+    assert total == 1 and list(filtradas['titulo']) == ['Brent sobe']
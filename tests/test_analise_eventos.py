@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from analise_eventos import calcular_drawdown, detectar_episodios, detectar_mudancas_regime, maximo_drawdown
+
+def trechos(*pontos, dias=40):
+    # Série geométrica passando pelos pontos dados, com o último ponto como preço mais recente
+    partes = [np.geomspace(inicio, fim, dias, endpoint=False) for inicio, fim in zip(pontos[:-1], pontos[1:])]
+    precos = np.concatenate(partes + [[pontos[-1]]])
+    return pd.bdate_range('2020-01-01', periods=len(precos)).to_numpy(), precos
+
+def test_drawdown_relativo_ao_pico_acumulado():
+    datas = pd.bdate_range('2020-01-01', periods=5).to_numpy()
+    precos = np.array([10.0, 12.0, 6.0, 9.0, 13.0])
+    np.testing.assert_allclose(calcular_drawdown(precos), [0, 0, -0.5, -0.25, 0])
+    maximo = maximo_drawdown(datas, precos)
+    assert maximo['preco_pico'] == 12 and maximo['preco_vale'] == 6
+    assert maximo['variacao'] == -0.5
+
+def test_episodios_alternam_e_o_ultimo_fica_em_aberto():
+    datas, precos = trechos(100, 200, 90, 150, 95)
+    episodios = detectar_episodios(datas, precos, limiar=0.3)
+    assert list(episodios['Tipo']) == ['Queda', 'Aumento', 'Queda']
+    np.testing.assert_allclose(episodios['Variacao'], [90 / 200 - 1, 150 / 90 - 1, 95 / 150 - 1])
+    assert list(episodios['Em_Aberto']) == [False, False, True]
+    assert episodios['Fim'].iloc[-1] == pd.Timestamp(datas[-1])
+
+def test_trecho_final_abaixo_do_limiar_nao_vira_episodio():
+    # 150 -> 130 não confirma o pico: a alta que começou em 90 continua em aberto até o último preço
+    datas, precos = trechos(100, 200, 90, 150, 130)
+    episodios = detectar_episodios(datas, precos, limiar=0.3)
+    assert list(episodios['Tipo']) == ['Queda', 'Aumento']
+    assert episodios['Em_Aberto'].iloc[-1]
+    assert episodios['Preco_Fim'].iloc[-1] == 130
+
+def test_serie_sem_extremos_devolve_tabela_vazia_com_colunas():
+    datas, precos = trechos(100, 110)
+    episodios = detectar_episodios(datas, precos, limiar=0.3)
+    assert episodios.empty and 'Em_Aberto' in episodios.columns
+
+def test_pelt_encontra_a_mudanca_de_volatilidade():
+    gerador = np.random.default_rng(1)
+    retornos = np.r_[gerador.normal(0, 0.01, 300), gerador.normal(0, 0.05, 300)]
+    precos = 100 * np.exp(np.r_[0, np.cumsum(retornos)])
+    datas = pd.bdate_range('2020-01-01', periods=len(precos))
+    mudancas = detectar_mudancas_regime(datas.to_numpy(), precos)
+    assert len(mudancas) == 1
+    # O retorno 300 é a variação entre os preços 300 e 301
+    assert abs(datas.get_loc(mudancas[0]) - 301) <= 5
+
+def test_pelt_sem_mudanca_em_serie_estacionaria():
+    gerador = np.random.default_rng(2)
+    precos = 100 * np.exp(np.r_[0, np.cumsum(gerador.normal(0, 0.01, 600))])
+    datas = pd.bdate_range('2020-01-01', periods=len(precos)).to_numpy()
+    assert detectar_mudancas_regime(datas, precos) == []
@@ -0,0 +1,131 @@
+import gzip
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import api_http
+from dados import COLUNA_PRECO, carregar_previsoes
+
+def limpar_caches():
+    for funcao in (api_http.obter_precos, api_http.obter_indicadores, api_http.obter_indice_precos, api_http.obter_previsoes):
+        funcao.cache_clear()
+
+@pytest.fixture
+def versao(monkeypatch, tmp_path, precos_sinteticos):
+    # A camada de dados lê preços sintéticos e um CSV de previsões temporário em vez dos arquivos do projeto
+    caminho = tmp_path / 'previsoes.csv'
+    datas = pd.bdate_range('2024-05-01', '2024-06-28')
+    pd.DataFrame({'Data': datas, 'Preco': np.linspace(80, 85, len(datas))}).to_csv(caminho, index=False)
+    atual = {'dados': 'v1'}
+    monkeypatch.setattr(api_http, 'carregar_precos', lambda: precos_sinteticos)
+    monkeypatch.setattr(api_http, 'versao_dados', lambda: atual['dados'])
+    monkeypatch.setattr(api_http, 'caminho_previsoes', lambda: str(caminho))
+    monkeypatch.setattr(api_http, 'carregar_previsoes', lambda: carregar_previsoes(str(caminho)))
+    limpar_caches()
+    yield atual
+    limpar_caches()
+
+@pytest.fixture
+def servidor(versao):
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), api_http.ManipuladorAPI)
+    # Intervalo curto de verificação: o shutdown ao fim de cada teste não espera meio segundo
+    thread = threading.Thread(target=servidor.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    yield servidor.server_address[1]
+    servidor.shutdown()
+    servidor.server_close()
+
+def requisitar(porta, caminho, **cabecalhos):
+    # http.client não descomprime o gzip: o teste vê o corpo exatamente como foi enviado
+    conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=10)
+    conexao.request('GET', caminho, headers={nome.replace('_', '-'): valor for nome, valor in cabecalhos.items()})
+    resposta = conexao.getresponse()
+    corpo = resposta.read()
+    conexao.close()
+    return resposta.status, resposta.headers, corpo
+
+def test_precos_paginados_com_link_para_a_proxima(servidor, precos_sinteticos):
+    status, cabecalhos, corpo = requisitar(servidor, '/precos?por_pagina=400&pagina=2')
+    assert status == 200 and cabecalhos['Content-Type'].startswith('application/json')
+    resposta = json.loads(corpo)
+    assert (resposta['pagina'], resposta['total'], resposta['total_paginas']) == (2, 1500, 4)
+    assert cabecalhos['X-Total-Count'] == '1500'
+    assert resposta['proxima'] == '/precos?por_pagina=400&pagina=3'
+    assert cabecalhos['Link'] == '</precos?por_pagina=400&pagina=3>; rel="next"'
+    esperado = precos_sinteticos.iloc[400:800]
+    assert [registro['Data'] for registro in resposta['dados']] == list(esperado['Data'].dt.strftime('%Y-%m-%d'))
+    np.testing.assert_allclose([registro[COLUNA_PRECO] for registro in resposta['dados']], esperado[COLUNA_PRECO])
+
+def test_ultima_pagina_sem_proxima(servidor):
+    status, cabecalhos, corpo = requisitar(servidor, '/precos?por_pagina=400&pagina=4')
+    resposta = json.loads(corpo)
+    assert status == 200 and len(resposta['dados']) == 300
+    assert 'proxima' not in resposta and 'Link' not in cabecalhos
+
+def test_filtro_de_datas_inclusivo(servidor):
+    _, _, corpo = requisitar(servidor, '/precos?inicio=2016-03-01&fim=2016-03-31')
+    datas = [registro['Data'] for registro in json.loads(corpo)['dados']]
+    assert datas[0] == '2016-03-01' and datas[-1] == '2016-03-31' and len(datas) == 23
+
+@pytest.mark.parametrize('consulta', ['/precos?inicio=ontem', '/precos?fim=2020-13-45', '/precos?pagina=5&por_pagina=400',
+                                      '/precos?pagina=0', '/precos?por_pagina=10001', '/precos?por_pagina=abc'])
+def test_parametros_invalidos_respondem_400(servidor, consulta):
+    status, cabecalhos, corpo = requisitar(servidor, consulta)
+    assert status == 400 and cabecalhos['Content-Type'].startswith('application/json')
+    assert json.loads(corpo)['erro']
+
+def test_recurso_desconhecido_responde_404(servidor):
+    status, _, corpo = requisitar(servidor, '/cotacoes')
+    assert status == 404 and 'cotacoes' in json.loads(corpo)['erro']
+
+def test_etag_e_get_condicional(servidor, versao):
+    status, cabecalhos, _ = requisitar(servidor, '/precos?inicio=2016-01-01')
+    etag = cabecalhos['ETag']
+    assert status == 200 and etag.startswith('W/"')
+    status, cabecalhos, corpo = requisitar(servidor, '/precos?inicio=2016-01-01', If_None_Match=f'"outro", {etag}')
+    assert status == 304 and corpo == b'' and cabecalhos['ETag'] == etag
+    # Outra consulta ou outra versão dos dados não reaproveitam o ETag
+    assert requisitar(servidor, '/precos?inicio=2016-01-02', If_None_Match=etag)[0] == 200
+    versao['dados'] = 'v2'
+    status, cabecalhos, _ = requisitar(servidor, '/precos?inicio=2016-01-01', If_None_Match=etag)
+    assert status == 200 and cabecalhos['ETag'] != etag
+
+def test_gzip_so_acima_do_tamanho_minimo(servidor):
+    _, _, original = requisitar(servidor, '/precos')
+    status, cabecalhos, comprimido = requisitar(servidor, '/precos', Accept_Encoding='gzip, deflate')
+    assert status == 200 and cabecalhos['Content-Encoding'] == 'gzip' and cabecalhos['Vary'] == 'Accept-Encoding'
+    assert int(cabecalhos['Content-Length']) == len(comprimido) < len(original)
+    assert gzip.decompress(comprimido) == original
+    # Um corpo pequeno vai sem compressão mesmo quando o cliente aceita gzip
+    _, cabecalhos, corpo = requisitar(servidor, '/estatisticas?inicio=2016-01-01&fim=2016-01-31', Accept_Encoding='gzip')
+    assert len(corpo) < api_http.TAMANHO_MINIMO_GZIP and 'Content-Encoding' not in cabecalhos
+
+def test_formato_arrow(servidor, precos_sinteticos):
+    pa = pytest.importorskip('pyarrow')
+    status, cabecalhos, corpo = requisitar(servidor, '/precos?por_pagina=100&formato=arrow')
+    assert status == 200 and cabecalhos['Content-Type'] == 'application/vnd.apache.arrow.stream'
+    tabela = pa.ipc.open_stream(corpo).read_all().to_pandas()
+    assert list(tabela.columns) == ['Data', COLUNA_PRECO]
+    np.testing.assert_allclose(tabela[COLUNA_PRECO], precos_sinteticos[COLUNA_PRECO].iloc[:100])
+
+def test_estatisticas_do_intervalo(servidor, precos_sinteticos):
+    _, _, corpo = requisitar(servidor, '/estatisticas?inicio=2016-01-01&fim=2016-12-31')
+    estatisticas = json.loads(corpo)['dados'][0]
+    esperado = precos_sinteticos.set_index('Data').loc['2016', COLUNA_PRECO]
+    assert estatisticas['quantidade'] == len(esperado)
+    np.testing.assert_allclose([estatisticas['min'], estatisticas['max'], estatisticas['media'], estatisticas['desvio']],
+                               [esperado.min(), esperado.max(), esperado.mean(), esperado.std()])
+
+def test_indicadores_e_previsoes(servidor):
+    _, _, corpo = requisitar(servidor, '/indicadores?inicio=2018-01-01&por_pagina=1')
+    registro = json.loads(corpo)['dados'][0]
+    assert {'Media_Movel_30', 'Media_Movel_90', 'Media_Movel_365', 'Media_Geral'} <= set(registro)
+    _, _, corpo = requisitar(servidor, '/previsoes?tipo=Previsao')
+    previsoes = json.loads(corpo)['dados']
+    # A data de corte das previsões é 2024-05-20: o que vem depois é previsão
+    assert previsoes[0]['Data'] == '2024-05-21' and {registro['Tipo'] for registro in previsoes} == {'Previsao'}
@@ -0,0 +1,60 @@
+import pytest
+
+from arquivo_noticias import (arquivar_noticias, buscar_no_arquivo, consulta_fts, criar_esquema, intervalo_arquivo,
+                              versao_arquivo_noticias)
+
+def artigo(numero, titulo, publicada_em, descricao=None):
+    return {'url': f'https://exemplo.com/{numero}', 'title': titulo, 'description': descricao,
+            'source': {'name': 'Exemplo'}, 'publishedAt': publicada_em}
+
+@pytest.fixture
+def arquivo(tmp_path):
+    caminho = str(tmp_path / 'noticias.db')
+    arquivar_noticias([
+        artigo(1, 'Petróleo dispara com corte da Opep', '2024-05-20T10:00:00Z'),
+        artigo(2, 'Petrolífera anuncia lucro recorde', '2024-05-21T12:00:00Z'),
+        artigo(3, 'Dólar recua', '2024-05-22T09:00:00Z', descricao='Petroleo e minério sobem'),
+        artigo(4, 'Bolsa fecha em alta', '2024-05-25T15:00:00Z'),
+    ], caminho)
+    return caminho
+
+def test_mesma_url_nao_duplica_e_e_reindexada(arquivo):
+    versao = versao_arquivo_noticias(arquivo)
+    assert arquivar_noticias([artigo(4, 'Bolsa fecha em alta', '2024-05-25T15:00:00Z')], arquivo) == 0
+    assert versao_arquivo_noticias(arquivo) == versao
+    # Título alterado: nenhuma linha nova, mas a busca passa a achar o texto novo e não o antigo
+    assert arquivar_noticias([artigo(4, 'Brent fecha em alta', '2024-05-25T15:00:00Z')], arquivo) == 0
+    assert buscar_no_arquivo('brent', caminho=arquivo)[1] == 1
+    assert buscar_no_arquivo('bolsa', caminho=arquivo)[1] == 0
+
+def test_busca_por_prefixo_sem_acento(arquivo):
+    resultados, total = buscar_no_arquivo('petrol', caminho=arquivo)
+    # "petrol" acha petróleo, petrolífera e a descrição sem acento; mais recentes primeiro
+    assert total == 3
+    assert list(resultados['url'].str[-1]) == ['3', '2', '1']
+    assert buscar_no_arquivo('PETRÓLEO opep', caminho=arquivo)[1] == 1
+
+def test_sintaxe_do_fts_digitada_e_tratada_como_texto(arquivo):
+    assert consulta_fts('petróleo "opep') == '"petróleo"* """opep"*'
+    for termos in ['"', 'petróleo AND', 'NEAR(', '*', 'titulo:dólar']:
+        buscar_no_arquivo(termos, caminho=arquivo)
+
+def test_filtro_de_datas_inclusivo_e_paginacao(arquivo):
+    resultados, total = buscar_no_arquivo(data_inicio='2024-05-21', data_fim='2024-05-22', caminho=arquivo)
+    assert total == 2 and list(resultados['url'].str[-1]) == ['3', '2']
+    pagina, total = buscar_no_arquivo(pagina=2, por_pagina=3, caminho=arquivo)
+    assert total == 4 and list(pagina['url'].str[-1]) == ['1']
+
+def test_intervalo_do_arquivo(arquivo):
+    intervalo = intervalo_arquivo(arquivo)
+    assert intervalo['quantidade'] == 4
+    assert (str(intervalo['primeira'].date()), str(intervalo['ultima'].date())) == ('2024-05-20', '2024-05-25')
+
+def test_esquema_criado_uma_vez_por_arquivo(tmp_path):
+    caminho = str(tmp_path / 'novo.db')
+    criacoes = criar_esquema.cache_info().misses
+    arquivar_noticias([artigo(1, 'Petróleo sobe', '2024-05-20T10:00:00Z')], caminho)
+    assert buscar_no_arquivo('petroleo', caminho=caminho)[1] == 1
+    intervalo_arquivo(caminho)
+    # Três conexões ao mesmo arquivo, um único script de esquema
+    assert criar_esquema.cache_info().misses == criacoes + 1
@@ -0,0 +1,78 @@
+import itertools
+
+import pytest
+
+import cache_disco
+from cache_disco import CacheDisco, em_disco, versao_projeto
+
+@pytest.fixture
+def relogio(monkeypatch):
+    # Instantes estritamente crescentes: a ordem de descarte não depende da resolução do relógio
+    instantes = itertools.count(1_000_000)
+    monkeypatch.setattr(cache_disco.time, 'time', lambda: float(next(instantes)))
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = CacheDisco(str(tmp_path / 'cache.db'), limite_bytes=1_000_000)
+    monkeypatch.setattr(cache_disco, 'CACHE_PAGINAS', cache)
+    return cache
+
+def test_descarta_as_entradas_usadas_ha_mais_tempo(tmp_path, relogio):
+    cache = CacheDisco(str(tmp_path / 'cache.db'), limite_bytes=2500)
+    for chave in 'abc':
+        assert cache.guardar(chave, 'v1', b'x' * 1000)
+    # Só cabem duas: 'a' saiu; lida agora, 'b' passa a ser a mais recente
+    assert cache.obter('a', 'v1') == (False, None)
+    assert cache.obter('b', 'v1')[0]
+    cache.guardar('d', 'v1', b'x' * 1000)
+    assert not cache.obter('c', 'v1')[0]
+    assert cache.obter('b', 'v1')[0] and cache.obter('d', 'v1')[0]
+    assert cache.resumo()['entradas'] == 2 and cache.resumo()['bytes'] <= 2500
+
+def test_valor_maior_que_o_limite_nao_e_gravado(tmp_path):
+    cache = CacheDisco(str(tmp_path / 'cache.db'), limite_bytes=100)
+    assert not cache.guardar('grande', 'v1', b'x' * 1000)
+    assert cache.resumo()['entradas'] == 0
+
+def test_versao_faz_parte_da_chave(tmp_path):
+    cache = CacheDisco(str(tmp_path / 'cache.db'))
+    cache.guardar('a', 'v1', {'valor': 1})
+    assert cache.obter('a', 'v1') == (True, {'valor': 1})
+    assert cache.obter('a', 'v2') == (False, None)
+
+def test_em_disco_ignora_argumentos_com_sublinhado(cache):
+    chamadas = []
+
+    @em_disco
+    def calcular(versao, janela, _dados=None):
+        chamadas.append((versao, janela))
+        return janela * 2
+
+    assert calcular('v1', 3, _dados=[1]) == 6
+    # Outro DataFrame em "_dados" com a mesma versão dos dados: o valor vem do disco
+    assert calcular('v1', janela=3, _dados=[2]) == 6
+    assert chamadas == [('v1', 3)]
+    calcular('v2', 3)
+    calcular('v1', 4)
+    assert chamadas == [('v1', 3), ('v2', 3), ('v1', 4)]
+
+def test_em_disco_segue_sem_o_arquivo_do_cache(tmp_path, monkeypatch):
+    # Um diretório no lugar do arquivo: o sqlite falha e a função é calculada normalmente
+    monkeypatch.setattr(cache_disco, 'CACHE_PAGINAS', CacheDisco(str(tmp_path)))
+
+    @em_disco
+    def calcular(versao):
+        return versao.upper()
+
+    assert calcular('v1') == 'V1'
+
+def test_versao_do_projeto_muda_com_qualquer_modulo(tmp_path):
+    (tmp_path / 'a.py').write_text('x = 1\n')
+    (tmp_path / 'dados.csv').write_text('1\n')
+    versao = versao_projeto(str(tmp_path))
+    (tmp_path / 'dados.csv').write_text('2\n')
+    versao_projeto.cache_clear()
+    assert versao_projeto(str(tmp_path)) == versao
+    (tmp_path / 'b.py').write_text('y = 2\n')
+    versao_projeto.cache_clear()
+    assert versao_projeto(str(tmp_path)) != versao
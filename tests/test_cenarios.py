@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cenarios import LIMITE_LOG, FAIXAS_HISTOGRAMA, PERCENTIS, percentis_histograma, reduzir_lotes, simular_cenarios, simular_lote
+
+LARGURA_FAIXA = 2 * LIMITE_LOG / FAIXAS_HISTOGRAMA
+
+@pytest.fixture
+def retornos():
+    return np.random.default_rng(5).normal(0.0002, 0.02, 1260)
+
+@pytest.mark.parametrize('modelo', ['bootstrap', 'gbm'])
+def test_percentis_do_histograma_conferem_com_as_trajetorias(retornos, modelo):
+    lotes = [(700, np.random.SeedSequence(1)), (300, np.random.SeedSequence(2))]
+    contagens, soma = reduzir_lotes(modelo, retornos, 30, lotes)
+    trajetorias = np.concatenate([simular_lote(modelo, retornos, 30, tamanho, semente) for tamanho, semente in lotes])
+    assert (contagens.sum(axis=1) == 1000).all()
+    np.testing.assert_allclose(soma, np.exp(trajetorias).sum(axis=0))
+    for percentil, valores in percentis_histograma(contagens, PERCENTIS).items():
+        # A interpolação dentro da faixa erra no máximo a largura de uma faixa (mais o passo entre amostras)
+        np.testing.assert_allclose(valores, np.percentile(trajetorias, percentil, axis=0), atol=2 * LARGURA_FAIXA)
+
+def test_bootstrap_usa_blocos_contiguos_do_historico():
+    retornos = np.arange(100, dtype=float)
+    passos = np.diff(np.r_[0, simular_lote('bootstrap', retornos, 45, 1, 0)[0]])
+    # Dentro de cada bloco de 20 dias, os retornos sorteados são consecutivos
+    for bloco in (passos[:20], passos[20:40], passos[40:]):
+        assert (np.diff(bloco) == 1).all()
+
+def test_mesma_semente_reproduz_os_cenarios(precos_sinteticos):
+    precos, datas = precos_sinteticos.iloc[:, 1].to_numpy(), precos_sinteticos['Data'].to_numpy()
+    primeira = simular_cenarios(precos, datas, 20, caminhos=5000, semente=3)
+    pd.testing.assert_frame_equal(primeira, simular_cenarios(precos, datas, 20, caminhos=5000, semente=3))
+    assert not primeira.equals(simular_cenarios(precos, datas, 20, caminhos=5000, semente=4))
+    # Bandas ordenadas e datas em dias úteis depois do último preço
+    colunas = [f'P{percentil}' for percentil in PERCENTIS]
+    assert (np.diff(primeira[colunas].to_numpy(), axis=1) >= 0).all()
+    assert primeira['Data'].iloc[0] > pd.Timestamp(datas[-1]) and (primeira['Data'].dt.dayofweek < 5).all()
+
+def test_modelo_desconhecido(retornos):
+    with pytest.raises(ValueError):
+        simular_lote('arima', retornos, 10, 5, 0)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from choques import IndiceChoques
+from dados import COLUNA_PRECO
+
+@pytest.mark.parametrize('criterio', ['retorno', 'zscore'])
+def test_maiores_choques_conferem_com_ordenacao(precos_sinteticos, criterio):
+    indice = IndiceChoques(precos_sinteticos)
+    coluna = 'Retorno' if criterio == 'retorno' else 'Z_Score'
+    for inicio, fim in [('2015-03-01', '2016-06-30'), ('2017-01-01', '2017-01-31'), (None, None)]:
+        serie = indice.serie(inicio, fim)
+        esperados = serie[coluna].abs().fillna(0).sort_values(ascending=False, kind='stable').head(15)
+        choques = indice.maiores_choques(inicio, fim, n=15, criterio=criterio)
+        np.testing.assert_allclose(choques[coluna].abs().fillna(0), esperados.to_numpy())
+        assert choques['Data'].between(serie['Data'].min(), serie['Data'].max()).all()
+
+def test_retorno_e_zscore_do_primeiro_dia():
+    dados = pd.DataFrame({'Data': pd.bdate_range('2020-01-01', periods=5),
+                          COLUNA_PRECO: [10.0, 11.0, 9.9, 9.9, 19.8]})
+    indice = IndiceChoques(dados, janela_zscore=2)
+    # O primeiro dia não tem retorno e fica fora do índice
+    np.testing.assert_allclose(indice.retornos, [0.1, -0.1, 0.0, 1.0])
+    choques = indice.maiores_choques(None, None, n=2)
+    assert list(choques['Retorno']) == [1.0, pytest.approx(0.1)]
+    # O z-score usa só a janela anterior: o dia do choque não entra na própria média
+    anteriores = pd.Series([-0.1, 0.0])
+    assert indice.zscores[-1] == pytest.approx((1.0 - anteriores.mean()) / anteriores.std())
+
+def test_pedir_mais_choques_que_dias():
+    dados = pd.DataFrame({'Data': pd.bdate_range('2020-01-01', periods=4),
+                          COLUNA_PRECO: [10.0, 11.0, 12.0, 10.0]})
+    assert len(IndiceChoques(dados).maiores_choques(None, None, n=10)) == 3
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from comparacao_periodos import comparar_periodos, resumir_valores, tabela_comparacao
+
+def test_resumo_confere_com_numpy():
+    valores = np.r_[np.linspace(10, 20, 101), 45.0, -5.0]
+    resumo = resumir_valores(valores)
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    assert (resumo['q1'], resumo['mediana'], resumo['q3']) == (q1, mediana, q3)
+    # Os dois valores fora de 1,5 IQR são outliers; os bigodes param no último valor dentro
+    assert sorted(resumo['outliers']) == [-5.0, 45.0]
+    assert (resumo['bigode_inferior'], resumo['bigode_superior']) == (10.0, 20.0)
+    assert (resumo['minimo'], resumo['maximo']) == (-5.0, 45.0)
+    assert resumo['desvio'] == np.std(valores, ddof=1)
+
+def test_periodo_vazio_fica_fora():
+    datas = pd.bdate_range('2020-01-01', periods=30).to_numpy()
+    precos = np.arange(30.0)
+    resumos = comparar_periodos(datas, precos, [('A', '2020-01-01', '2020-01-10'), ('Vazio', '2019-01-01', '2019-12-31'),
+                                                ('B', '2020-01-13', '2020-02-11')])
+    assert [resumo['nome'] for resumo in resumos] == ['A', 'B']
+    # Datas inclusivas: 2020-01-01 a 2020-01-10 são 8 dias úteis
+    assert resumos[0]['quantidade'] == 8 and resumos[0]['maximo'] == 7
+
+def test_tabela_com_diferencas_entre_periodos():
+    resumos = [{'nome': nome, **resumir_valores(np.full(5, valor))} for nome, valor in [('A', 50.0), ('B', 75.0), ('C', 60.0)]]
+    tabela = tabela_comparacao(resumos)
+    assert list(tabela['delta_mediana_primeiro_%']) == [0.0, 50.0, 20.0]
+    assert list(tabela['delta_mediana_anterior_%'].iloc[1:]) == [50.0, -20.0]
+    assert list(tabela['outliers']) == [0, 0, 0]
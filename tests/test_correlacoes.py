@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlacoes import COBERTURA_MINIMA, alinhar_series, calcular_correlacoes, correlacoes_moveis
+from dados import COLUNA_PRECO
+
+@pytest.fixture
+def series():
+    gerador = np.random.default_rng(4)
+    brent = gerador.normal(0, 0.02, 600)
+    # Nível alto numa das séries: as somas acumuladas precisam dos valores centrados
+    outras = np.column_stack([0.5 * brent + gerador.normal(0, 0.01, 600), 1e4 + gerador.normal(0, 1, 600)])
+    return brent, outras
+
+def test_correlacao_e_beta_conferem_com_pandas(series):
+    brent, outras = series
+    resultados = correlacoes_moveis(brent, outras, [20, 63])
+    y = pd.Series(brent)
+    for janela, (correlacao, beta) in resultados.items():
+        for coluna in range(outras.shape[1]):
+            x = pd.Series(outras[:, coluna])
+            np.testing.assert_allclose(correlacao[:, coluna], y.rolling(janela).corr(x), atol=1e-8)
+            np.testing.assert_allclose(beta[:, coluna], y.rolling(janela).cov(x) / x.rolling(janela).var(), rtol=1e-6)
+
+def test_janela_com_lacunas_usa_os_pares_validos(series):
+    brent, outras = series
+    outras = outras.copy()
+    outras[100:110, 0] = np.nan
+    brent = brent.copy()
+    brent[300:320] = np.nan
+    correlacao, _ = correlacoes_moveis(brent, outras, [63])[63]
+    for fim in (120, 150, 330, 400):
+        trecho = slice(fim - 62, fim + 1)
+        validos = np.isfinite(brent[trecho]) & np.isfinite(outras[trecho, 0])
+        if validos.sum() >= COBERTURA_MINIMA * 63:
+            esperado = np.corrcoef(brent[trecho][validos], outras[trecho, 0][validos])[0, 1]
+            assert correlacao[fim, 0] == pytest.approx(esperado, abs=1e-8)
+        else:
+            assert np.isnan(correlacao[fim, 0])
+    # 20 dias sem Brent numa janela de 63 deixam menos de 80% de cobertura
+    assert np.isnan(correlacao[330, 0])
+
+def test_serie_constante_nao_tem_correlacao(series):
+    brent, _ = series
+    correlacao, beta = correlacoes_moveis(brent, np.ones((len(brent), 1)), [20])[20]
+    assert np.isnan(correlacao).all() and np.isnan(beta).all()
+
+def test_alinhamento_as_of_com_tolerancia():
+    precos = pd.DataFrame({'Data': pd.to_datetime(['2024-01-31', '2024-02-15', '2024-05-15']), COLUNA_PRECO: [80.0, 81.0, 82.0]})
+    mensal = pd.Series([4.5, 4.6], index=pd.to_datetime(['2024-01-01', '2024-02-01']), name='inflacao')
+    painel = alinhar_series(precos, {'inflacao': mensal})
+    # Cada pregão recebe o último valor publicado; três meses depois da última publicação, a série está desatualizada
+    assert list(painel['inflacao'].iloc[:2]) == [4.5, 4.6]
+    assert np.isnan(painel['inflacao'].iloc[2])
+
+def test_tabela_longa_por_serie_e_janela(series):
+    brent, outras = series
+    datas = pd.bdate_range('2020-01-01', periods=len(brent))
+    painel = pd.DataFrame({'Brent': 80 * np.exp(np.cumsum(brent)), 'A': np.cumsum(outras[:, 0]) + 100}, index=datas)
+    tabela = calcular_correlacoes(painel, ['A'], [20, 63])
+    assert set(tabela['Janela']) == {20, 63} and set(tabela['Serie']) == {'A'}
+    # A primeira janela completa (20º pregão) tem 19 variações válidas, acima da cobertura mínima
+    assert tabela[tabela['Janela'] == 20]['Data'].min() == datas[19]
+    assert tabela['Correlacao'].between(-1, 1).all()
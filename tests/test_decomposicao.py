@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from dados import COLUNA_PRECO
+from decomposicao import decompor_precos, loess, media_movel, perfil_sazonal, stl
+
+PERIODO = 12
+
+def serie_sazonal(anos=20, semente=0):
+    gerador = np.random.default_rng(semente)
+    t = np.arange(anos * PERIODO)
+    tendencia = 50 + 0.1 * t + 5 * np.sin(2 * np.pi * t / (8 * PERIODO))
+    sazonalidade = 3 * np.sin(2 * np.pi * t / PERIODO) + np.cos(4 * np.pi * t / PERIODO)
+    return tendencia, sazonalidade, gerador.normal(0, 0.3, len(t))
+
+def erro_quadratico(diferencas):
+    return np.sqrt(np.mean(diferencas ** 2))
+
+def decompor(valores):
+    return stl(valores, periodo=PERIODO, largura_sazonal=7, largura_tendencia=23, largura_passa_baixa=13)
+
+def test_loess_reproduz_reta_e_interpola():
+    reta = 2.0 + 0.5 * np.arange(50)
+    np.testing.assert_allclose(loess(reta, 9, np.arange(50)), reta)
+    np.testing.assert_allclose(loess(reta, 9, [10.5, 0, 49]), [7.25, 2.0, 26.5])
+
+def test_media_movel_confere_com_pandas():
+    valores = np.random.default_rng(1).normal(size=100)
+    np.testing.assert_allclose(media_movel(valores, 7), pd.Series(valores).rolling(7).mean().dropna())
+
+def test_stl_recupera_tendencia_e_sazonalidade():
+    tendencia, sazonalidade, ruido = serie_sazonal()
+    valores = tendencia + sazonalidade + ruido
+    tendencia_stl, sazonalidade_stl, residuo = decompor(valores)
+    np.testing.assert_allclose(tendencia_stl + sazonalidade_stl + residuo, valores)
+    # Longe das pontas, o erro dos componentes fica abaixo do desvio do ruído (0,3)
+    meio = slice(2 * PERIODO, -2 * PERIODO)
+    assert erro_quadratico((tendencia_stl - tendencia)[meio]) < 0.3
+    assert erro_quadratico((sazonalidade_stl - sazonalidade)[meio]) < 0.3
+    assert residuo[meio].std() < 0.4
+
+def test_stl_robusto_a_picos_isolados():
+    tendencia, sazonalidade, ruido = serie_sazonal(semente=2)
+    valores = tendencia + sazonalidade + ruido
+    picos = [60, 125, 170]
+    valores[picos] += 40
+    tendencia_stl, sazonalidade_stl, residuo = decompor(valores)
+    # Os picos ficam no resíduo em vez de entrarem na tendência ou na sazonalidade do mesmo mês
+    assert (residuo[picos] > 35).all()
+    meio = slice(2 * PERIODO, -2 * PERIODO)
+    assert erro_quadratico((sazonalidade_stl - sazonalidade)[meio]) < 0.3
+
+def test_decompor_precos_so_devolve_os_dias_com_preco():
+    datas = pd.bdate_range('2018-01-01', '2023-12-31')
+    dias = (datas - datas[0]).days.to_numpy()
+    precos = pd.DataFrame({'Data': datas, COLUNA_PRECO: 70 + 10 * np.sin(2 * np.pi * dias / 365)})
+    componentes = decompor_precos(precos)
+    assert (componentes['Data'] == datas).all()
+    np.testing.assert_allclose(componentes[['Tendencia_STL', 'Sazonalidade_STL', 'Residuo_STL']].sum(axis=1), precos[COLUNA_PRECO])
+    perfil = perfil_sazonal(componentes)
+    assert list(perfil['Mes']) == list(range(1, 13))
+    # A onda tem pico no fim de março e vale no fim de setembro
+    assert perfil.set_index('Mes')['Sazonalidade_STL'].idxmax() in (3, 4)
+    assert perfil.set_index('Mes')['Sazonalidade_STL'].idxmin() in (9, 10)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from dados import COLUNA_PRECO
+from etl import converter_datas, converter_precos, detectar_codificacao, normalizar_nome, processar_fontes, verificar_dias_uteis
+
+def test_normalizar_nome():
+    assert normalizar_nome('Preço - petróleo bruto - Brent (FOB)') == 'preco_petroleo_bruto_brent_fob'
+    assert normalizar_nome('\ufeffData') == 'data'
+
+def test_converter_datas_iso_e_brasileiro():
+    datas = converter_datas(pd.Series(['2024-05-20', '21/05/2024', 'ontem', None]))
+    assert list(datas[:2]) == [pd.Timestamp('2024-05-20'), pd.Timestamp('2024-05-21')]
+    assert datas[2:].isna().all()
+    assert datas.dtype == 'datetime64[ns]'
+
+def test_converter_precos_com_virgula_decimal():
+    precos = converter_precos(pd.Series(['82,45', ' 80.1 ', 'n/d']))
+    np.testing.assert_allclose(precos[:2], [82.45, 80.1])
+    assert np.isnan(precos[2])
+
+def test_detectar_codificacao(tmp_path):
+    latin = tmp_path / 'latin.csv'
+    latin.write_bytes('Data;Preço\n'.encode('iso-8859-1'))
+    utf8 = tmp_path / 'utf8.csv'
+    utf8.write_bytes('\ufeffData;Preço\n'.encode('utf-8'))
+    assert detectar_codificacao(str(latin)) == 'iso-8859-1'
+    assert detectar_codificacao(str(utf8)) == 'utf-8-sig'
+
+def test_processar_fontes_prioriza_a_ultima_e_relata(tmp_path):
+    antiga = tmp_path / 'antiga.csv'
+    antiga.write_text('Data,Preço - petróleo bruto - Brent (FOB)\n'
+                      '2024-01-01,80\n2024-01-02,81\n2024-01-03,-1\n2024-01-04,xx\n', encoding='iso-8859-1')
+    nova = tmp_path / 'nova.csv'
+    nova.write_text('ds,y\n02/01/2024,"81,5"\n2024-01-05,83\n2024-01-05,83\n', encoding='utf-8')
+
+    # Bloco de uma linha: o resultado não pode depender do tamanho do bloco
+    serie, relatorio = processar_fontes([str(antiga), str(nova)], tamanho_bloco=1)
+    assert list(serie['Data'].dt.strftime('%Y-%m-%d')) == ['2024-01-01', '2024-01-02', '2024-01-05']
+    assert list(serie[COLUNA_PRECO]) == [80, 81.5, 83]
+    assert list(serie['Fonte']) == ['antiga.csv', 'nova.csv', 'nova.csv']
+
+    assert [fonte['linhas_lidas'] for fonte in relatorio['fontes']] == [4, 3]
+    assert relatorio['fontes'][0]['linhas_invalidas'] == 1
+    assert relatorio['fontes'][0]['precos_nao_positivos'] == 1
+    assert relatorio['linhas_duplicadas_removidas'] == 2
+    # 2024-01-05 se repete com o mesmo preço: duplicada, mas não conflito
+    assert relatorio['datas_com_conflito'] == 1 and relatorio['exemplos_conflito'] == ['2024-01-02']
+    assert relatorio['dias_uteis_faltantes'] == 2
+
+def test_lacunas_de_dias_uteis():
+    datas = pd.Series(pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-08', '2024-01-10']))
+    relatorio = verificar_dias_uteis(datas)
+    assert relatorio['dias_uteis_faltantes'] == 4
+    assert relatorio['maiores_lacunas'] == [{'inicio': '2024-01-03', 'fim': '2024-01-05', 'dias_uteis': 3},
+                                            {'inicio': '2024-01-09', 'fim': '2024-01-09', 'dias_uteis': 1}]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from figuras import compactar_traces, preparar_figura, reduzir_pontos, tamanho_serializado
+
+def figura_longa(pontos=20000, semente=0):
+    gerador = np.random.default_rng(semente)
+    datas = pd.date_range('1990-01-01', periods=pontos, freq='D')
+    precos = 50 + np.cumsum(gerador.normal(0, 1, pontos))
+    fig = go.Figure(go.Scatter(x=datas, y=precos, mode='lines+markers', text=[f'{preco:.2f}' for preco in precos],
+                               customdata=np.column_stack([np.arange(pontos), precos]),
+                               marker=dict(color=precos, size=np.full(pontos, 4.0))))
+    fig.update_layout(title='Teste')
+    return fig, precos
+
+def test_reducao_preserva_extremos_e_pontas():
+    y = np.random.default_rng(1).normal(0, 1, 10000)
+    y[1234], y[8765] = 50, -50
+    indices = reduzir_pontos(np.arange(len(y)), y, 400)
+    assert len(indices) <= 400
+    assert np.all(np.diff(indices) > 0)
+    assert {0, len(y) - 1, 1234, 8765} <= set(indices.tolist())
+
+def test_reducao_mantem_atributos_por_ponto_alinhados():
+    fig, precos = figura_longa()
+    reduzida, relatorio = preparar_figura(fig, orcamento_bytes=100_000)
+    assert relatorio['reduzida'] and relatorio['pontos'] < relatorio['pontos_originais']
+    trace = reduzida.data[0]
+    # Cada atributo por ponto continua correspondendo ao mesmo ponto de y
+    posicoes = np.asarray(trace.customdata)[:, 0].astype(int)
+    np.testing.assert_array_equal(trace.y, precos[posicoes])
+    np.testing.assert_array_equal(trace.marker.color, precos[posicoes])
+    assert list(trace.text) == [f'{preco:.2f}' for preco in precos[posicoes]]
+    assert len(trace.marker.size) == len(trace.x) == len(trace.y)
+    # A figura original (compartilhada pelo cache) não é alterada
+    assert len(fig.data[0].y) == len(precos)
+
+def test_datas_viram_milissegundos_num_eixo_de_datas():
+    fig, _ = figura_longa(pontos=200)
+    compactar_traces(fig)
+    assert fig.data[0].x.dtype == 'float64'
+    assert fig.data[0].x[0] == pd.Timestamp('1990-01-01').value / 1e6
+    assert fig.layout.xaxis.type == 'date'
+
+def test_estimativa_de_tamanho_proxima_do_json():
+    for pontos in (200, 5000, 20000):
+        fig, _ = figura_longa(pontos)
+        compactar_traces(fig)
+        real = len(pio.to_json(fig, validate=False))
+        assert 0.7 < tamanho_serializado(fig) / real < 1.4
@@ -0,0 +1,62 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from fluxo_precos import BufferCircular, EstatisticasDia, FluxoPrecos, FonteArquivo, FonteSimulada
+
+def test_buffer_circular_guarda_os_mais_recentes():
+    buffer = BufferCircular(capacidade=5)
+    for i in range(8):
+        buffer.adicionar(pd.Timestamp('2024-05-20 10:00') + pd.Timedelta(seconds=i), float(i))
+    instantes, precos, total = buffer.desde(0)
+    assert total == 8 and list(precos) == [3, 4, 5, 6, 7]
+    assert instantes[0] == np.datetime64('2024-05-20T10:00:03')
+    # Pela sequência do último tick já visto, só os novos
+    assert list(buffer.desde(6)[1]) == [6, 7]
+    assert len(buffer.desde(8)[1]) == 0
+
+def test_buffer_aceita_instantes_com_fuso():
+    buffer = BufferCircular(capacidade=2)
+    buffer.adicionar(pd.Timestamp('2024-05-20 10:00', tz='UTC'), 80.0)
+    assert buffer.desde()[0][0] == np.datetime64('2024-05-20T10:00')
+
+def test_estatisticas_do_dia_zeram_na_virada():
+    estatisticas = EstatisticasDia()
+    for instante, preco in [('2024-05-20 10:00', 80), ('2024-05-20 11:00', 82), ('2024-05-20 12:00', 79), ('2024-05-20 13:00', 81)]:
+        estatisticas.atualizar(pd.Timestamp(instante), preco)
+    resumo = estatisticas.resumo()
+    assert (resumo['abertura'], resumo['maxima'], resumo['minima'], resumo['ultimo'], resumo['anterior']) == (80, 82, 79, 81, 79)
+    estatisticas.atualizar(pd.Timestamp('2024-05-21 09:00'), 83)
+    resumo = estatisticas.resumo()
+    assert resumo['quantidade'] == 1 and resumo['abertura'] == resumo['minima'] == 83 and resumo['anterior'] is None
+
+def test_interpretar_linhas_do_arquivo():
+    assert FonteArquivo.interpretar('2024-05-20 10:00:00;82,5\n') == (pd.Timestamp('2024-05-20 10:00'), 82.5)
+    assert FonteArquivo.interpretar('2024-05-20T10:00:00Z,82.5') == (pd.Timestamp('2024-05-20 10:00', tz='UTC'), 82.5)
+    assert FonteArquivo.interpretar('instante;preco') is None
+    assert FonteArquivo.interpretar('ontem;82') is None
+
+def test_fonte_arquivo_espera_a_linha_terminar(tmp_path):
+    caminho = tmp_path / 'ticks.csv'
+    caminho.write_text('instante;preco\n2024-05-20 10:00:00;82,5\n2024-05-20 10:00:01;82,')
+    parar = threading.Event()
+    ticks = FonteArquivo(str(caminho), intervalo=0.01).ticks(parar)
+    assert next(ticks) == (pd.Timestamp('2024-05-20 10:00:00'), 82.5)
+    # A linha incompleta só vira tick depois da quebra de linha, com o começo já lido
+    with open(caminho, 'a') as arquivo:
+        arquivo.write('6\n')
+    assert next(ticks) == (pd.Timestamp('2024-05-20 10:00:01'), 82.6)
+    parar.set()
+    ticks.close()
+
+def test_fluxo_consome_a_fonte_em_segundo_plano():
+    fluxo = FluxoPrecos(FonteSimulada(80.0, intervalo=0.001, semente=1), capacidade=50).iniciar()
+    while fluxo.resumo()['sequencia'] < 60:
+        fluxo.thread.join(0.01)
+    fluxo.encerrar()
+    fluxo.thread.join(1)
+    ticks, sequencia = fluxo.ticks()
+    assert not fluxo.thread.is_alive() and fluxo.erro is None
+    assert len(ticks) == 50 and sequencia >= 60
+    assert fluxo.resumo()['ultimo'] == ticks['Preco'].iloc[-1]
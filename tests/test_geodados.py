@@ -0,0 +1,32 @@
+import numpy as np
+
+from geodados import agregar_por_ano, caminho_indicador, carregar_geodados, versao_geodados
+
+def gravar(diretorio, linhas):
+    with open(caminho_indicador('producao', diretorio), 'w', encoding='utf-8') as arquivo:
+        arquivo.write('Ano,País,Código País,Valor\n' + ''.join(f'{linha}\n' for linha in linhas))
+
+def test_linhas_repetidas_valem_a_ultima_e_codigos_normalizados(tmp_path):
+    gravar(tmp_path, ['2022,Brasil, bra ,3.0', '2022,Brasil,BRA,3.1', '2022,Noruega,NOR,x', 'ano,Arábia Saudita,SAU,10'])
+    dados = carregar_geodados(str(tmp_path))
+    assert list(dados['Código País']) == ['BRA'] and list(dados['Valor']) == [3.1]
+    assert dados['Ano'].dtype == int
+
+def test_participacao_relativa_aos_paises_listados(tmp_path):
+    gravar(tmp_path, ['2022,Estados Unidos,USA,12', '2022,Arábia Saudita,SAU,10', '2022,Brasil,BRA,3',
+                      '2023,Estados Unidos,USA,13', '2023,Brasil,BRA,3.5'])
+    agregados = agregar_por_ano(carregar_geodados(str(tmp_path)), 'producao')
+    for _, ano in agregados.groupby('Ano'):
+        # A soma das participações fecha 100% em cada ano, mesmo com países diferentes entre os anos
+        assert np.isclose(ano['Participação entre os Listados (%)'].sum(), 100, atol=0.02)
+        assert list(ano['Ranking']) == list(range(1, len(ano) + 1))
+    assert list(agregados['Total dos Países Listados']) == [25, 25, 25, 16.5, 16.5]
+    assert list(agregados['Código País']) == ['USA', 'SAU', 'BRA', 'USA', 'BRA']
+
+def test_versao_muda_quando_um_arquivo_muda(tmp_path):
+    assert versao_geodados(str(tmp_path)) == ''
+    assert carregar_geodados(str(tmp_path)).empty
+    gravar(tmp_path, ['2022,Brasil,BRA,3'])
+    versao = versao_geodados(str(tmp_path))
+    gravar(tmp_path, ['2022,Brasil,BRA,3', '2023,Brasil,BRA,3.4'])
+    assert versao_geodados(str(tmp_path)) != versao
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dados import COLUNA_PRECO
+from indicadores import (JANELA_BOLLINGER, MACD_LENTA, MACD_RAPIDA, MACD_SINAL, PERIODO_RSI, calcular_indicadores,
+                         estender_indicadores, filtro_exponencial)
+
+def referencia_pandas(precos):
+    # As mesmas fórmulas com as janelas do pandas, para conferir os filtros recursivos
+    serie = precos.set_index('Data')[COLUNA_PRECO]
+    colunas = {f'EMA_{periodo}': serie.ewm(span=periodo, adjust=False).mean().where(np.arange(len(serie)) >= periodo - 1)
+               for periodo in (9, 21, 50, 200)}
+    variacoes = serie.diff()
+    ganho = variacoes.clip(lower=0).iloc[1:].ewm(alpha=1 / PERIODO_RSI, adjust=False).mean()
+    perda = (-variacoes).clip(lower=0).iloc[1:].ewm(alpha=1 / PERIODO_RSI, adjust=False).mean()
+    colunas['RSI'] = (100 - 100 / (1 + ganho / perda)).reindex(serie.index).where(np.arange(len(serie)) >= PERIODO_RSI)
+    macd = serie.ewm(span=MACD_RAPIDA, adjust=False).mean() - serie.ewm(span=MACD_LENTA, adjust=False).mean()
+    colunas['MACD_Sinal'] = macd.ewm(span=MACD_SINAL, adjust=False).mean().where(np.arange(len(serie)) >= MACD_LENTA + MACD_SINAL - 2)
+    colunas['Bollinger_Media'] = serie.rolling(JANELA_BOLLINGER).mean()
+    colunas['Bollinger_Superior'] = colunas['Bollinger_Media'] + 2 * serie.rolling(JANELA_BOLLINGER).std(ddof=0)
+    return pd.DataFrame(colunas).reset_index(drop=True)
+
+def test_filtro_exponencial_confere_com_ewm():
+    valores = np.random.default_rng(0).normal(size=300)
+    np.testing.assert_allclose(filtro_exponencial(valores, 0.2), pd.Series(valores).ewm(alpha=0.2, adjust=False).mean())
+    # Continuar de um estado dá o mesmo que filtrar tudo de uma vez
+    inicio = filtro_exponencial(valores[:100], 0.2)
+    np.testing.assert_allclose(filtro_exponencial(valores[100:], 0.2, inicio[-1]), filtro_exponencial(valores, 0.2)[100:])
+
+def test_indicadores_conferem_com_pandas(precos_sinteticos):
+    tabela, _ = calcular_indicadores(precos_sinteticos)
+    esperado = referencia_pandas(precos_sinteticos)
+    for coluna in esperado.columns:
+        np.testing.assert_allclose(tabela[coluna], esperado[coluna], rtol=1e-9, atol=1e-9, err_msg=coluna)
+
+@pytest.mark.parametrize('tamanhos', [[1] * 30, [5, 17, 3], [250]])
+def test_estender_igual_a_calcular_do_zero(precos_sinteticos, tamanhos):
+    # Blocos menores que a janela de Bollinger e que os aquecimentos, em sequência
+    corte = 1000
+    tabela, estado = calcular_indicadores(precos_sinteticos.iloc[:corte])
+    for tamanho in tamanhos:
+        corte += tamanho
+        tabela, estado = estender_indicadores(tabela, estado, precos_sinteticos.iloc[:corte])
+    completa, estado_completo = calcular_indicadores(precos_sinteticos.iloc[:corte])
+    pd.testing.assert_frame_equal(tabela.reset_index(drop=True), completa, rtol=1e-10)
+    assert estado['assinatura'] == estado_completo['assinatura']
+
+def test_estender_desde_o_inicio_da_serie(precos_sinteticos):
+    tabela, estado = calcular_indicadores(precos_sinteticos.iloc[:3])
+    tabela, estado = estender_indicadores(tabela, estado, precos_sinteticos.iloc[:300])
+    pd.testing.assert_frame_equal(tabela.reset_index(drop=True), calcular_indicadores(precos_sinteticos.iloc[:300])[0], rtol=1e-10)
+
+def test_historico_alterado_recalcula_tudo(precos_sinteticos):
+    tabela, estado = calcular_indicadores(precos_sinteticos.iloc[:500])
+    alterados = precos_sinteticos.iloc[:520].copy()
+    alterados.loc[100, COLUNA_PRECO] *= 1.5
+    tabela, _ = estender_indicadores(tabela, estado, alterados)
+    pd.testing.assert_frame_equal(tabela, calcular_indicadores(alterados)[0])
+
+def test_sem_dias_novos_devolve_a_mesma_tabela(precos_sinteticos):
+    tabela, estado = calcular_indicadores(precos_sinteticos)
+    mesma_tabela, mesmo_estado = estender_indicadores(tabela, estado, precos_sinteticos)
+    assert mesma_tabela is tabela and mesmo_estado is estado
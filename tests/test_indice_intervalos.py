@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from indice_intervalos import IndiceIntervalos, construir_tabela_esparsa, consultar_tabela_esparsa, posicoes_intervalo
+
+def intervalos_aleatorios(n, quantidade=300, semente=3):
+    gerador = np.random.default_rng(semente)
+    for _ in range(quantidade):
+        inicio, fim = sorted(gerador.integers(0, n, 2))
+        yield int(inicio), int(fim)
+
+def test_tabela_esparsa_confere_com_forca_bruta():
+    gerador = np.random.default_rng(0)
+    # Valores repetidos de propósito, para exercitar os empates
+    valores = gerador.integers(0, 50, 257).astype(float)
+    maximos = construir_tabela_esparsa(valores, maior=True)
+    minimos = construir_tabela_esparsa(valores, maior=False)
+    for inicio, fim in intervalos_aleatorios(len(valores)):
+        trecho = valores[inicio:fim + 1]
+        assert valores[consultar_tabela_esparsa(maximos, valores, inicio, fim)] == trecho.max()
+        assert valores[consultar_tabela_esparsa(minimos, valores, inicio, fim, maior=False)] == trecho.min()
+
+def test_estatisticas_conferem_com_pandas():
+    gerador = np.random.default_rng(1)
+    datas = pd.bdate_range('2000-01-03', periods=1000)
+    # Nível alto e variação pequena: o caso em que soma de quadrados sem centralizar perde precisão
+    valores = 1e4 + gerador.normal(0, 1, len(datas))
+    indice = IndiceIntervalos(datas, valores)
+    serie = pd.Series(valores, index=datas)
+    for inicio, fim in intervalos_aleatorios(len(datas)):
+        esperado = serie.iloc[inicio:fim + 1]
+        obtido = indice.estatisticas(datas[inicio], datas[fim])
+        assert obtido['quantidade'] == len(esperado)
+        assert obtido['min'] == esperado.min() and obtido['max'] == esperado.max()
+        np.testing.assert_allclose(obtido['media'], esperado.mean(), rtol=1e-12)
+        if len(esperado) > 1:
+            np.testing.assert_allclose(obtido['desvio'], esperado.std(), rtol=1e-6)
+        else:
+            assert np.isnan(obtido['desvio'])
+
+def test_posicoes_com_datas_fora_do_historico():
+    datas = pd.bdate_range('2020-01-06', periods=10).to_numpy()
+    assert posicoes_intervalo(datas, None, None) == (0, 9)
+    assert posicoes_intervalo(datas, '2019-01-01', '2030-01-01') == (0, 9)
+    # Fim de semana: o intervalo começa na segunda seguinte e termina na sexta anterior
+    assert posicoes_intervalo(datas, '2020-01-11', '2020-01-18') == (5, 9)
+
+def test_intervalo_vazio():
+    datas = pd.bdate_range('2020-01-06', periods=10)
+    estatisticas = IndiceIntervalos(datas, np.arange(10.0)).estatisticas('2020-01-11', '2020-01-12')
+    assert estatisticas['quantidade'] == 0 and np.isnan(estatisticas['media'])
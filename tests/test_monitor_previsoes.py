@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from monitor_previsoes import historico_monitor, previsao_para_data, registrar_previsao
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / 'monitor.db')
+
+def test_somas_da_janela_conferem_com_rolling(caminho):
+    gerador = np.random.default_rng(3)
+    observados = 80 + gerador.normal(0, 2, 60)
+    previstos = observados + gerador.normal(0.5, 1.5, 60)
+    for i, (observado, previsto) in enumerate(zip(observados, previstos)):
+        assert registrar_previsao(observado, previsto, instante=1_700_000_000 + 600 * i, caminho=caminho, janela=20)
+
+    historico = historico_monitor(caminho)
+    erros = pd.Series(previstos - observados)
+    # Até encher a janela, a média é dos registros que existem
+    np.testing.assert_allclose(historico['MAE'], erros.abs().rolling(20, min_periods=1).mean(), rtol=1e-9)
+    np.testing.assert_allclose(historico['MAPE'], (erros.abs() / observados * 100).rolling(20, min_periods=1).mean(), rtol=1e-9)
+    np.testing.assert_allclose(historico['Vies'], erros.rolling(20, min_periods=1).mean(), rtol=1e-9, atol=1e-12)
+    assert historico['Instante'].iloc[0] == pd.Timestamp(1_700_000_000, unit='s')
+
+def test_intervalo_minimo_entre_registros(caminho):
+    assert registrar_previsao(80, 81, instante=1000, caminho=caminho, intervalo_minimo=300)
+    # Outra visita dentro do intervalo reaproveita o mesmo preço e não conta
+    assert not registrar_previsao(80, 81, instante=1299, caminho=caminho, intervalo_minimo=300)
+    assert registrar_previsao(82, 81, instante=1300, caminho=caminho, intervalo_minimo=300)
+    historico = historico_monitor(caminho)
+    assert len(historico) == 2
+    assert list(historico['Vies']) == [1.0, 0.0]
+
+@pytest.mark.parametrize('observado, previsto', [(None, 80.0), (80.0, None), (np.nan, 80.0), (0.0, 80.0)])
+def test_pares_invalidos_nao_sao_gravados(caminho, observado, previsto):
+    assert not registrar_previsao(observado, previsto, instante=1000, caminho=caminho)
+    assert historico_monitor(caminho).empty
+
+def test_previsao_do_dia_ou_da_data_mais_recente():
+    previsoes = pd.DataFrame({'Data': pd.to_datetime(['2024-12-27', '2024-12-30', '2024-12-31', '2025-01-01']),
+                              'Preco': [83.1, 83.21, 83.22, np.nan]})
+    assert previsao_para_data(previsoes, pd.Timestamp('2024-12-30 15:30')) == (pd.Timestamp('2024-12-30'), 83.21)
+    # Fim de semana usa a sexta; depois do horizonte, a última previsão com valor
+    assert previsao_para_data(previsoes, '2024-12-29') == (pd.Timestamp('2024-12-27'), 83.1)
+    assert previsao_para_data(previsoes, '2026-10-19') == (pd.Timestamp('2024-12-31'), 83.22)
+    assert previsao_para_data(previsoes, '2024-12-26') == (None, None)
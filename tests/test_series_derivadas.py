@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import series_derivadas
+from dados import COLUNA_PRECO
+from series_derivadas import (LITROS_POR_BARRIL, baixar_cambio, calcular_series_derivadas, carregar_cambio, fator_unidade,
+                              serie_na_unidade)
+
+def test_carregar_exportacao_do_sgs(tmp_path):
+    caminho = tmp_path / 'usd_brl.csv'
+    caminho.write_bytes('data;valor\n02/01/2024;4,8900\n03/01/2024;4,9200\n03/01/2024;4,9300\n04/01/2024;\n'.encode('iso-8859-1'))
+    cambio = carregar_cambio(str(caminho))
+    assert list(cambio['Data']) == [pd.Timestamp('2024-01-02'), pd.Timestamp('2024-01-03')]
+    # Data repetida: fica a última linha; cotação vazia é descartada
+    assert list(cambio['Cotacao_USD_BRL']) == [4.89, 4.93]
+
+def test_cotacao_as_of_com_validade():
+    precos = pd.DataFrame({'Data': pd.to_datetime(['2024-01-02', '2024-01-05', '2024-01-20']), COLUNA_PRECO: [80.0, 81.0, 82.0]})
+    cambio = pd.DataFrame({'Data': pd.to_datetime(['2024-01-01', '2024-01-04']), 'Cotacao_USD_BRL': [5.0, 4.0]})
+    derivadas = calcular_series_derivadas(precos, cambio)
+    # 05/01 usa a cotação de 04/01; 20/01 está a mais de 7 dias da última cotação e fica sem conversão
+    np.testing.assert_allclose(derivadas['Preco_BRL_barril'], [400.0, 324.0, np.nan])
+    np.testing.assert_allclose(derivadas['Preco_BRL_litro'], derivadas['Preco_BRL_barril'] / LITROS_POR_BARRIL)
+    serie = serie_na_unidade(derivadas, 'BRL/barril')
+    assert list(serie.columns) == ['Data', COLUNA_PRECO] and len(serie) == 2
+
+def test_fator_unidade_usa_a_ultima_cotacao():
+    cambio = pd.DataFrame({'Data': pd.to_datetime(['2024-01-01', '2024-01-04']), 'Cotacao_USD_BRL': [5.0, 4.0]})
+    assert fator_unidade(cambio, 'USD/barril') == 1.0
+    assert fator_unidade(cambio, 'BRL/barril') == 4.0
+    assert fator_unidade(cambio, 'BRL/litro') == pytest.approx(4.0 / 158.987294928)
+
+def test_baixar_cambio_em_consultas_de_dez_anos(tmp_path, monkeypatch):
+    consultas = []
+
+    class Resposta:
+        def __init__(self, params):
+            self.params = params
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return [{'data': self.params['dataInicial'], 'valor': '1,2345'}]
+
+    def get(url, params, timeout):
+        consultas.append((params['dataInicial'], params['dataFinal']))
+        return Resposta(params)
+
+    monkeypatch.setattr(series_derivadas.requests, 'get', get)
+    caminho = tmp_path / 'cambio' / 'usd_brl.csv'
+    baixar_cambio('1987-05-20', '2010-01-31', str(caminho))
+    assert consultas == [('20/05/1987', '19/05/1997'), ('20/05/1997', '19/05/2007'), ('20/05/2007', '31/01/2010')]
+    # O arquivo gravado é lido de volta no formato do SGS; a cotação de 1987 é anterior ao real e fica de fora
+    cambio = carregar_cambio(str(caminho))
+    assert list(cambio['Data']) == [pd.Timestamp('1997-05-20'), pd.Timestamp('2007-05-20')]
+    assert (cambio['Cotacao_USD_BRL'] == 1.2345).all()
+
+def test_cotacoes_anteriores_ao_plano_real_sao_descartadas(tmp_path):
+    caminho = tmp_path / 'usd_brl.csv'
+    caminho.write_text('data;valor\n29/06/1994;2750,0000\n30/06/1994;2750,0000\n01/07/1994;1,0000\n04/07/1994;0,9300\n')
+    cambio = carregar_cambio(str(caminho))
+    assert list(cambio['Data']) == [pd.Timestamp('1994-07-01'), pd.Timestamp('1994-07-04')]
+    precos = pd.DataFrame({'Data': pd.to_datetime(['1994-06-30', '1994-07-01', '1994-07-05']), COLUNA_PRECO: [17.0, 17.5, 18.0]})
+    derivadas = calcular_series_derivadas(precos, cambio)
+    # Antes de 1º/07/1994 a cotação estaria em cruzeiros reais: o preço fica sem conversão, não com um valor absurdo
+    np.testing.assert_allclose(derivadas['Preco_BRL_barril'], [np.nan, 17.5, 18.0 * 0.93])
+    assert list(serie_na_unidade(derivadas, 'BRL/litro')['Data']) == [pd.Timestamp('1994-07-01'), pd.Timestamp('1994-07-05')]
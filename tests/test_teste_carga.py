@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from monitor_previsoes import historico_monitor
+from teste_carga import PERCENTIS, ROTEIRO, resumir
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_percentis_e_totais_por_pagina():
+    gerador = np.random.default_rng(0)
+    tempos = {'Introdução': gerador.uniform(0.01, 0.2, 200), 'Notícias': gerador.uniform(0.5, 3.0, 50)}
+    medicoes = [(pagina, segundos, int(i % 25 == 0), int(i % 10 == 0))
+                for pagina, valores in tempos.items() for i, segundos in enumerate(valores)]
+    resumo, geral = resumir(medicoes, duracao=10.0, memoria={'Notícias': {'pico_mb': 12.34, 'retida_mb': 1.0}})
+
+    for pagina, valores in tempos.items():
+        for percentil in PERCENTIS:
+            assert resumo.loc[pagina, f'p{percentil}_ms'] == round(np.percentile(valores, percentil) * 1000, 1)
+        assert resumo.loc[pagina, 'reruns'] == len(valores)
+    assert (resumo.loc['Introdução', 'erros'], resumo.loc['Introdução', 'avisos']) == (8, 20)
+    # Páginas sem passada de memória ficam sem os valores, em vez de zero
+    assert resumo.loc['Notícias', 'pico_mb'] == 12.3 and np.isnan(resumo.loc['Introdução', 'pico_mb'])
+
+    todos = np.concatenate(list(tempos.values()))
+    assert geral['reruns'] == 250 and geral['vazao_reruns_s'] == 25.0
+    for percentil in PERCENTIS:
+        assert geral[f'p{percentil}_ms'] == pytest.approx(np.percentile(todos, percentil) * 1000)
+    assert geral['p50_ms'] <= geral['p95_ms'] <= geral['p99_ms']
+
+@pytest.mark.slow
+def test_uma_sessao_percorre_o_roteiro_sem_erros(tmp_path):
+    # Execução real do teste de carga, com os bancos locais num diretório temporário
+    ambiente = {**os.environ, 'CACHE_PAGINAS': str(tmp_path / 'cache.db'), 'ARQUIVO_NOTICIAS': str(tmp_path / 'noticias.db'),
+                'MONITOR_PREVISOES': str(tmp_path / 'monitor.db')}
+    saida = tmp_path / 'relatorio.json'
+    processo = subprocess.run([sys.executable, 'teste_carga.py', '--sessoes', '1', '--repeticoes', '1', '--sem-memoria',
+                               '--latencia-google', '0', '--latencia-noticias', '0', '--saida', str(saida), '--falhar-com-avisos'],
+                              cwd=RAIZ, env=ambiente, capture_output=True, text=True, timeout=600)
+    assert processo.returncode == 0, processo.stdout[-2000:] + processo.stderr[-2000:]
+
+    with open(saida, encoding='utf-8') as arquivo:
+        relatorio = json.load(arquivo)
+    passos = len(ROTEIRO) + sum('slider' in passo for passo in ROTEIRO)
+    assert relatorio['geral']['reruns'] == passos and relatorio['geral']['erros'] == 0
+    assert set(relatorio['paginas']) >= {passo['pagina'] for passo in ROTEIRO}
+    # O Google e a NewsAPI simulados foram usados no lugar da rede
+    assert relatorio['geral']['requisicoes_externas']['google'] >= 1
+    # A página de ML registra o preço simulado contra a previsão do modelo publicado, mesmo fora do horizonte dele
+    assert historico_monitor(str(tmp_path / 'monitor.db'))['Observado'].iloc[0] == 85.12
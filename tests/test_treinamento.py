@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dados
+import treinamento
+from treinamento import (avaliar, combinacoes_grade, executar_etapa, gerar_chave, hash_arquivo, limpar, preparar_dados,
+                         salvar_artefatos)
+
+@pytest.fixture
+def arquivo_precos(tmp_path):
+    # Série diária pequena no formato da exportação do IPEA (coluna de preço com o nome do dashboard)
+    datas = pd.date_range('2019-01-01', '2021-06-30', freq='D')
+    t = np.arange(len(datas))
+    precos = 60 + 0.01 * t + 3 * np.sin(2 * np.pi * t / 365.25)
+    caminho = tmp_path / 'precos.csv'
+    pd.DataFrame({'Data': datas.strftime('%Y-%m-%d'), 'Preco_petroleo_bruto_Brent_FOB': precos.round(2)}).to_csv(caminho, index=False)
+    return caminho
+
+def test_chave_depende_do_conteudo_e_dos_parametros(tmp_path):
+    parametros = {'changepoint_prior_scale': 0.05, 'seasonality_mode': 'additive', 'feriados': False}
+    assert gerar_chave('ajustar', 'abc', parametros) == gerar_chave('ajustar', 'abc', dict(reversed(parametros.items())))
+    assert gerar_chave('ajustar', 'abc', parametros) != gerar_chave('ajustar', 'abc', {**parametros, 'feriados': True})
+    assert gerar_chave('ajustar', 'abc', parametros) != gerar_chave('ajustar', 'abd', parametros)
+
+    primeiro, segundo = tmp_path / 'a.csv', tmp_path / 'b.csv'
+    primeiro.write_text('Data,Preco\n2020-01-01,60\n')
+    segundo.write_text('Data,Preco\n2020-01-01,60\n')
+    # O nome e a data de modificação não entram no hash, só o conteúdo
+    assert hash_arquivo(primeiro) == hash_arquivo(segundo)
+    segundo.write_text('Data,Preco\n2020-01-01,61\n')
+    assert hash_arquivo(primeiro) != hash_arquivo(segundo)
+
+def test_etapa_em_cache_nao_e_recalculada(tmp_path):
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return {'valor': len(chamadas)}
+
+    assert executar_etapa('avaliar', 'chave', calcular, str(tmp_path)) == {'valor': 1}
+    assert executar_etapa('avaliar', 'chave', calcular, str(tmp_path)) == {'valor': 1}
+    assert executar_etapa('avaliar', 'outra', calcular, str(tmp_path)) == {'valor': 2}
+    assert len(chamadas) == 2
+    assert sorted(os.listdir(tmp_path / 'avaliar')) == ['chave.pkl', 'outra.pkl']
+
+def test_preparar_dados_recalcula_so_quando_o_arquivo_muda(tmp_path, arquivo_precos):
+    cache = str(tmp_path / 'cache')
+    chave, limpo = preparar_dados(str(arquivo_precos), cache)
+    assert list(limpo.columns) == ['ds', 'y'] and limpo['ds'].is_monotonic_increasing
+    assert preparar_dados(str(arquivo_precos), cache)[0] == chave
+    assert len(os.listdir(os.path.join(cache, 'limpar'))) == 1
+
+    alterado = pd.read_csv(arquivo_precos)
+    alterado.loc[0, 'Preco_petroleo_bruto_Brent_FOB'] = 99.0
+    alterado.to_csv(arquivo_precos, index=False)
+    nova_chave, novo_limpo = preparar_dados(str(arquivo_precos), cache)
+    assert nova_chave != chave and novo_limpo['y'].iloc[0] == 99.0
+    assert len(os.listdir(os.path.join(cache, 'limpar'))) == 2
+
+def test_limpar_descarta_invalidos_e_repetidos():
+    bruto = pd.DataFrame({'Data': ['2020-01-03', '2020-01-02', 'x', '2020-01-03'], 'Preco': ['61', '60', '1', '62']})
+    limpo = limpar(bruto)
+    assert list(limpo['ds'].dt.strftime('%Y-%m-%d')) == ['2020-01-02', '2020-01-03']
+    assert list(limpo['y']) == [60.0, 62.0]
+
+def test_avaliar_so_nas_datas_previstas():
+    teste = pd.DataFrame({'ds': pd.date_range('2021-01-01', periods=4), 'y': [10.0, 12.0, 14.0, 16.0]})
+    previsao = pd.DataFrame({'ds': pd.date_range('2021-01-01', periods=3), 'yhat': [11.0, 12.0, 11.0]})
+    metricas = avaliar(teste, previsao)
+    assert metricas['pontos'] == 3 and metricas['mae'] == pytest.approx(4 / 3)
+    assert metricas['rmse'] == pytest.approx(np.sqrt(10 / 3)) and metricas['media_teste'] == 13.0
+
+def test_combinacoes_da_grade():
+    assert len(combinacoes_grade()) == 12
+    assert combinacoes_grade({'a': [1], 'b': ['x', 'y']}) == [{'a': 1, 'b': 'x'}, {'a': 1, 'b': 'y'}]
+
+def test_salvar_artefatos_e_o_dashboard_le_a_versao_atual(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    limpo = pd.DataFrame({'ds': pd.date_range('2024-05-01', periods=5), 'y': [80.0, 81, 82, 83, 84]})
+    previsao = pd.DataFrame({'ds': pd.date_range('2024-05-06', periods=3), 'yhat': [84.123, 85, 86],
+                             'yhat_lower': [80.0, 80, 80], 'yhat_upper': [90.0, 90, 90]})
+    resultados = [{'parametros': {'changepoint_prior_scale': 0.05}, 'metricas': {'mae': 1.0, 'rmse': 1.5}},
+                  {'parametros': {'changepoint_prior_scale': 0.5}, 'metricas': {'mae': 2.0, 'rmse': 2.5}}]
+    argumentos = argparse.Namespace(dados='precos.csv', data_corte='2024-04-30', horizonte=3)
+
+    versao = salvar_artefatos(dados.DIRETORIO_MODELOS, 'chave', limpo, '{"modelo": 1}', previsao, resultados, argumentos)
+    diretorio = os.path.join(dados.DIRETORIO_MODELOS, versao)
+    assert sorted(os.listdir(diretorio)) == ['metricas.json', 'modelo.json', 'previsao.csv']
+    with open(os.path.join(diretorio, 'metricas.json'), encoding='utf-8') as arquivo:
+        metricas = json.load(arquivo)
+    assert metricas['parametros'] == {'changepoint_prior_scale': 0.05} and len(metricas['grade']) == 2
+
+    # O ponteiro atual.json faz o dashboard e a API trocarem o CSV publicado pela previsão nova
+    assert dados.caminho_previsoes() == os.path.join(diretorio, 'previsao.csv')
+    previsoes = dados.carregar_previsoes()
+    assert list(previsoes['Tipo']) == ['Historico'] * 5 + ['Previsao'] * 3
+    assert previsoes['Preco'].iloc[5] == 84.12 and previsoes['Preco_Superior'].iloc[-1] == 90
+
+def test_grade_de_um_ponto(tmp_path, arquivo_precos):
+    pytest.importorskip('prophet')
+    grade = {'changepoint_prior_scale': [0.05], 'seasonality_mode': ['additive'], 'feriados': [False]}
+    cache = str(tmp_path / 'cache')
+    resultados = treinamento.buscar_hiperparametros(str(arquivo_precos), '2020-12-31', 1, cache, grade)
+    assert len(resultados) == 1 and resultados[0]['parametros'] == combinacoes_grade(grade)[0]
+    assert resultados[0]['metricas']['pontos'] == 181 and np.isfinite(resultados[0]['metricas']['rmse'])
+    # A segunda busca lê o ajuste e as métricas do cache
+    assert treinamento.buscar_hiperparametros(str(arquivo_precos), '2020-12-31', 1, cache, grade) == resultados
+    assert len(os.listdir(os.path.join(cache, 'ajustar'))) == 1
@@ -0,0 +1,226 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dados import DIRETORIO_MODELOS, caminho_precos, carregar_dados
+
+# Pipeline de treinamento do Prophet extraído do notebook ml_prophet.ipynb.
+# Cada etapa (carregar, limpar, ajustar, prever, avaliar) guarda seu resultado em disco com uma chave
+# derivada do conteúdo das entradas, então só é recalculado o que mudou. A grade de hiperparâmetros
+# roda em paralelo e o melhor modelo é salvo em modelos/<versao>/, lido pelo dashboard. Os modelos treinados
+# são artefatos locais (modelos/ fica fora do git): sem eles, o dashboard usa o CSV de previsões do projeto.
+#
+# Uso: python treinamento.py --dados 2024-07-02_ipea.csv --processos 4
+# Sem --dados, usa o armazenamento do etl.py (ou petroleo.xlsx, se o ETL não foi executado).
+# Requer o pacote prophet, que não faz parte do requirements.txt do dashboard.
+
+VERSAO_PIPELINE = '1'
+DIRETORIO_CACHE = '.cache_treinamento'
+DATA_CORTE = '2020-12-31'
+HORIZONTE_DIAS = 365
+
+# Crises usadas como "feriados" no notebook
+FERIADOS = pd.DataFrame({
+    'holiday': 'Crise',
+    'ds': pd.to_datetime(['2008-07-07', '2014-06-01', '2020-02-01', '2022-01-01']),
+    'lower_window': 0,
+    'upper_window': 1,
+})
+
+GRADE = {
+    'changepoint_prior_scale': [0.01, 0.05, 0.5],
+    'seasonality_mode': ['additive', 'multiplicative'],
+    'feriados': [False, True],
+}
+
+def gerar_chave(*partes):
+    conteudo = json.dumps([VERSAO_PIPELINE, *partes], sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:16]
+
+def hash_arquivo(caminho):
+    resumo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()[:16]
+
+def executar_etapa(etapa, chave, funcao, diretorio_cache):
+    caminho = os.path.join(diretorio_cache, etapa, f'{chave}.pkl')
+    if os.path.exists(caminho):
+        with open(caminho, 'rb') as arquivo:
+            return pickle.load(arquivo)
+
+    resultado = funcao()
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # Escrita atômica: processos paralelos nunca leem um arquivo pela metade
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho))
+    with os.fdopen(descritor, 'wb') as arquivo:
+        pickle.dump(resultado, arquivo)
+    os.replace(temporario, caminho)
+    return resultado
+
+#------------------------------------------------------ETAPAS--------------------------------------------------------------------------
+
+def carregar(caminho):
+    if caminho.lower().endswith('.csv'):
+        # Exportação do IPEA: ISO-8859-1, com a primeira coluna (índice) nomeada pelo BOM mal decodificado
+        bruto = pd.read_csv(caminho, encoding='iso-8859-1')
+        bruto = bruto.rename(columns={'ï»¿': 'ID', 'Preco_petroleo_bruto_Brent_FOB': 'Preco'})
+        return bruto.drop(columns=['ID'], errors='ignore')
+    if caminho.lower().endswith('.parquet'):
+        # Armazenamento canônico gerado por etl.py, já limpo e tipado
+        return pd.read_parquet(caminho, columns=['Data', 'Preco_petroleo_bruto_Brent_FOB']).rename(columns={'Preco_petroleo_bruto_Brent_FOB': 'Preco'})
+    return carregar_dados(caminho).rename(columns={'Preco_petroleo_bruto_Brent_FOB': 'Preco'})
+
+def limpar(bruto):
+    limpo = bruto.rename(columns={'Data': 'ds', 'Preco': 'y'})[['ds', 'y']]
+    limpo['ds'] = pd.to_datetime(limpo['ds'], errors='coerce')
+    limpo['y'] = pd.to_numeric(limpo['y'], errors='coerce')
+    limpo = limpo.dropna().drop_duplicates(subset='ds', keep='last')
+    return limpo.sort_values('ds').reset_index(drop=True)
+
+def ajustar(treino, parametros):
+    from prophet import Prophet
+    from prophet.serialize import model_to_json
+
+    modelo = Prophet(
+        changepoint_prior_scale=parametros['changepoint_prior_scale'],
+        seasonality_mode=parametros['seasonality_mode'],
+        holidays=FERIADOS if parametros['feriados'] else None,
+    )
+    modelo.fit(treino)
+    return model_to_json(modelo)
+
+def prever(modelo_json, datas):
+    from prophet.serialize import model_from_json
+
+    modelo = model_from_json(modelo_json)
+    previsao = modelo.predict(pd.DataFrame({'ds': datas}))
+    return previsao[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+
+def avaliar(teste, previsao):
+    comparacao = teste.merge(previsao, on='ds')
+    erros = comparacao['y'] - comparacao['yhat']
+    return {
+        'mae': float(np.mean(np.abs(erros))),
+        'rmse': float(np.sqrt(np.mean(erros ** 2))),
+        'media_teste': float(teste['y'].mean()),
+        'pontos': int(len(comparacao)),
+    }
+
+#------------------------------------------------------PIPELINE--------------------------------------------------------------------------
+
+def preparar_dados(caminho, diretorio_cache):
+    chave_carregar = gerar_chave('carregar', hash_arquivo(caminho))
+    bruto = executar_etapa('carregar', chave_carregar, lambda: carregar(caminho), diretorio_cache)
+    chave_limpar = gerar_chave('limpar', chave_carregar)
+    limpo = executar_etapa('limpar', chave_limpar, lambda: limpar(bruto), diretorio_cache)
+    return chave_limpar, limpo
+
+def avaliar_combinacao(caminho, parametros, data_corte, diretorio_cache):
+    # Executada em cada processo da grade; as etapas em cache são compartilhadas pelo disco
+    chave_limpar, limpo = preparar_dados(caminho, diretorio_cache)
+    treino = limpo[limpo['ds'] <= data_corte]
+    teste = limpo[limpo['ds'] > data_corte]
+    if treino.empty or teste.empty:
+        raise ValueError("Os conjuntos de treino ou teste estão vazios. Verifique a data de corte e os dados.")
+
+    chave_ajustar = gerar_chave('ajustar', chave_limpar, parametros, data_corte)
+    modelo_json = executar_etapa('ajustar', chave_ajustar, lambda: ajustar(treino, parametros), diretorio_cache)
+    chave_prever = gerar_chave('prever', chave_ajustar)
+    previsao = executar_etapa('prever', chave_prever, lambda: prever(modelo_json, teste['ds']), diretorio_cache)
+    chave_avaliar = gerar_chave('avaliar', chave_prever)
+    metricas = executar_etapa('avaliar', chave_avaliar, lambda: avaliar(teste, previsao), diretorio_cache)
+    return {'parametros': parametros, 'metricas': metricas}
+
+def combinacoes_grade(grade=GRADE):
+    nomes = list(grade)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(grade[nome] for nome in nomes))]
+
+def buscar_hiperparametros(caminho, data_corte, processos, diretorio_cache, grade=GRADE):
+    combinacoes = combinacoes_grade(grade)
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [executor.submit(avaliar_combinacao, caminho, parametros, data_corte, diretorio_cache)
+                   for parametros in combinacoes]
+        resultados = [futuro.result() for futuro in futuros]
+    return sorted(resultados, key=lambda resultado: resultado['metricas']['rmse'])
+
+def treinar_modelo_final(caminho, parametros, horizonte, diretorio_cache):
+    chave_limpar, limpo = preparar_dados(caminho, diretorio_cache)
+    chave_ajustar = gerar_chave('ajustar', chave_limpar, parametros, 'completo')
+    modelo_json = executar_etapa('ajustar', chave_ajustar, lambda: ajustar(limpo, parametros), diretorio_cache)
+
+    futuro = pd.bdate_range(limpo['ds'].max() + pd.Timedelta(days=1), periods=int(horizonte * 5 / 7))
+    chave_prever = gerar_chave('prever', chave_ajustar, horizonte)
+    previsao = executar_etapa('prever', chave_prever, lambda: prever(modelo_json, futuro), diretorio_cache)
+    return chave_limpar, limpo, modelo_json, previsao
+
+def salvar_artefatos(diretorio_modelos, chave_dados, limpo, modelo_json, previsao, resultados, argumentos):
+    melhor = resultados[0]
+    versao = f"{datetime.now():%Y%m%dT%H%M%S}_{gerar_chave(chave_dados, melhor['parametros'])[:8]}"
+    diretorio = os.path.join(diretorio_modelos, versao)
+    os.makedirs(diretorio, exist_ok=True)
+
+    with open(os.path.join(diretorio, 'modelo.json'), 'w', encoding='utf-8') as arquivo:
+        arquivo.write(modelo_json)
+
+    # Mesmo esquema do Filtered_DataFrame_2020-2025.csv (Data, Preco), mais o intervalo de confiança
+    historico = pd.DataFrame({'Data': limpo['ds'], 'Preco': limpo['y'], 'Tipo': 'Historico'})
+    futuro = pd.DataFrame({
+        'Data': previsao['ds'],
+        'Preco': previsao['yhat'].round(2),
+        'Preco_Inferior': previsao['yhat_lower'].round(2),
+        'Preco_Superior': previsao['yhat_upper'].round(2),
+        'Tipo': 'Previsao',
+    })
+    pd.concat([historico, futuro], ignore_index=True).to_csv(os.path.join(diretorio, 'previsao.csv'), index=False)
+
+    metadados = {
+        'versao': versao,
+        'dados': argumentos.dados,
+        'chave_dados': chave_dados,
+        'data_corte': argumentos.data_corte,
+        'horizonte_dias': argumentos.horizonte,
+        'parametros': melhor['parametros'],
+        'metricas': melhor['metricas'],
+        'grade': resultados,
+    }
+    with open(os.path.join(diretorio, 'metricas.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump(metadados, arquivo, ensure_ascii=False, indent=2)
+
+    # Ponteiro para a versão que o dashboard deve carregar
+    with open(os.path.join(diretorio_modelos, 'atual.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump({'versao': versao}, arquivo)
+    return versao
+
+def main():
+    parser = argparse.ArgumentParser(description="Treina o modelo Prophet do preço do petróleo Brent")
+    parser.add_argument('--dados', default=caminho_precos(), help="CSV do IPEA, planilha petroleo.xlsx ou dados_canonicos/precos.parquet")
+    parser.add_argument('--data-corte', default=DATA_CORTE, help="Último dia do conjunto de treino")
+    parser.add_argument('--horizonte', type=int, default=HORIZONTE_DIAS, help="Dias de previsão do modelo final")
+    parser.add_argument('--processos', type=int, default=os.cpu_count())
+    parser.add_argument('--cache', default=DIRETORIO_CACHE)
+    parser.add_argument('--saida', default=DIRETORIO_MODELOS)
+    argumentos = parser.parse_args()
+
+    resultados = buscar_hiperparametros(argumentos.dados, argumentos.data_corte, argumentos.processos, argumentos.cache)
+    for resultado in resultados:
+        metricas = resultado['metricas']
+        print(f"MAE={metricas['mae']:.2f} RMSE={metricas['rmse']:.2f} {resultado['parametros']}")
+
+    chave_dados, limpo, modelo_json, previsao = treinar_modelo_final(
+        argumentos.dados, resultados[0]['parametros'], argumentos.horizonte, argumentos.cache)
+    versao = salvar_artefatos(argumentos.saida, chave_dados, limpo, modelo_json, previsao, resultados, argumentos)
+    print(f"Modelo salvo em {os.path.join(argumentos.saida, versao)}")
+
+if __name__ == "__main__":
+    main()